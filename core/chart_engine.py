@@ -1,5 +1,71 @@
-from collections import deque
-from typing import Deque, List, Dict
+from typing import List, Optional
+
+import numpy as np
+
+
+class ColumnBuffer:
+    """
+    Buffer colunar (rows × N) com janela deslizante.
+
+    - folga 2x → descartar os mais antigos só avança um offset
+    - compactação (cópia) só quando o buffer enche → append O(1) amortizado
+    - colunas devolvidas como views (sem cópia)
+    """
+
+    def __init__(self, rows: int, capacity: int):
+        self.rows = rows
+        self._buf = np.zeros((rows, max(2, capacity)), dtype=np.float64)
+        self._off = 0
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def reset(self, data: Optional[np.ndarray] = None):
+        """
+        Substitui o conteúdo por `data` (rows × n) ou esvazia.
+        """
+        n = 0 if data is None else data.shape[1]
+        if self._buf.shape[1] < n:
+            self._buf = np.zeros((self.rows, 2 * n), dtype=np.float64)
+        if n:
+            self._buf[:, :n] = data
+        self._off = 0
+        self._n = n
+
+    def view(self, row: int) -> np.ndarray:
+        return self._buf[row, self._off : self._off + self._n]
+
+    def col(self, i: int) -> np.ndarray:
+        """
+        Coluna i (todas as rows) como view.
+        """
+        return self._buf[:, self._off + i]
+
+    def append(self, values):
+        if self._off + self._n >= self._buf.shape[1]:
+            self.compact(max(self._buf.shape[1], 2 * (self._n + 1)))
+        self._buf[:, self._off + self._n] = values
+        self._n += 1
+
+    def set_col(self, i: int, values):
+        self._buf[:, self._off + i] = values
+
+    def drop_oldest(self, count: int) -> int:
+        # O(1): só avança o offset (a compactação acontece no append)
+        count = min(count, self._n)
+        self._off += count
+        self._n -= count
+        return count
+
+    def compact(self, capacity: int):
+        """
+        Move os dados válidos para o início de um buffer com `capacity`.
+        """
+        buf = np.zeros((self.rows, max(capacity, self._n)), dtype=np.float64)
+        buf[:, : self._n] = self._buf[:, self._off : self._off + self._n]
+        self._buf = buf
+        self._off = 0
 
 
 class ChartEngine:
@@ -7,9 +73,16 @@ class ChartEngine:
     ChartEngine
 
     Responsabilidade:
-    - Manter um buffer eficiente de candles (OHLCV)
+    - Manter as séries OHLCV em arrays NumPy colunares
+      (t em segundos, open, high, low, close, volume)
     - Suportar updates incrementais (último candle em formação)
-    - Garantir uma janela fixa (rolling window) de candles visíveis
+    - Garantir uma janela fixa (rolling window) de candles
+
+    Índices:
+    - cada candle tem um nº de sequência absoluto (seq)
+    - seq = first_seq + índice no array
+    - permite às vistas guardar caches por seq sem serem
+      invalidadas quando os candles mais antigos saem da janela
 
     NOTA:
     Este motor é propositalmente simples:
@@ -18,6 +91,9 @@ class ChartEngine:
     - Apenas gere estado de candles
     """
 
+    # Linhas do buffer colunar
+    T, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
     def __init__(self, max_candles: int = 300):
         """
         Inicializa o motor de candles.
@@ -26,16 +102,31 @@ class ChartEngine:
         """
         self.max_candles = max_candles
 
-        # Deque garante:
-        # - append O(1)
-        # - pop automático quando atinge maxlen
-        self._candles: Deque[Dict] = deque(maxlen=max_candles)
+        # Buffer com folga (2x) → compactação amortizada O(1) por append
+        self._cols = ColumnBuffer(6, 2 * max_candles)
+
+        # Seq absoluto do candle no índice 0
+        self.first_seq = 0
+
+        # Último candle ainda em formação?
+        self.live = False
+
+        # Incrementado sempre que o histórico é substituído
+        self.history_version = 0
+
+        # Incrementado quando um candle já fechado é corrigido
+        # (kline fechado que chega depois do candle seguinte)
+        self.revision = 0
+        self.revised_seq = -1
+
+        # Espaçamento típico entre candles (segundos)
+        self.spacing = 60.0
 
     # ======================================================
     # CARGA DE HISTÓRICO
     # ======================================================
 
-    def set_history(self, candles: List[Dict]):
+    def set_history(self, candles: List, live: bool = True):
         """
         Substitui completamente o histórico atual.
 
@@ -45,46 +136,163 @@ class ChartEngine:
         - Carregamento inicial
 
         Apenas os últimos `max_candles` são mantidos.
+        O último candle é tratado como em formação (`live`).
+        """
+        candles = list(candles)[-self.max_candles :]
+        n = len(candles)
+
+        self._cols.reset(
+            np.array(
+                [
+                    (c.open_time / 1000.0, c.open, c.high, c.low, c.close, c.volume)
+                    for c in candles
+                ],
+                dtype=np.float64,
+            ).T
+            if n else None
+        )
+
+        self.first_seq = 0
+        self.live = live and n > 0
+        self.history_version += 1
+
+        if n > 1:
+            self.spacing = float(np.median(np.diff(self.t)))
+
+    def set_max_candles(self, max_candles: int):
+        """
+        Altera a janela. Reduções descartam os candles mais antigos.
         """
-        self._candles.clear()
-        for c in candles[-self.max_candles :]:
-            self._candles.append(c)
+        self.max_candles = max_candles
+        if len(self._cols) > max_candles:
+            self._drop_oldest(len(self._cols) - max_candles)
+        self._cols.compact(2 * max_candles)
 
     # ======================================================
     # ACESSO A DADOS
     # ======================================================
 
-    def get_visible_candles(self) -> List[Dict]:
+    def __len__(self) -> int:
+        return len(self._cols)
+
+    def column(self, row: int) -> np.ndarray:
+        """
+        View (sem cópia) de uma coluna: t / open / high / low / close / volume.
+        """
+        return self._cols.view(row)
+
+    @property
+    def t(self) -> np.ndarray:
+        return self.column(self.T)
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.column(self.OPEN)
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.column(self.HIGH)
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.column(self.LOW)
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.column(self.CLOSE)
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.column(self.VOLUME)
+
+    @property
+    def end_seq(self) -> int:
+        """
+        Seq a seguir ao último candle.
+        """
+        return self.first_seq + len(self._cols)
+
+    @property
+    def closed_end_seq(self) -> int:
         """
-        Retorna os candles atualmente mantidos no buffer.
+        Seq a seguir ao último candle fechado.
+        """
+        return self.end_seq - (1 if self.live else 0)
+
+    def index_of(self, seq: int) -> int:
+        return seq - self.first_seq
+
+    def last(self) -> Optional[np.ndarray]:
+        """
+        Último candle como vetor (t, o, h, l, c, v).
+        """
+        if not len(self._cols):
+            return None
+        return self._cols.col(len(self._cols) - 1)
 
-        Usado pelo ChartPanel para renderização.
+    def row_at(self, seq: int) -> np.ndarray:
+        """
+        Candle com o seq dado como vetor (t, o, h, l, c, v).
         """
-        return list(self._candles)
+        return self._cols.col(self.index_of(seq))
 
     # ======================================================
     # UPDATES INCREMENTAIS
     # ======================================================
 
-    def append_candle(self, candle: Dict):
+    def update(self, candle, closed: bool) -> Optional[str]:
+        """
+        Aplica um update de candle.
+
+        :return:
+        - "replace" → último candle atualizado (mesmo open_time)
+        - "append"  → novo candle (o anterior fica fechado)
+        - "revise"  → kline fechado do penúltimo candle (o seguinte
+                      já abriu por trades): corrige-o em revised_seq
+        - None      → update antigo, ignorado
         """
-        Adiciona um novo candle fechado.
+        t = candle.open_time / 1000.0
+        row = (t, candle.open, candle.high, candle.low, candle.close, candle.volume)
 
-        Normalmente chamado quando:
-        - Um candle fecha
-        - Novo período começa
+        last = self.last()
+
+        if last is not None and t == last[self.T]:
+            last[:] = row
+            self.live = not closed
+            return "replace"
+
+        if last is not None and t < last[self.T]:
+            n = len(self._cols)
+            if closed and n > 1 and t == self._cols.col(n - 2)[self.T]:
+                self._cols.set_col(n - 2, row)
+                self.revised_seq = self.end_seq - 2
+                self.revision += 1
+                return "revise"
+            return None
+
+        self.append_candle(row)
+        self.live = not closed
+        return "append"
+
+    def append_candle(self, row):
         """
-        self._candles.append(candle)
+        Adiciona um novo candle (tuple t, o, h, l, c, v).
+        O(1) amortizado: compacta o buffer só quando enche.
+        """
+        if len(self._cols) >= self.max_candles:
+            self._drop_oldest(len(self._cols) - self.max_candles + 1)
+
+        self._cols.append(row)
 
-    def update_last_candle(self, candle: Dict):
+    def update_last_candle(self, row):
         """
         Atualiza o último candle (em formação).
-
-        Fluxo típico:
-        - Recebe updates tick-by-tick
-        - Último candle é substituído
-        - Não altera candles históricos
+        Não altera candles históricos.
         """
-        if self._candles:
-            self._candles.pop()
-        self._candles.append(candle)
+        if len(self._cols):
+            self._cols.set_col(len(self._cols) - 1, row)
+        else:
+            self.append_candle(row)
+
+    def _drop_oldest(self, count: int):
+        self.first_seq += self._cols.drop_oldest(count)
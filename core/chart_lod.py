@@ -0,0 +1,144 @@
+import math
+from typing import List, Optional
+
+import numpy as np
+
+from core.chart_engine import ChartEngine
+
+
+# ==========================================================
+# LEVEL OF DETAIL (PIRÂMIDE MIN / MAX)
+# ==========================================================
+# Quando há mais de 1 candle por pixel, desenhar candle a
+# candle só pinta por cima da mesma coluna de pixels.
+# A pirâmide agrega os candles fechados em blocos de 2^k
+# (alinhados ao seq absoluto do ChartEngine) e a vista
+# escolhe o nível em que cada bloco ocupa ≥ 1 pixel.
+# ==========================================================
+
+
+class PyramidLevel:
+    """
+    Blocos de 2^k candles de um nível da pirâmide.
+
+    Arrays colunares, um elemento por bloco:
+    - t0 / t1 → tempo (s) do primeiro / último candle do bloco
+    - open / close → do primeiro / último candle
+    - high / low → máximo / mínimo do bloco
+    - vmax → maior volume individual (envelope das barras de volume)
+
+    O bloco de id b cobre os seqs [b * 2^k, (b + 1) * 2^k);
+    o índice no array é b - base.
+    """
+
+    __slots__ = ("k", "base", "t0", "t1", "open", "high", "low", "close", "vmax")
+
+    def __init__(self, k, base, t0, t1, open_, high, low, close, vmax):
+        self.k = k
+        self.base = base
+        self.t0 = t0
+        self.t1 = t1
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.vmax = vmax
+
+    def __len__(self) -> int:
+        return len(self.t0)
+
+    @property
+    def end(self) -> int:
+        """
+        Id a seguir ao último bloco.
+        """
+        return self.base + len(self.t0)
+
+
+class CandlePyramid:
+    """
+    Pirâmide de agregados sobre os candles fechados do ChartEngine.
+
+    - nível 0 = os próprios candles (não é guardado)
+    - nível k = reduceat do nível k - 1 (pares de blocos)
+    - reconstruída de forma vetorizada e preguiçosa: só quando
+      um candle fecha / o histórico muda E uma vista pede um nível
+      (poucos ms para 100k candles, nada por tick)
+    """
+
+    def __init__(self, engine: ChartEngine):
+        self.engine = engine
+
+        self._levels: List[PyramidLevel] = []
+
+        # Estado do engine quando a pirâmide foi construída
+        self._state = None
+
+    # ======================================================
+    # ESCOLHA DO NÍVEL
+    # ======================================================
+
+    def level_for(self, units_per_pixel: float) -> int:
+        """
+        Nível em que cada bloco ocupa pelo menos 1 pixel.
+
+        :param units_per_pixel: largura de um pixel em segundos
+        """
+        spacing = self.engine.spacing
+        if spacing <= 0 or units_per_pixel <= spacing:
+            return 0
+        return int(math.ceil(math.log2(units_per_pixel / spacing)))
+
+    def level(self, k: int) -> Optional[PyramidLevel]:
+        """
+        Nível k (k ≥ 1), limitado ao nível mais grosseiro disponível.
+        """
+        self._ensure()
+        if k <= 0 or not self._levels:
+            return None
+        return self._levels[min(k, len(self._levels)) - 1]
+
+    @property
+    def depth(self) -> int:
+        self._ensure()
+        return len(self._levels)
+
+    # ======================================================
+    # CONSTRUÇÃO
+    # ======================================================
+
+    def _ensure(self):
+        eng = self.engine
+        state = (eng.history_version, eng.revision, eng.first_seq, eng.closed_end_seq)
+        if state != self._state:
+            self._state = state
+            self._rebuild()
+
+    def _rebuild(self):
+        eng = self.engine
+        n = eng.closed_end_seq - eng.first_seq
+        self._levels = []
+        if n < 2:
+            return
+
+        ids = np.arange(eng.first_seq, eng.closed_end_seq, dtype=np.int64)
+        t0 = t1 = eng.t[:n]
+        o, h, l, c, v = eng.open[:n], eng.high[:n], eng.low[:n], eng.close[:n], eng.volume[:n]
+
+        k = 0
+        while len(ids) > 1:
+            k += 1
+            parent = ids >> 1
+
+            # Início de cada bloco do nível seguinte
+            starts = np.flatnonzero(np.r_[True, parent[1:] != parent[:-1]])
+            lasts = np.r_[starts[1:], len(ids)] - 1
+
+            ids = parent[starts]
+            t0, t1 = t0[starts], t1[lasts]
+            o, c = o[starts], c[lasts]
+            h = np.maximum.reduceat(h, starts)
+            l = np.minimum.reduceat(l, starts)
+            v = np.maximum.reduceat(v, starts)
+
+            self._levels.append(PyramidLevel(k, int(ids[0]), t0, t1, o, h, l, c, v))
@@ -0,0 +1,149 @@
+# ==========================================================
+# CANDLE BUILDER (CANDLE EM FORMAÇÃO A PARTIR DE TRADES)
+# ==========================================================
+# Responsável por:
+# - Atualizar o OHLCV do candle em formação a cada trade
+# - Usar os klines apenas como checkpoint de reconciliação
+#   (substituem o estado; os trades mais recentes que o
+#   kline são reaplicados por cima)
+#
+# Corre no event loop do provider (sem locks): trades e
+# klines chegam pelo mesmo thread.
+# ==========================================================
+
+from collections import deque
+from dataclasses import replace
+from typing import Deque, Optional, Tuple
+
+from core.data_engine.models import Candle
+
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+
+
+class CandleBuilder:
+    """
+    Candle em formação alimentado por trades.
+
+    - trade do intervalo atual → high / low / close / volume
+    - trade de um intervalo novo → novo candle (abre nesse trade)
+    - kline do intervalo atual → checkpoint: substitui o candle e
+      reaplica os trades com ts > hora do evento do kline
+    - kline fechado (x=True) → candle final; trades atrasados desse
+      intervalo são ignorados (já estão no kline)
+
+    Só há candle depois de uma base (histórico / kline): trades a meio
+    de um intervalo sem base dariam um candle incompleto.
+    """
+
+    # Trades guardados para replay (só os posteriores ao último kline)
+    MAX_PENDING = 20_000
+
+    def __init__(self, interval_ms: int):
+        self.interval_ms = interval_ms
+
+        self.candle: Optional[Candle] = None
+        self.closed = False
+
+        # Alterado desde o último take()
+        self.dirty = False
+
+        # (ts, price, qty) do intervalo atual, após o último kline
+        self._pending: Deque[Tuple[int, float, float]] = deque(maxlen=self.MAX_PENDING)
+
+    def reset(self):
+        self.candle = None
+        self.closed = False
+        self.dirty = False
+        self._pending.clear()
+
+    # ======================================================
+    # ENTRADAS
+    # ======================================================
+
+    def seed(self, candle: Candle):
+        """
+        Base inicial (último candle do histórico REST).
+        """
+        self.candle = replace(candle)
+        self.closed = False
+        self._pending.clear()
+
+    def on_trade(self, price: float, qty: float, ts: int):
+        c = self.candle
+        if c is None:
+            return
+
+        open_time = ts - ts % self.interval_ms
+
+        if open_time < c.open_time:
+            return
+
+        if open_time > c.open_time:
+            # Rollover: o trade abre o candle seguinte
+            self.candle = Candle(open_time, price, price, price, price, qty)
+            self.closed = False
+            self._pending.clear()
+        elif self.closed:
+            return
+        else:
+            if price > c.high:
+                c.high = price
+            if price < c.low:
+                c.low = price
+            c.close = price
+            c.volume += qty
+
+        self._pending.append((ts, price, qty))
+        self.dirty = True
+
+    def on_kline(self, kline: Candle, event_ts: int, closed: bool) -> bool:
+        """
+        Reconcilia com um kline.
+
+        :return: True se o kline se refere ao candle atual (ou mais
+                 recente) e passou a ser a base do builder
+        """
+        c = self.candle
+        if c is not None and kline.open_time < c.open_time:
+            return False
+
+        base = replace(kline)
+
+        # Trades ainda não refletidos no kline
+        if not closed:
+            for ts, price, qty in self._pending:
+                if ts > event_ts and ts - ts % self.interval_ms == base.open_time:
+                    base.high = max(base.high, price)
+                    base.low = min(base.low, price)
+                    base.close = price
+                    base.volume += qty
+
+        # Replay só precisa dos trades posteriores a este checkpoint
+        while self._pending and self._pending[0][0] <= event_ts:
+            self._pending.popleft()
+
+        self.candle = base
+        self.closed = closed
+        self.dirty = not closed
+        return True
+
+    # ======================================================
+    # SAÍDA
+    # ======================================================
+
+    def take(self) -> Optional[Candle]:
+        """
+        Cópia do candle em formação se mudou desde a última chamada.
+        """
+        if not self.dirty or self.candle is None:
+            return None
+        self.dirty = False
+        return replace(self.candle)
@@ -0,0 +1,236 @@
+# ==========================================================
+# CANDLE STORE (HISTÓRICO PROFUNDO EM DISCO)
+# ==========================================================
+# Responsável por:
+# - guardar candles fechados por (símbolo, intervalo) em .npy
+#   colunares (linhas T, OPEN, HIGH, LOW, CLOSE, VOLUME, como o
+#   ChartEngine; T em ms)
+# - completar o ficheiro via REST (/api/v3/klines), só o que
+#   falta desde o último candle guardado
+# - abrir os ficheiros em memory-map (backtests / walk-forward
+#   partilham as mesmas páginas entre processos)
+#
+# Uso headless (ferramentas / backtests): update() é síncrono.
+# ==========================================================
+
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+from core.data_engine.models import Candle
+
+
+# Linhas do array colunar (iguais ao ChartEngine)
+T, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+INTERVALS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+
+
+def default_store_dir() -> Path:
+    """
+    Pasta do candle store (por utilizador).
+    """
+    from PySide6.QtCore import QStandardPaths
+
+    base = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+    root = Path(base) if base else Path.home() / ".cache"
+    return root / "OmniFlow" / "candles"
+
+
+def candles_to_array(candles: List[Candle]) -> np.ndarray:
+    """
+    Lista de Candle → array (6, n) no formato do store.
+    """
+    arr = np.empty((6, len(candles)), dtype=np.float64)
+    for i, c in enumerate(candles):
+        arr[:, i] = (c.open_time, c.open, c.high, c.low, c.close, c.volume)
+    return arr
+
+
+def gaps(arr: np.ndarray, interval_ms: int) -> List[Tuple[int, int]]:
+    """
+    Buracos internos [início, fim) onde T não avança um intervalo.
+    """
+    if arr.shape[1] < 2:
+        return []
+    t = arr[T]
+    idx = np.flatnonzero(np.diff(t) != interval_ms)
+    return [(int(t[i]) + interval_ms, int(t[i + 1])) for i in idx if t[i + 1] > t[i] + interval_ms]
+
+
+class CandleStore:
+    """
+    Candles fechados em disco, um ficheiro por (símbolo, intervalo).
+
+    - load(): array (6, n) (mmap opcional, só leitura)
+    - update(): acrescenta o que falta até ao último candle fechado
+    """
+
+    BASE_URL = "https://api.binance.com"
+
+    def __init__(self, root: Optional[Path] = None):
+        self._logger = logging.getLogger(__name__)
+        self.root = Path(root) if root else default_store_dir()
+
+    def path(self, symbol: str, interval: str) -> Path:
+        return self.root / symbol.upper() / f"{interval}.npy"
+
+    # ======================================================
+    # LEITURA / ESCRITA
+    # ======================================================
+
+    def load(self, symbol: str, interval: str, mmap: bool = False) -> np.ndarray:
+        path = self.path(symbol, interval)
+        if not path.exists():
+            return np.empty((6, 0), dtype=np.float64)
+        return np.load(path, mmap_mode="r" if mmap else None)
+
+    def save(self, symbol: str, interval: str, arr: np.ndarray):
+        """
+        Escrita atómica (ficheiro temporário + replace).
+        """
+        path = self.path(symbol, interval)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npy")
+        np.save(tmp, np.ascontiguousarray(arr, dtype=np.float64))
+        os.replace(tmp, path)
+
+    # ======================================================
+    # ATUALIZAÇÃO VIA REST
+    # ======================================================
+
+    def update(
+        self,
+        symbol: str,
+        interval: str,
+        days: float,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> np.ndarray:
+        """
+        Garante os últimos `days` dias de candles fechados.
+
+        Só pede o que falta: antes do 1º candle guardado (backfill),
+        os buracos internos (gaps()) e depois do último. Um download
+        interrompido só é gravado se ficar colado aos dados já
+        guardados (o resto volta a ser pedido no próximo update).
+        Sem rede, devolve o que já existe.
+        """
+        interval_ms = INTERVALS[interval]
+        end_ms = (int(time.time() * 1000) // interval_ms) * interval_ms
+        start_ms = end_ms - int(days * 86_400_000)
+
+        # (início, fim, colado à esquerda a dados guardados)
+        arr = self.load(symbol, interval)
+        if arr.shape[1]:
+            first, last = int(arr[T, 0]), int(arr[T, -1])
+            ranges = (
+                [(start_ms, first, False)]
+                + [(lo, hi, True) for lo, hi in gaps(arr, interval_ms)]
+                + [(last + interval_ms, end_ms, True)]
+            )
+        else:
+            ranges = [(start_ms, end_ms, True)]
+        ranges = [r for r in ranges if r[0] < r[1]]
+
+        # Progresso agregado de todos os intervalos
+        expected = max(1, sum((hi - lo) // interval_ms for lo, hi, _ in ranges))
+        received = 0
+
+        def on_progress(done, _total):
+            if progress:
+                progress(min(received + done, expected), expected)
+
+        parts = [arr]
+        for lo, hi, anchored in ranges:
+            rows, complete = asyncio.run(
+                self._fetch(symbol.upper(), interval, interval_ms, lo, hi, on_progress)
+            )
+            received += (hi - lo) // interval_ms
+            # Incompleto: só serve se continuar dados já guardados
+            # (buraco interno / cauda); o backfill do início ficaria solto
+            if rows.shape[1] and (complete or anchored):
+                parts.append(rows)
+
+        if len(parts) > 1:
+            arr = np.concatenate(parts, axis=1)
+            _, keep = np.unique(arr[T], return_index=True)
+            arr = arr[:, keep]
+            self.save(symbol, interval, arr)
+
+        holes = gaps(arr, interval_ms)
+        if holes:
+            self._logger.warning(
+                "Candle store %s %s: %d gaps (%d candles missing)",
+                symbol, interval, len(holes),
+                sum((hi - lo) // interval_ms for lo, hi in holes),
+            )
+
+        return arr
+
+    async def _fetch(
+        self, symbol, interval, interval_ms, start_ms, end_ms, progress
+    ) -> Tuple[np.ndarray, bool]:
+        """
+        Candles de [start_ms, end_ms) e se o intervalo foi percorrido
+        até ao fim (False → erro HTTP / rede a meio).
+        """
+        url = f"{self.BASE_URL}/api/v3/klines"
+        expected = max(1, (end_ms - start_ms) // interval_ms)
+        pages: List[np.ndarray] = []
+        received = 0
+        cursor = start_ms
+        complete = True
+
+        async with aiohttp.ClientSession() as session:
+            while cursor < end_ms:
+                params = {
+                    "symbol": symbol,
+                    "interval": interval,
+                    "startTime": cursor,
+                    "endTime": end_ms - 1,
+                    "limit": 1000,
+                }
+                try:
+                    async with session.get(url, params=params) as resp:
+                        if resp.status != 200:
+                            self._logger.warning("klines %s HTTP %s", symbol, resp.status)
+                            complete = False
+                            break
+                        page = await resp.json()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self._logger.warning("klines %s failed: %s", symbol, e)
+                    complete = False
+                    break
+
+                # Sem candles até end_ms (ex: par listado depois)
+                if not page:
+                    break
+
+                rows = np.array([k[:6] for k in page], dtype=np.float64).T
+                rows = rows[:, rows[T] + interval_ms <= end_ms]
+                pages.append(rows)
+
+                received += rows.shape[1]
+                if progress:
+                    progress(min(received, expected), expected)
+
+                cursor = int(page[-1][0]) + interval_ms
+
+        self._logger.info("Candle store %s %s: +%d candles", symbol, interval, received)
+        if not pages:
+            return np.empty((6, 0), dtype=np.float64), complete
+        return np.concatenate(pages, axis=1), complete
+
@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+
+import numpy as np
 
 # Modelos base (tipos de dados puros)
 from core.data_engine.models import Candle, Trade, OrderBookSnapshot
@@ -94,6 +96,49 @@ class TradeEvent:
     trade: Trade
 
 
+# ============================================================
+# Footprint histórico
+# ============================================================
+
+@dataclass
+class FootprintHistoryBatch:
+    """
+    Lote de buckets de footprint reconstruídos a partir de aggTrades.
+
+    Emitido pelo FootprintReconstructor (thread próprio).
+
+    buckets:
+    - Lista de tuples (open_time_ms, buy, sell)
+    - buy / sell: { tick : quantidade } com tick = round(price / tick_size)
+    """
+    symbol: str
+    timeframe_ms: int
+    tick_size: float
+    buckets: List[Tuple[int, Dict[int, float], Dict[int, float]]]
+
+
+# ============================================================
+# Histórico em chunks (perfis de sessão)
+# ============================================================
+
+@dataclass
+class CandleChunk:
+    """
+    Bloco de candles fechados em formato colunar.
+
+    Emitido pelo SessionHistoryLoader (thread próprio) e
+    agregado em streaming pelo SessionProfileStore.
+
+    Arrays NumPy alinhados (mesmo comprimento, ordenados por open_time).
+    """
+    symbol: str
+    interval_ms: int
+    open_time: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    volume: np.ndarray
+
+
 # ============================================================
 # Order Book / Depth (DOM)
 # ============================================================
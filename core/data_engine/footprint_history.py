@@ -0,0 +1,374 @@
+# ==========================================================
+# FOOTPRINT HISTORY (RECONSTRUÇÃO VIA aggTrades)
+# ==========================================================
+# Responsável por:
+# - Reconstruir buckets de footprint de candles históricos
+#   a partir de /api/v3/aggTrades (REST)
+# - Limitar a concorrência de requests (semáforo)
+# - Persistir cada bucket fechado em disco (cache JSON)
+# - Reportar progresso via sinais Qt
+#
+# Tal como o BinanceProvider:
+# - corre num thread dedicado com asyncio
+# - nunca bloqueia a UI (resultados chegam por sinais queued)
+# ==========================================================
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+from PySide6.QtCore import QObject, QStandardPaths, Signal
+
+from core.data_engine.events import FootprintHistoryBatch
+
+
+def default_cache_dir() -> Path:
+    """
+    Pasta de cache do footprint histórico (por utilizador).
+    """
+    base = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+    root = Path(base) if base else Path.home() / ".cache"
+    return root / "OmniFlow" / "footprint"
+
+
+class FootprintReconstructor(QObject):
+    """
+    Reconstrutor de footprint histórico.
+
+    Pipeline por bucket (candle fechado):
+    1️⃣ Cache em disco → emitido imediatamente
+    2️⃣ REST aggTrades (paginado por fromId) → binning por tick
+    3️⃣ Resultado gravado em disco e emitido em batch
+
+    Os resultados são entregues em lotes (FootprintHistoryBatch)
+    para limitar o nº de sinais cruzando para o thread da UI.
+    """
+
+    # ------------------------------------------------------
+    # SINAIS PÚBLICOS (QT)
+    # ------------------------------------------------------
+
+    buckets_ready = Signal(object)   # FootprintHistoryBatch
+    progress = Signal(int, int)      # (concluídos, total)
+
+    BASE_URL = "https://api.binance.com"
+
+    # Janela máxima de startTime/endTime do /aggTrades
+    WINDOW_MS = 3_600_000
+
+    def __init__(
+        self,
+        parent=None,
+        cache_dir: Optional[Path] = None,
+        max_concurrency: int = 4,
+        tick_size: float = 0.01,
+        batch_size: int = 8,
+    ):
+        super().__init__(parent)
+
+        self._logger = logging.getLogger(__name__)
+
+        self._cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self._max_concurrency = max_concurrency
+        self._tick_size = tick_size
+        self._batch_size = batch_size
+
+        # Thread + loop asyncio (lazy)
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+
+        # Jobs ativos (para cancelamento)
+        self._jobs: List[Future] = []
+
+        # Progresso agregado de todos os jobs ativos
+        self._lock = threading.Lock()
+        self._done = 0
+        self._total = 0
+
+    # ======================================================
+    # API PÚBLICA (THREAD DA UI)
+    # ======================================================
+
+    def request(self, symbol: str, timeframe_ms: int, open_times: List[int]):
+        """
+        Agenda a reconstrução de buckets fechados.
+        Buckets mais recentes são processados primeiro.
+        """
+        if not open_times:
+            return
+
+        self._ensure_thread()
+
+        with self._lock:
+            self._total += len(open_times)
+
+        fut = asyncio.run_coroutine_threadsafe(
+            self._run_job(
+                symbol.upper(),
+                timeframe_ms,
+                sorted(set(open_times), reverse=True),
+            ),
+            self._loop,
+        )
+        self._jobs = [j for j in self._jobs if not j.done()] + [fut]
+        self._emit_progress()
+
+    def cancel(self):
+        """
+        Cancela todos os jobs em curso (ex: mudança de símbolo/timeframe).
+        Resultados ainda em trânsito são descartados pelo consumidor.
+        """
+        for job in self._jobs:
+            job.cancel()
+        self._jobs.clear()
+
+        with self._lock:
+            self._done = 0
+            self._total = 0
+        self._emit_progress()
+
+    def stop(self):
+        """
+        Para o thread de reconstrução.
+        """
+        self.cancel()
+        if self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(1.0)
+            self._thread = None
+
+    # ======================================================
+    # THREAD / LOOP
+    # ======================================================
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._ready.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="FootprintHistory",
+            daemon=True,
+        )
+        self._thread.start()
+        self._ready.wait(timeout=5)
+
+    def _run(self):
+        """
+        Entry point do thread: loop asyncio próprio, sempre vivo.
+        """
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._ready.set()
+
+        try:
+            loop.run_forever()
+        except Exception as e:
+            self._logger.exception("FootprintReconstructor crashed: %s", e)
+        finally:
+            loop.close()
+
+    # ======================================================
+    # JOB
+    # ======================================================
+
+    async def _run_job(self, symbol: str, timeframe_ms: int, open_times: List[int]):
+        pending: List[Tuple[int, Dict[int, float], Dict[int, float]]] = []
+
+        async with aiohttp.ClientSession() as session:
+
+            async def one(open_time: int):
+                result = self._read_cache(symbol, timeframe_ms, open_time)
+                if result is None:
+                    async with self._semaphore:
+                        result = await self._fetch_bucket(
+                            session, symbol, open_time, open_time + timeframe_ms
+                        )
+                    # Só buckets completos e já fechados vão para o disco
+                    closed = open_time + timeframe_ms <= time.time() * 1000
+                    if result is not None and closed:
+                        self._write_cache(symbol, timeframe_ms, open_time, result)
+
+                with self._lock:
+                    self._done += 1
+
+                if result is not None:
+                    pending.append((open_time, result[0], result[1]))
+
+                if len(pending) >= self._batch_size:
+                    self._flush(symbol, timeframe_ms, pending)
+
+                self._emit_progress()
+
+            results = await asyncio.gather(
+                *(one(t) for t in open_times),
+                return_exceptions=True,
+            )
+
+        for r in results:
+            if isinstance(r, Exception):
+                self._logger.warning("Footprint bucket failed: %s", r)
+
+        self._flush(symbol, timeframe_ms, pending)
+
+    def _flush(self, symbol: str, timeframe_ms: int, pending: list):
+        if not pending:
+            return
+        self.buckets_ready.emit(
+            FootprintHistoryBatch(
+                symbol=symbol,
+                timeframe_ms=timeframe_ms,
+                tick_size=self._tick_size,
+                buckets=list(pending),
+            )
+        )
+        pending.clear()
+
+    def _emit_progress(self):
+        with self._lock:
+            done, total = self._done, self._total
+            if total and done >= total:
+                # Tudo concluído → reset para o próximo pedido
+                self._done = self._total = 0
+        self.progress.emit(done, total)
+
+    # ======================================================
+    # REST: aggTrades
+    # ======================================================
+
+    async def _fetch_bucket(
+        self,
+        session: aiohttp.ClientSession,
+        symbol: str,
+        start_ms: int,
+        end_ms: int,
+    ) -> Optional[Tuple[Dict[int, float], Dict[int, float]]]:
+        """
+        Busca todas as aggTrades de [start_ms, end_ms) e faz o binning.
+
+        Paginação por janelas de 1h (limite do startTime/endTime):
+        - 1ª página da janela por startTime/endTime
+        - seguintes por fromId até passar o fim da janela
+        - uma página curta só termina a janela, não o bucket
+
+        Devolve None se o intervalo não foi coberto até end_ms
+        (erro / timeout) → o bucket não é gravado em cache.
+        """
+        url = f"{self.BASE_URL}/api/v3/aggTrades"
+        rows: List[dict] = []
+        window_start = start_ms
+
+        try:
+            while window_start < end_ms:
+                window_end = min(end_ms, window_start + self.WINDOW_MS)
+                params = {
+                    "symbol": symbol,
+                    "startTime": window_start,
+                    "endTime": window_end - 1,
+                    "limit": 1000,
+                }
+
+                while True:
+                    async with session.get(url, params=params) as resp:
+                        if resp.status != 200:
+                            self._logger.warning(
+                                "aggTrades %s HTTP %s", symbol, resp.status
+                            )
+                            return None
+                        page = await resp.json()
+
+                    inside = [r for r in page if r["T"] < window_end]
+                    rows.extend(inside)
+
+                    # Página curta ou já para lá da janela → janela completa
+                    if len(page) < 1000 or len(inside) < len(page):
+                        break
+
+                    params = {
+                        "symbol": symbol,
+                        "fromId": page[-1]["a"] + 1,
+                        "limit": 1000,
+                    }
+
+                window_start = window_end
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._logger.warning("aggTrades %s failed: %s", symbol, e)
+            return None
+
+        return self._bin(rows)
+
+    def _bin(self, rows: List[dict]) -> Tuple[Dict[int, float], Dict[int, float]]:
+        """
+        Binning vetorizado por tick (buy / sell agressor).
+        """
+        if not rows:
+            return {}, {}
+
+        prices = np.array([float(r["p"]) for r in rows])
+        qtys = np.array([float(r["q"]) for r in rows])
+        is_buy = np.array([not r["m"] for r in rows])
+
+        ticks = np.rint(prices / self._tick_size).astype(np.int64)
+
+        out = []
+        for mask in (is_buy, ~is_buy):
+            uniq, inv = np.unique(ticks[mask], return_inverse=True)
+            sums = np.bincount(inv, weights=qtys[mask], minlength=len(uniq))
+            out.append({int(t): float(q) for t, q in zip(uniq, sums)})
+
+        return out[0], out[1]
+
+    # ======================================================
+    # CACHE EM DISCO
+    # ======================================================
+
+    def _cache_path(self, symbol: str, timeframe_ms: int, open_time: int) -> Path:
+        return self._cache_dir / symbol / str(timeframe_ms) / f"{open_time}.json"
+
+    def _read_cache(self, symbol: str, timeframe_ms: int, open_time: int):
+        path = self._cache_path(symbol, timeframe_ms, open_time)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text())
+            if abs(float(data.get("tick_size", 0)) - self._tick_size) > 1e-12:
+                return None
+            return (
+                {int(k): float(v) for k, v in data["buy"].items()},
+                {int(k): float(v) for k, v in data["sell"].items()},
+            )
+        except (OSError, ValueError, KeyError) as e:
+            self._logger.warning("Invalid footprint cache %s: %s", path, e)
+            return None
+
+    def _write_cache(self, symbol: str, timeframe_ms: int, open_time: int, result):
+        path = self._cache_path(symbol, timeframe_ms, open_time)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(
+                json.dumps(
+                    {
+                        "tick_size": self._tick_size,
+                        "saved_at": int(time.time() * 1000),
+                        "buy": result[0],
+                        "sell": result[1],
+                    }
+                )
+            )
+            tmp.replace(path)
+        except OSError as e:
+            self._logger.warning("Footprint cache write failed %s: %s", path, e)
@@ -4,6 +4,8 @@
 # Responsável por:
 # - Fetch inicial de histórico (REST)
 # - Streams em tempo real (WebSocket)
+# - Candle em formação atualizado pelos trades (CandleBuilder),
+#   com os klines como checkpoint de reconciliação
 # - Emitir eventos para o CoreDataEngine
 #
 # Este provider é desenhado para:
@@ -25,6 +27,7 @@ import websockets
 # MODELOS + EVENTOS
 # ==========================================================
 
+from core.data_engine.candle_builder import INTERVAL_MS, CandleBuilder
 from core.data_engine.models import Candle, Trade
 from core.data_engine.events import (
     CandleHistory,
@@ -43,8 +46,12 @@ class BinanceProvider:
     Pipeline:
     1️⃣ REST → histórico inicial (candles)
     2️⃣ WS   → trades + candles em tempo real
+    3️⃣ trades → candle em formação (emitido no máximo 1x por frame)
     """
 
+    # Intervalo mínimo entre CandleUpdates do candle em formação (s)
+    FRAME_S = 1 / 60
+
     def __init__(self, engine):
         self.engine = engine
         self._logger = logging.getLogger(__name__)
@@ -63,6 +70,9 @@ class BinanceProvider:
         self._symbol = None
         self._timeframe = None
 
+        # Candle em formação (trades + klines)
+        self._builder: Optional[CandleBuilder] = None
+
     # ======================================================
     # START / STOP
     # ======================================================
@@ -120,6 +130,7 @@ class BinanceProvider:
 
         async with aiohttp.ClientSession() as session:
             self._session = session
+            self._builder = CandleBuilder(INTERVAL_MS[timeframe])
 
             # 1️⃣ PREFETCH (HISTÓRICO)
             await self._prefetch(symbol, timeframe)
@@ -128,6 +139,7 @@ class BinanceProvider:
             tasks = [
                 asyncio.create_task(self._trade_stream(symbol)),
                 asyncio.create_task(self._kline_stream(symbol, timeframe)),
+                asyncio.create_task(self._candle_pump(symbol, timeframe)),
             ]
 
             self._logger.info("Binance streams started for %s %s", symbol, timeframe)
@@ -149,6 +161,10 @@ class BinanceProvider:
         """
         history = await self._fetch_history(symbol, timeframe, limit=900)
 
+        # Último candle (em formação) = base do builder
+        if history:
+            self._builder.seed(history[-1])
+
         # Emite evento para o Core
         self.engine.candle_history.emit(
             CandleHistory(
@@ -237,6 +253,8 @@ class BinanceProvider:
                     TradeEvent(trade=trade)
                 )
 
+                self._builder.on_trade(trade.price, trade.qty, trade.ts)
+
     # ======================================================
     # STREAM: CANDLES (KLINES)
     # ======================================================
@@ -274,11 +292,42 @@ class BinanceProvider:
                     volume=float(k["v"]),
                 )
 
-                self.engine.candle_update.emit(
-                    CandleUpdate(
-                        symbol=symbol,
-                        timeframe=timeframe,
-                        candle=candle,
-                        closed=k["x"],
+                closed = bool(k["x"])
+                current = self._builder.on_kline(candle, int(data["E"]), closed)
+
+                # Candle em formação → emitido pelo _candle_pump
+                # (fechos e klines de candles anteriores vão já)
+                if closed or not current:
+                    self.engine.candle_update.emit(
+                        CandleUpdate(
+                            symbol=symbol,
+                            timeframe=timeframe,
+                            candle=candle,
+                            closed=closed,
+                        )
                     )
+
+    # ======================================================
+    # CANDLE EM FORMAÇÃO (FRAME RATE)
+    # ======================================================
+
+    async def _candle_pump(self, symbol: str, timeframe: str):
+        """
+        Emite o candle em formação quando mudou, no máximo 1x por frame.
+        A latência passa a ser a dos trades (não a dos klines).
+        """
+        while self._running:
+            await asyncio.sleep(self.FRAME_S)
+
+            candle = self._builder.take()
+            if candle is None:
+                continue
+
+            self.engine.candle_update.emit(
+                CandleUpdate(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    candle=candle,
+                    closed=False,
                 )
+            )
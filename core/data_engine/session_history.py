@@ -0,0 +1,167 @@
+# ==========================================================
+# SESSION HISTORY (CANDLES EM CHUNKS PARA PERFIS DE SESSÃO)
+# ==========================================================
+# Responsável por:
+# - Buscar vários dias de klines via REST (/api/v3/klines)
+# - Entregar o histórico em chunks colunares (NumPy)
+#   para agregação em streaming (SessionProfileStore)
+#
+# Tal como o BinanceProvider:
+# - corre num thread dedicado com asyncio
+# - nunca bloqueia a UI (resultados chegam por sinais queued)
+# ==========================================================
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+import aiohttp
+import numpy as np
+
+from PySide6.QtCore import QObject, Signal
+
+from core.data_engine.events import CandleChunk
+
+
+class SessionHistoryLoader(QObject):
+    """
+    Loader de histórico para perfis de sessão / composites.
+
+    - pagina /klines por startTime (1000 candles por pedido)
+    - só candles fechados (o candle em formação chega pelo stream)
+    - um pedido novo cancela o anterior (ex: mudança de símbolo)
+    """
+
+    # ------------------------------------------------------
+    # SINAIS PÚBLICOS (QT)
+    # ------------------------------------------------------
+
+    chunk_ready = Signal(object)   # CandleChunk
+    progress = Signal(int, int)    # (candles recebidos, candles esperados)
+
+    BASE_URL = "https://api.binance.com"
+
+    INTERVALS = {
+        "1m": 60_000,
+        "5m": 300_000,
+        "15m": 900_000,
+        "1h": 3_600_000,
+    }
+
+    def __init__(self, parent=None, interval: str = "5m"):
+        super().__init__(parent)
+
+        self._logger = logging.getLogger(__name__)
+
+        self.interval = interval
+        self.interval_ms = self.INTERVALS[interval]
+
+        self._thread: Optional[threading.Thread] = None
+
+        # Geração do pedido ativo (pedidos antigos terminam sozinhos)
+        self._generation = 0
+
+    # ======================================================
+    # API PÚBLICA (THREAD DA UI)
+    # ======================================================
+
+    def request(self, symbol: str, days: int):
+        """
+        Agenda o download dos últimos `days` dias de candles fechados.
+        """
+        self._generation += 1
+        generation = self._generation
+
+        end_ms = (int(time.time() * 1000) // self.interval_ms) * self.interval_ms
+        start_ms = end_ms - days * 86_400_000
+
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(generation, symbol.upper(), start_ms, end_ms),
+            name="SessionHistory",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def cancel(self):
+        self._generation += 1
+
+    def stop(self):
+        """
+        Cancela o pedido ativo e espera pelo thread (fecho da app).
+        A paginação termina no fim da página em curso.
+        """
+        self.cancel()
+        if self._thread:
+            self._thread.join(1.0)
+            self._thread = None
+
+    # ======================================================
+    # THREAD ENTRYPOINT
+    # ======================================================
+
+    def _run(self, generation: int, symbol: str, start_ms: int, end_ms: int):
+        try:
+            asyncio.run(self._fetch(generation, symbol, start_ms, end_ms))
+        except Exception as e:
+            self._logger.exception("SessionHistoryLoader crashed: %s", e)
+
+    # ======================================================
+    # REST: klines
+    # ======================================================
+
+    async def _fetch(self, generation: int, symbol: str, start_ms: int, end_ms: int):
+        url = f"{self.BASE_URL}/api/v3/klines"
+        expected = max(1, (end_ms - start_ms) // self.interval_ms)
+        received = 0
+        cursor = start_ms
+
+        async with aiohttp.ClientSession() as session:
+            while cursor < end_ms and generation == self._generation:
+                params = {
+                    "symbol": symbol,
+                    "interval": self.interval,
+                    "startTime": cursor,
+                    "endTime": end_ms - 1,
+                    "limit": 1000,
+                }
+                try:
+                    async with session.get(url, params=params) as resp:
+                        if resp.status != 200:
+                            self._logger.warning("klines %s HTTP %s", symbol, resp.status)
+                            return
+                        page = await resp.json()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self._logger.warning("klines %s failed: %s", symbol, e)
+                    return
+
+                if not page:
+                    break
+
+                # Colunas: open_time, high, low, volume
+                arr = np.array([(k[0], k[2], k[3], k[5]) for k in page], dtype=np.float64)
+                arr = arr[arr[:, 0] + self.interval_ms <= end_ms]
+
+                if generation != self._generation:
+                    return
+
+                if len(arr):
+                    self.chunk_ready.emit(
+                        CandleChunk(
+                            symbol=symbol,
+                            interval_ms=self.interval_ms,
+                            open_time=arr[:, 0].astype(np.int64),
+                            high=arr[:, 1],
+                            low=arr[:, 2],
+                            volume=arr[:, 3],
+                        )
+                    )
+
+                received += len(arr)
+                self.progress.emit(min(received, expected), expected)
+
+                cursor = int(page[-1][0]) + self.interval_ms
+
+        self._logger.info("Session history %s: %d candles", symbol, received)
@@ -1,3 +1,7 @@
+import heapq
+from collections import deque
+from typing import Optional, Tuple
+
 import numpy as np
 
 
@@ -47,3 +51,168 @@ def clamp_prices(values, band: float = 0.6):
 
     # Retornar apenas os limites (filtragem acontece fora)
     return lower, upper
+
+
+class RollingMedian:
+    """
+    Mediana móvel das últimas `window` entradas.
+
+    Duas heaps (max-heap da metade inferior, min-heap da superior)
+    com remoção preguiçosa das entradas que saem da janela:
+    - push: O(log n)
+    - median: O(1) amortizado
+
+    As entradas mortas são descartadas quando chegam ao topo; se se
+    acumularem (> 2x a janela) as heaps são reconstruídas (O(n) raro).
+    """
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self.clear()
+
+    def clear(self):
+        self._lo = []            # (-x, seq) → max-heap
+        self._hi = []            # (x, seq)  → min-heap
+        self._n_lo = 0
+        self._n_hi = 0
+        self._where = {}         # seq → 0 (lo) / 1 (hi)
+        self._dead = set()
+        self._fifo = deque()     # (seq) pela ordem de chegada
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return self._n_lo + self._n_hi
+
+    # --------------------------
+    # OPERAÇÕES
+    # --------------------------
+
+    def push(self, x: float):
+        seq = self._seq
+        self._seq += 1
+
+        self._prune(self._lo)
+        if not self._n_lo or x <= -self._lo[0][0]:
+            heapq.heappush(self._lo, (-x, seq))
+            self._where[seq] = 0
+            self._n_lo += 1
+        else:
+            heapq.heappush(self._hi, (x, seq))
+            self._where[seq] = 1
+            self._n_hi += 1
+
+        self._fifo.append(seq)
+        if len(self._fifo) > self.window:
+            self._evict(self._fifo.popleft())
+
+        self._rebalance()
+
+        if len(self._lo) + len(self._hi) > 2 * self.window:
+            self._rebuild()
+
+    def median(self) -> Optional[float]:
+        if not len(self):
+            return None
+        self._prune(self._lo)
+        self._prune(self._hi)
+        if self._n_lo > self._n_hi:
+            return -self._lo[0][0]
+        return (-self._lo[0][0] + self._hi[0][0]) / 2.0
+
+    # --------------------------
+    # INTERNOS
+    # --------------------------
+
+    def _evict(self, seq: int):
+        side = self._where.pop(seq)
+        self._dead.add(seq)
+        if side == 0:
+            self._n_lo -= 1
+        else:
+            self._n_hi -= 1
+
+    def _prune(self, heap):
+        while heap and heap[0][1] in self._dead:
+            self._dead.discard(heapq.heappop(heap)[1])
+
+    def _rebalance(self):
+        while self._n_lo > self._n_hi + 1:
+            self._prune(self._lo)
+            neg, seq = heapq.heappop(self._lo)
+            heapq.heappush(self._hi, (-neg, seq))
+            self._where[seq] = 1
+            self._n_lo -= 1
+            self._n_hi += 1
+        while self._n_hi > self._n_lo:
+            self._prune(self._hi)
+            x, seq = heapq.heappop(self._hi)
+            heapq.heappush(self._lo, (-x, seq))
+            self._where[seq] = 0
+            self._n_hi -= 1
+            self._n_lo += 1
+
+    def _rebuild(self):
+        self._lo = [e for e in self._lo if e[1] not in self._dead]
+        self._hi = [e for e in self._hi if e[1] not in self._dead]
+        heapq.heapify(self._lo)
+        heapq.heapify(self._hi)
+        self._dead.clear()
+
+
+class OutlierGuard:
+    """
+    Versão incremental do clamp_prices.
+
+    A banda é centrada na mediana móvel dos últimos `window` preços
+    observados (em vez da mediana de toda a série):
+    - spikes isolados ficam fora (a mediana ignora < 50% de outliers)
+    - uma mudança de nível real arrasta a mediana → não bloqueia
+    - histórico: filtrado uma vez, O(n log w)
+    - cada update: verificação O(1) + push O(log w)
+    """
+
+    def __init__(self, band: float = 0.6, window: int = 21):
+        self.band = band
+        self._median = RollingMedian(window)
+
+    def clear(self):
+        self._median.clear()
+
+    def bounds(self) -> Tuple[Optional[float], Optional[float]]:
+        median = self._median.median()
+        if median is None:
+            return None, None
+        return median * (1 - self.band / 2), median * (1 + self.band / 2)
+
+    def accepts(self, price: float) -> bool:
+        lower, upper = self.bounds()
+        return lower is None or lower <= price <= upper
+
+    def add(self, price: float):
+        self._median.push(price)
+
+    def filter_history(self, values) -> np.ndarray:
+        """
+        Reinicia o guard e filtra uma série cronológica.
+        Cada preço é comparado com a mediana dos `window` anteriores
+        (vetorizado com sliding_window_view; só o arranque é em loop).
+
+        :return: máscara booleana dos preços aceites
+        """
+        self.clear()
+        arr = np.asarray(values, dtype=float)
+        w = self._median.window
+
+        med = np.full(arr.size, np.nan)
+        for i in range(1, min(w, arr.size)):
+            med[i] = np.median(arr[:i])
+        if arr.size > w:
+            windows = np.lib.stride_tricks.sliding_window_view(arr[:-1], w)
+            med[w:] = np.median(windows, axis=1)
+
+        half = self.band / 2
+        mask = np.isnan(med) | ((arr >= med * (1 - half)) & (arr <= med * (1 + half)))
+
+        for price in arr[-w:].tolist():
+            self.add(price)
+        return mask
@@ -0,0 +1,290 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+from core.row_size import rebin_sparse
+
+
+# ==========================================================
+# FOOTPRINT BUCKET (UM CANDLE)
+# ==========================================================
+
+class FootprintBucket:
+    """
+    Volume agressor por nível de preço dentro de um candle.
+
+    Os níveis são guardados em ticks inteiros (price / tick_size),
+    em dicionários esparsos: só existem níveis efetivamente negociados.
+
+    Agregados por linha (N ticks) são calculados na hora e guardados
+    em cache até o bucket voltar a mudar. Os níveis são mantidos
+    ordenados para a vista fazer bisect ao intervalo visível.
+    """
+
+    __slots__ = ("open_time", "buy", "sell", "lo", "hi", "_ticks", "_rows")
+
+    def __init__(self, open_time: int):
+        self.open_time = open_time
+        self.buy: Dict[int, float] = {}
+        self.sell: Dict[int, float] = {}
+
+        # Extremos (ticks) negociados no bucket
+        self.lo: Optional[int] = None
+        self.hi: Optional[int] = None
+
+        # Ticks negociados, ordenados
+        self._ticks: List[int] = []
+
+        # Cache do rebinning: (row_ticks, buy, sell, linhas ordenadas)
+        self._rows: Optional[Tuple[int, Dict[int, float], Dict[int, float], List[int]]] = None
+
+    def add(self, tick: int, qty: float, is_buy: bool):
+        if tick not in self.buy and tick not in self.sell:
+            insort(self._ticks, tick)
+
+        side = self.buy if is_buy else self.sell
+        side[tick] = side.get(tick, 0.0) + qty
+        self._rows = None
+
+        if self.lo is None or tick < self.lo:
+            self.lo = tick
+        if self.hi is None or tick > self.hi:
+            self.hi = tick
+
+    def replace(self, buy: Dict[int, float], sell: Dict[int, float]):
+        self.buy = dict(buy)
+        self.sell = dict(sell)
+        self._ticks = sorted(self.buy.keys() | self.sell.keys())
+        self.lo = self._ticks[0] if self._ticks else None
+        self.hi = self._ticks[-1] if self._ticks else None
+        self._rows = None
+
+    def rows(self, row_ticks: int) -> Tuple[Dict[int, float], Dict[int, float]]:
+        """
+        buy / sell agregados em linhas de `row_ticks` ticks
+        (chave = tick inicial da linha).
+        """
+        if row_ticks <= 1:
+            return self.buy, self.sell
+
+        cached = self._cached_rows(row_ticks)
+        return cached[1], cached[2]
+
+    def levels(self, row_ticks: int) -> List[int]:
+        """
+        Chaves de rows(row_ticks), por ordem crescente.
+        """
+        if row_ticks <= 1:
+            return self._ticks
+        return self._cached_rows(row_ticks)[3]
+
+    def _cached_rows(self, row_ticks: int):
+        cached = self._rows
+        if cached is None or cached[0] != row_ticks:
+            buy = rebin_sparse(self.buy, row_ticks)
+            sell = rebin_sparse(self.sell, row_ticks)
+            cached = (row_ticks, buy, sell, sorted(buy.keys() | sell.keys()))
+            self._rows = cached
+        return cached
+
+    def __len__(self) -> int:
+        return len(self._ticks)
+
+
+# ==========================================================
+# FOOTPRINT AGGREGATOR (CORE LÓGICO)
+# ==========================================================
+
+class FootprintAggregator:
+    """
+    Store de footprint limitado e incremental.
+
+    Responsável por:
+    - acumular buy/sell por bucket temporal (timeframe) e nível de preço
+    - manter um ring limitado de buckets (max_buckets)
+
+    A vista lê só os buckets visíveis (buckets_between), por isso
+    um refresh custa O(células visíveis) e não O(buckets × níveis).
+    """
+
+    def __init__(
+        self,
+        max_buckets: int = 600,
+        tick_size: float = 0.01,
+    ):
+        self.timeframe_ms = 60_000
+        self.symbol = "BTCUSDT"
+        self.tick_size = tick_size
+
+        # Ring de buckets: { bucket_time_ms : FootprintBucket }
+        self.max_buckets = max_buckets
+        self.cells: Dict[int, FootprintBucket] = {}
+
+        # Chaves ordenadas (quase sempre append no fim)
+        self._keys: List[int] = []
+
+        # Último preço negociado (centro da vista)
+        self.last_tick: Optional[int] = None
+
+        # Extremos (ticks) de todo o ring — limites da vista
+        self.lo_tick: Optional[int] = None
+        self.hi_tick: Optional[int] = None
+
+
+    # --------------------------
+    # CONFIGURAÇÃO
+    # --------------------------
+
+    def set_timeframe(self, tf: str):
+        """
+        Atualiza timeframe e limpa estado.
+        """
+        mapping = {
+            "1m": 60_000,
+            "5m": 300_000,
+            "15m": 900_000,
+            "1h": 3_600_000,
+            "4h": 14_400_000,
+            "1d": 86_400_000,
+        }
+        self.timeframe_ms = mapping.get(tf.lower(), 60_000)
+        self.clear()
+
+    def set_symbol(self, symbol: str):
+        """
+        Atualiza símbolo e limpa estado.
+        """
+        self.symbol = symbol.upper()
+        self.clear()
+
+    def clear(self):
+        self.cells.clear()
+        self._keys.clear()
+        self.last_tick = None
+        self.lo_tick = None
+        self.hi_tick = None
+
+
+    # --------------------------
+    # RING DE BUCKETS
+    # --------------------------
+
+    def _bucket(self, open_time: int) -> FootprintBucket:
+        """
+        Devolve (ou cria) o bucket de um candle.
+
+        - Novo bucket no fim → append O(1)
+        - Bucket fora de ordem → inserção ordenada (raro)
+        - Ring excede max_buckets → descarta o mais antigo
+        """
+        bucket = self.cells.get(open_time)
+        if bucket is not None:
+            return bucket
+
+        bucket = FootprintBucket(open_time)
+        self.cells[open_time] = bucket
+
+        if not self._keys or open_time > self._keys[-1]:
+            self._keys.append(open_time)
+        else:
+            insort(self._keys, open_time)
+
+        while len(self._keys) > self.max_buckets:
+            oldest = self._keys.pop(0)
+            self.cells.pop(oldest, None)
+
+        return bucket
+
+    # --------------------------
+    # INGESTÃO DE DADOS
+    # --------------------------
+
+    def add_candles(self, candles):
+        """
+        Garante buckets para os candles históricos mais recentes
+        (no máximo max_buckets).
+        """
+        for c in list(candles)[-self.max_buckets :]:
+            self._bucket(c.open_time)
+
+    def add_candle_update(self, candle, closed: bool):
+        """
+        Garante bucket para candle atual.
+        """
+        self._bucket(candle.open_time)
+
+    def add_trade(self, trade):
+        """
+        Adiciona trade ao footprint.
+        """
+        if trade.symbol.upper() != self.symbol:
+            return
+
+        # Bucket temporal
+        open_time = (trade.ts // self.timeframe_ms) * self.timeframe_ms
+        self.add_volume(
+            open_time,
+            trade.price,
+            trade.qty,
+            trade.side.lower() == "buy",
+        )
+
+    def add_volume(self, open_time: int, price: float, qty: float, is_buy: bool):
+        """
+        Acumula volume agressor num bucket.
+        """
+        if self._keys and open_time < self._keys[0] and len(self._keys) >= self.max_buckets:
+            # Mais antigo que todo o ring → descartado
+            return
+
+        tick = int(round(price / self.tick_size))
+        bucket = self._bucket(open_time)
+        bucket.add(tick, qty, is_buy)
+
+        if open_time >= self._keys[-1]:
+            self.last_tick = tick
+        self._extend_range(tick, tick)
+
+
+    def set_bucket(self, open_time: int, buy: Dict[int, float], sell: Dict[int, float]):
+        """
+        Substitui o conteúdo de um bucket (ex: reconstrução histórica).
+
+        buy / sell já vêm em ticks deste store.
+        """
+        if self._keys and open_time < self._keys[0] and len(self._keys) >= self.max_buckets:
+            return
+
+        bucket = self._bucket(open_time)
+        bucket.replace(buy, sell)
+        if bucket.lo is not None:
+            self._extend_range(bucket.lo, bucket.hi)
+
+    def _extend_range(self, lo: int, hi: int):
+        if self.lo_tick is None or lo < self.lo_tick:
+            self.lo_tick = lo
+        if self.hi_tick is None or hi > self.hi_tick:
+            self.hi_tick = hi
+
+    def missing_buckets(self, open_times) -> List[int]:
+        """
+        Filtra os open_times cujo bucket ainda não tem volume.
+        """
+        return [
+            t for t in open_times
+            if t not in self.cells or self.cells[t].lo is None
+        ]
+
+
+    # --------------------------
+    # OUTPUT PARA UI
+    # --------------------------
+
+    def buckets_between(self, start_ms: int, end_ms: int) -> List[FootprintBucket]:
+        """
+        Buckets com open_time em [start_ms, end_ms], por ordem temporal.
+
+        Custo: O(log buckets + visíveis) — usado pela vista virtualizada.
+        """
+        lo = bisect_left(self._keys, start_ms)
+        hi = bisect_right(self._keys, end_ms)
+        return [self.cells[k] for k in self._keys[lo:hi]]
@@ -0,0 +1,593 @@
+import math
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.chart_engine import ChartEngine, ColumnBuffer
+
+
+# ==========================================================
+# KERNELS VETORIZADOS (HISTÓRICO)
+# ==========================================================
+
+def ema_array(x: np.ndarray, alpha: float, init: float) -> np.ndarray:
+    """
+    y[i] = y[i-1] + alpha * (x[i] - y[i-1]), com y[-1] = init.
+
+    Vetorizado por blocos: dentro de cada bloco a recorrência
+    linear tem forma fechada (pesos (1 - alpha)^k). O tamanho do
+    bloco limita (1 - alpha)^-B a ~1e12 (estabilidade numérica).
+    """
+    n = len(x)
+    out = np.empty(n, dtype=np.float64)
+    if not n:
+        return out
+
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = x
+        return out
+
+    block = max(1, min(n, int(12.0 / -math.log10(decay))))
+    powers = decay ** np.arange(1, block + 1)
+
+    prev = init
+    for s in range(0, n, block):
+        xb = x[s : s + block]
+        m = len(xb)
+        p = powers[:m]
+        # y_j = d^(j+1) * (prev + alpha * Σ_{i≤j} x_i / d^(i+1))
+        out[s : s + m] = p * (prev + alpha * np.cumsum(xb / p))
+        prev = out[s + m - 1]
+
+    return out
+
+
+def wilder_array(x: np.ndarray, n: int) -> np.ndarray:
+    """
+    Média de Wilder (alpha = 1/n) semeada com a SMA dos primeiros n.
+    Valores antes do índice n - 1 ficam NaN.
+    """
+    out = np.full(len(x), np.nan)
+    if len(x) < n:
+        return out
+    seed = float(x[:n].mean())
+    out[n - 1] = seed
+    out[n:] = ema_array(x[n:], 1.0 / n, seed)
+    return out
+
+
+def rolling_sum(x: np.ndarray, n: int) -> np.ndarray:
+    """
+    Soma das janelas [i - n + 1, i] (NaN antes de completar n).
+    """
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        cs = np.concatenate(([0.0], np.cumsum(x)))
+        out[n - 1 :] = cs[n:] - cs[:-n]
+    return out
+
+
+# ==========================================================
+# INDICADORES
+# ==========================================================
+# Contrato:
+# - history(cols) → arrays (um por output), vetorizado, e deixa
+#   o estado "committed" = após o último candle recebido
+# - commit(row) → avança o estado com um candle fechado (O(1))
+# - peek(row)   → valores do candle em formação, sem mexer no estado
+#
+# cols / row seguem as linhas do ChartEngine (T, OPEN, ..., VOLUME).
+# ==========================================================
+
+class Indicator:
+    outputs: Tuple[str, ...] = ("value",)
+
+    def history(self, cols: np.ndarray) -> List[np.ndarray]:
+        raise NotImplementedError
+
+    def commit(self, row: np.ndarray) -> Sequence[float]:
+        raise NotImplementedError
+
+    def peek(self, row: np.ndarray) -> Sequence[float]:
+        raise NotImplementedError
+
+
+class SMA(Indicator):
+    """
+    Média móvel simples dos closes (janela móvel, soma corrente).
+    """
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self._window: deque = deque(maxlen=period)
+        self._sum = 0.0
+
+    def history(self, cols):
+        close = cols[ChartEngine.CLOSE]
+        self._window = deque(close[-self.period :].tolist(), maxlen=self.period)
+        self._sum = math.fsum(self._window)
+        return [rolling_sum(close, self.period) / self.period]
+
+    def _next_sum(self, close: float) -> Tuple[float, bool]:
+        full = len(self._window) == self.period
+        drop = self._window[0] if full else 0.0
+        return self._sum - drop + close, full or len(self._window) + 1 == self.period
+
+    def commit(self, row):
+        close = float(row[ChartEngine.CLOSE])
+        s, ready = self._next_sum(close)
+        self._window.append(close)
+        self._sum = s
+        return (s / self.period if ready else math.nan,)
+
+    def peek(self, row):
+        s, ready = self._next_sum(float(row[ChartEngine.CLOSE]))
+        return (s / self.period if ready else math.nan,)
+
+
+class EMA(Indicator):
+    """
+    Média móvel exponencial dos closes (alpha = 2 / (n + 1)).
+    Semeada com o primeiro close; NaN durante o aquecimento (n - 1).
+    """
+
+    def __init__(self, period: int = 9):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self._value: Optional[float] = None
+        self._count = 0
+
+    def history(self, cols):
+        close = cols[ChartEngine.CLOSE]
+        out = np.full(len(close), np.nan)
+        if len(close):
+            ema = ema_array(close, self.alpha, float(close[0]))
+            out[self.period - 1 :] = ema[self.period - 1 :]
+            self._value = float(ema[-1])
+        else:
+            self._value = None
+        self._count = len(close)
+        return [out]
+
+    def _next(self, close: float) -> float:
+        if self._value is None:
+            return close
+        return self._value + self.alpha * (close - self._value)
+
+    def _show(self, value: float, count: int) -> float:
+        return value if count >= self.period else math.nan
+
+    def commit(self, row):
+        self._value = self._next(float(row[ChartEngine.CLOSE]))
+        self._count += 1
+        return (self._show(self._value, self._count),)
+
+    def peek(self, row):
+        return (self._show(self._next(float(row[ChartEngine.CLOSE])), self._count + 1),)
+
+
+class _Wilder:
+    """
+    Estado O(1) de uma média de Wilder semeada por SMA.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.acc = 0.0
+        self.value = math.nan
+
+    def load(self, x: np.ndarray, smoothed: np.ndarray):
+        self.count = len(x)
+        self.acc = float(x.sum()) if len(x) < self.period else 0.0
+        self.value = float(smoothed[-1]) if len(x) >= self.period else math.nan
+
+    def step(self, v: float) -> Tuple[int, float, float]:
+        """
+        :return: (count, acc, value) depois de acrescentar v (sem mutar)
+        """
+        count = self.count + 1
+        if count < self.period:
+            return count, self.acc + v, math.nan
+        if count == self.period:
+            return count, 0.0, (self.acc + v) / self.period
+        return count, 0.0, self.value + (v - self.value) / self.period
+
+    def commit(self, v: float) -> float:
+        self.count, self.acc, self.value = self.step(v)
+        return self.value
+
+
+class RSI(Indicator):
+    """
+    RSI de Wilder sobre as variações de close.
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._gain = _Wilder(period)
+        self._loss = _Wilder(period)
+        self._prev: Optional[float] = None
+
+    @staticmethod
+    def _rsi(gain, loss):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(loss > 0, 100.0 - 100.0 / (1.0 + gain / loss), 100.0)
+
+    def history(self, cols):
+        close = cols[ChartEngine.CLOSE]
+        out = np.full(len(close), np.nan)
+        self._prev = float(close[-1]) if len(close) else None
+        if len(close) < 2:
+            self._gain, self._loss = _Wilder(self.period), _Wilder(self.period)
+            return [out]
+
+        delta = np.diff(close)
+        gains, losses = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+        ag, al = wilder_array(gains, self.period), wilder_array(losses, self.period)
+        self._gain.load(gains, ag)
+        self._loss.load(losses, al)
+
+        valid = ~np.isnan(ag)
+        out[1:][valid] = self._rsi(ag[valid], al[valid])
+        return [out]
+
+    def _deltas(self, row):
+        close = float(row[ChartEngine.CLOSE])
+        d = 0.0 if self._prev is None else close - self._prev
+        return close, max(d, 0.0), max(-d, 0.0)
+
+    def _value(self, ag, al) -> float:
+        if math.isnan(ag):
+            return math.nan
+        return float(self._rsi(np.float64(ag), np.float64(al)))
+
+    def commit(self, row):
+        close, g, l = self._deltas(row)
+        first = self._prev is None
+        self._prev = close
+        if first:
+            return (math.nan,)
+        return (self._value(self._gain.commit(g), self._loss.commit(l)),)
+
+    def peek(self, row):
+        if self._prev is None:
+            return (math.nan,)
+        _, g, l = self._deltas(row)
+        return (self._value(self._gain.step(g)[2], self._loss.step(l)[2]),)
+
+
+class ATR(Indicator):
+    """
+    Average True Range (Wilder).
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._avg = _Wilder(period)
+        self._prev: Optional[float] = None
+
+    def history(self, cols):
+        high, low, close = cols[ChartEngine.HIGH], cols[ChartEngine.LOW], cols[ChartEngine.CLOSE]
+        tr = high - low
+        if len(close) > 1:
+            prev = close[:-1]
+            tr[1:] = np.maximum.reduce([tr[1:], np.abs(high[1:] - prev), np.abs(low[1:] - prev)])
+        out = wilder_array(tr, self.period)
+        self._avg = _Wilder(self.period)
+        if len(tr):
+            self._avg.load(tr, out)
+        self._prev = float(close[-1]) if len(close) else None
+        return [out]
+
+    def _tr(self, row) -> float:
+        h, l = float(row[ChartEngine.HIGH]), float(row[ChartEngine.LOW])
+        if self._prev is None:
+            return h - l
+        return max(h - l, abs(h - self._prev), abs(l - self._prev))
+
+    def commit(self, row):
+        value = self._avg.commit(self._tr(row))
+        self._prev = float(row[ChartEngine.CLOSE])
+        return (value,)
+
+    def peek(self, row):
+        return (self._avg.step(self._tr(row))[2],)
+
+
+class Bollinger(Indicator):
+    """
+    Bandas de Bollinger: SMA(n) ± k · desvio padrão (populacional).
+
+    Somas correntes de (x - ref) e (x - ref)² com ref = um close
+    do histórico → sem cancelamento catastrófico em preços altos.
+    """
+
+    outputs = ("mid", "upper", "lower")
+
+    def __init__(self, period: int = 20, k: float = 2.0):
+        self.period = period
+        self.k = k
+        self._ref = 0.0
+        self._window: deque = deque(maxlen=period)
+        self._s1 = 0.0
+        self._s2 = 0.0
+
+    def _bands(self, s1, s2):
+        n = self.period
+        mean = s1 / n
+        std = np.sqrt(np.maximum(s2 / n - mean * mean, 0.0))
+        mid = mean + self._ref
+        return mid, mid + self.k * std, mid - self.k * std
+
+    def history(self, cols):
+        close = cols[ChartEngine.CLOSE]
+        self._ref = float(close[-1]) if len(close) else 0.0
+        x = close - self._ref
+
+        self._window = deque(x[-self.period :].tolist(), maxlen=self.period)
+        self._s1 = math.fsum(self._window)
+        self._s2 = math.fsum(v * v for v in self._window)
+
+        return list(self._bands(rolling_sum(x, self.period), rolling_sum(x * x, self.period)))
+
+    def _next(self, close: float):
+        x = close - self._ref
+        full = len(self._window) == self.period
+        drop = self._window[0] if full else 0.0
+        ready = full or len(self._window) + 1 == self.period
+        return x, self._s1 - drop + x, self._s2 - drop * drop + x * x, ready
+
+    def _values(self, s1, s2, ready):
+        if not ready:
+            return (math.nan,) * 3
+        return tuple(float(v) for v in self._bands(s1, s2))
+
+    def commit(self, row):
+        x, self._s1, self._s2, ready = self._next(float(row[ChartEngine.CLOSE]))
+        self._window.append(x)
+        return self._values(self._s1, self._s2, ready)
+
+    def peek(self, row):
+        _, s1, s2, ready = self._next(float(row[ChartEngine.CLOSE]))
+        return self._values(s1, s2, ready)
+
+
+class VWAP(Indicator):
+    """
+    VWAP de sessão (reinicia a cada dia UTC) com bandas de desvio padrão.
+
+    Preço típico (h + l + c) / 3 ponderado pelo volume;
+    bandas = VWAP ± k · σ ponderado (um par por multiplicador).
+    """
+
+    def __init__(self, bands: Sequence[float] = (1.0,), session_s: int = 86_400):
+        self.bands = tuple(bands)
+        self.session_s = session_s
+        self.outputs = ("vwap",) + tuple(
+            f"{side}{i + 1}" for i in range(len(self.bands)) for side in ("upper", "lower")
+        )
+        self._ref = 0.0
+        self._session = None
+        self._v = self._pv = self._p2v = 0.0
+
+    @staticmethod
+    def _typical(h, l, c):
+        return (h + l + c) / 3.0
+
+    def _values(self, v, pv, p2v):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(v > 0, pv / v, np.nan)
+            std = np.sqrt(np.maximum(np.where(v > 0, p2v / v, np.nan) - mean * mean, 0.0))
+        vwap = mean + self._ref
+        out = [vwap]
+        for k in self.bands:
+            out += [vwap + k * std, vwap - k * std]
+        return out
+
+    def history(self, cols):
+        t = cols[ChartEngine.T]
+        n = len(t)
+        if not n:
+            self._session = None
+            self._v = self._pv = self._p2v = 0.0
+            return [np.zeros(0) for _ in self.outputs]
+
+        p = self._typical(cols[ChartEngine.HIGH], cols[ChartEngine.LOW], cols[ChartEngine.CLOSE])
+        self._ref = float(p[-1])
+        x = p - self._ref
+        vol = cols[ChartEngine.VOLUME]
+
+        # Somas acumuladas com reset no início de cada sessão
+        session = (t // self.session_s).astype(np.int64)
+        starts = np.r_[True, session[1:] != session[:-1]]
+        first = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+
+        sums = []
+        for series in (vol, x * vol, x * x * vol):
+            cs = np.cumsum(series)
+            base = np.r_[0.0, cs][first]
+            sums.append(cs - base)
+
+        self._session = int(session[-1])
+        self._v, self._pv, self._p2v = (float(s[-1]) for s in sums)
+
+        return self._values(*sums)
+
+    def _next(self, row):
+        if self._session is None and not self._v:
+            # Sem histórico: referência = primeiro preço típico
+            self._ref = self._typical(row[ChartEngine.HIGH], row[ChartEngine.LOW], row[ChartEngine.CLOSE])
+        session = int(row[ChartEngine.T] // self.session_s)
+        x = self._typical(row[ChartEngine.HIGH], row[ChartEngine.LOW], row[ChartEngine.CLOSE]) - self._ref
+        vol = float(row[ChartEngine.VOLUME])
+        if session != self._session:
+            base = (0.0, 0.0, 0.0)
+        else:
+            base = (self._v, self._pv, self._p2v)
+        return session, base[0] + vol, base[1] + x * vol, base[2] + x * x * vol
+
+    def commit(self, row):
+        self._session, self._v, self._pv, self._p2v = self._next(row)
+        return [float(v) for v in self._values(*map(np.float64, (self._v, self._pv, self._p2v)))]
+
+    def peek(self, row):
+        _, v, pv, p2v = self._next(row)
+        return [float(x) for x in self._values(*map(np.float64, (v, pv, p2v)))]
+
+
+# ==========================================================
+# INDICATOR ENGINE
+# ==========================================================
+
+class IndicatorEngine:
+    """
+    Séries de indicadores alinhadas com o ChartEngine.
+
+    - histórico novo → cálculo vetorizado de cada indicador
+    - candle fechado → commit O(1) por indicador
+    - candle em formação → peek O(1) (estado intocado)
+    - janela deslizante igual à do ChartEngine (ColumnBuffer)
+
+    sync() devolve o índice do primeiro valor alterado, para as
+    vistas atualizarem só a cauda.
+    """
+
+    def __init__(self, engine: ChartEngine):
+        self.engine = engine
+
+        self._indicators: Dict[str, Indicator] = {}
+
+        # { nome da série : linha no buffer }
+        self._rows: Dict[str, int] = {}
+
+        self._cols = ColumnBuffer(0, 2)
+
+        # Estado do engine já refletido nas séries
+        self._version = None
+        self._revision = 0
+        self._first_seq = 0
+        self._committed_end = 0
+
+    # ======================================================
+    # REGISTO
+    # ======================================================
+
+    def add(self, key: str, indicator: Indicator):
+        """
+        Regista um indicador. Séries: "key" (1 output) ou "key.output".
+        """
+        self._indicators[key] = indicator
+        self._layout()
+
+    def remove(self, key: str):
+        self._indicators.pop(key, None)
+        self._layout()
+
+    def _layout(self):
+        self._rows = {}
+        for key, ind in self._indicators.items():
+            for out in ind.outputs:
+                name = key if len(ind.outputs) == 1 else f"{key}.{out}"
+                self._rows[name] = len(self._rows)
+        self._cols = ColumnBuffer(len(self._rows), 2 * self.engine.max_candles)
+        self._version = None
+
+    # ======================================================
+    # ACESSO
+    # ======================================================
+
+    def series(self, name: str) -> np.ndarray:
+        """
+        View da série (alinhada com engine.t).
+        """
+        return self._cols.view(self._rows[name])
+
+    def names(self) -> List[str]:
+        return list(self._rows)
+
+    # ======================================================
+    # SINCRONIZAÇÃO
+    # ======================================================
+
+    def sync(self) -> Optional[int]:
+        """
+        Acompanha o ChartEngine.
+
+        :return: índice do primeiro valor alterado (None = nada mudou)
+        """
+        eng = self.engine
+
+        if self._version != eng.history_version:
+            self._rebuild()
+            return 0
+
+        # Candle já consumido pelos indicadores foi corrigido → o estado
+        # incremental não se desfaz: recálculo vetorizado (1x por candle)
+        if self._revision != eng.revision:
+            self._revision = eng.revision
+            if eng.revised_seq < self._committed_end:
+                self._rebuild()
+                return max(0, eng.index_of(eng.revised_seq))
+
+        # Candles antigos saíram da janela
+        if eng.first_seq != self._first_seq:
+            self._cols.drop_oldest(eng.first_seq - self._first_seq)
+            self._first_seq = eng.first_seq
+
+        changed = None
+        n = len(eng)
+
+        # Colunas para candles novos
+        while len(self._cols) < n:
+            self._cols.append(np.nan)
+
+        # Candles fechados ainda não processados
+        while self._committed_end < eng.closed_end_seq:
+            seq = self._committed_end
+            self._write(eng.index_of(seq), self._step(eng.row_at(seq), commit=True))
+            self._committed_end += 1
+            if changed is None:
+                changed = eng.index_of(seq)
+
+        # Candle em formação
+        if eng.live and n:
+            self._write(n - 1, self._step(eng.last(), commit=False))
+            if changed is None:
+                changed = n - 1
+
+        return changed
+
+    def _rebuild(self):
+        eng = self.engine
+        self._version = eng.history_version
+        self._revision = eng.revision
+        self._first_seq = eng.first_seq
+        self._committed_end = eng.closed_end_seq
+
+        n = len(eng)
+        closed = eng.index_of(eng.closed_end_seq)
+        cols = np.vstack([eng.column(r) for r in range(6)])[:, :closed] if n else np.zeros((6, 0))
+
+        data = np.full((len(self._rows), n), np.nan)
+        row = 0
+        for ind in self._indicators.values():
+            for values in ind.history(cols):
+                data[row, :closed] = values
+                row += 1
+        self._cols.reset(data)
+
+        if eng.live and n:
+            self._write(n - 1, self._step(eng.last(), commit=False))
+
+    def _step(self, row: np.ndarray, commit: bool) -> List[float]:
+        values: List[float] = []
+        for ind in self._indicators.values():
+            values.extend(ind.commit(row) if commit else ind.peek(row))
+        return values
+
+    def _write(self, index: int, values: List[float]):
+        if values:
+            self._cols.set_col(index, values)
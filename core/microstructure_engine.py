@@ -0,0 +1,381 @@
+import heapq
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# ==========================================================
+# MÉTRICAS DE MICROESTRUTURA (INCREMENTAIS)
+# ==========================================================
+# Cada trade / evento de book atualiza as métricas em O(1)
+# (amortizado); no fim de cada segundo (tempo das trades) é
+# escrita uma amostra em anéis NumPy de tamanho fixo que os
+# gráficos consomem diretamente, sem cópias.
+# ==========================================================
+
+
+REGIME_NEUTRAL = 0
+REGIME_TRENDING = 1
+REGIME_MEAN_REVERTING = 2
+REGIME_TOXIC = 3
+
+REGIME_NAMES = {
+    REGIME_NEUTRAL: "NEUTRAL",
+    REGIME_TRENDING: "TRENDING",
+    REGIME_MEAN_REVERTING: "MEAN-REVERTING",
+    REGIME_TOXIC: "TOXIC",
+}
+
+
+class MetricRing:
+    """
+    Anel de amostras com buffer espelhado (2x capacidade):
+    cada amostra é escrita em p e p + capacidade, por isso a
+    janela cronológica é sempre uma fatia contígua (view sem cópia).
+    """
+
+    FIELDS = ("ts", "cum_delta", "ofi", "vpin", "price", "regime")
+
+    def __init__(self, capacity: int = 4 * 3600):
+        self.capacity = max(1, capacity)
+        self._buffers = {
+            name: np.zeros(2 * self.capacity, dtype=np.int64 if name == "ts" else np.float64)
+            for name in self.FIELDS
+        }
+        self.end_seq = 0
+
+    def __len__(self) -> int:
+        return min(self.end_seq, self.capacity)
+
+    def clear(self):
+        self.end_seq = 0
+
+    def append(self, **values):
+        cap = self.capacity
+        p = self.end_seq % cap
+        for name, value in values.items():
+            buf = self._buffers[name]
+            buf[p] = value
+            buf[p + cap] = value
+        self.end_seq += 1
+
+    def series(self, name: str) -> np.ndarray:
+        """
+        View cronológica (read-only por convenção) de um campo.
+        """
+        n = len(self)
+        start = self.end_seq % self.capacity if self.end_seq > self.capacity else 0
+        return self._buffers[name][start : start + n]
+
+    def last(self, name: str):
+        if not self.end_seq:
+            return None
+        return self._buffers[name][(self.end_seq - 1) % self.capacity]
+
+
+class BookSide:
+    """
+    Um lado do book (preço → size) com melhor preço em O(1):
+    heap com remoção preguiçosa (níveis removidos só saem do heap
+    quando chegam ao topo) e compactação ocasional.
+    """
+
+    def __init__(self, is_bid: bool):
+        self._sign = -1.0 if is_bid else 1.0
+        self.levels: Dict[float, float] = {}
+        self._heap: List[float] = []
+
+    def clear(self):
+        self.levels.clear()
+        self._heap.clear()
+
+    def set(self, price: float, size: float):
+        levels = self.levels
+        if size <= 0:
+            levels.pop(price, None)
+            return
+        if price not in levels:
+            heapq.heappush(self._heap, self._sign * price)
+        levels[price] = size
+
+    def load(self, levels):
+        self.levels = {p: s for p, s in levels if s > 0}
+        self._heap = [self._sign * p for p in self.levels]
+        heapq.heapify(self._heap)
+
+    def best(self) -> Tuple[Optional[float], float]:
+        heap, levels = self._heap, self.levels
+        while heap and (self._sign * heap[0]) not in levels:
+            heapq.heappop(heap)
+
+        # Entradas mortas fora do topo → reconstrói de vez em quando
+        if len(heap) > 4 * len(levels) + 64:
+            self._heap = [self._sign * p for p in levels]
+            heapq.heapify(self._heap)
+            heap = self._heap
+
+        if not heap:
+            return None, 0.0
+        price = self._sign * heap[0]
+        return price, levels[price]
+
+
+class MicrostructureEngine:
+    """
+    Métricas de order flow alimentadas por evento:
+
+    - Cumulative delta → Σ qty com sinal do agressor
+    - OFI (Cont/Kukanov/Stoikov) → variação de size no melhor
+      bid/ask a cada evento de book, acumulada
+    - VPIN → buckets de volume igual (qty); cada bucket regista
+      |buy − sell|; VPIN = Σ desequilíbrios / (n · V) sobre os
+      últimos n buckets (soma corrente)
+    - Regime → a cada segundo, a partir do VPIN e da eficiência
+      do preço (|Δ| / Σ|Δ|) na janela de amostras:
+        TOXIC          → VPIN ≥ vpin_toxic
+        TRENDING       → eficiência ≥ trend_efficiency e delta
+                         a confirmar a direção do preço
+        MEAN-REVERTING → eficiência ≤ mr_efficiency
+        NEUTRAL        → restantes
+
+    O tamanho do bucket VPIN, se não for dado, é calibrado pelo
+    volume dos primeiros `calibration_s` segundos de trades
+    (1/calibration_buckets desse volume), já que o volume típico
+    varia muito entre símbolos; o VPIN só começa depois.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 4 * 3600,
+        bucket_volume: Optional[float] = None,
+        vpin_buckets: int = 50,
+        calibration_s: int = 60,
+        calibration_buckets: int = 10,
+        regime_window_s: int = 60,
+        vpin_toxic: float = 0.6,
+        trend_efficiency: float = 0.5,
+        mr_efficiency: float = 0.2,
+    ):
+        self.samples = MetricRing(capacity)
+
+        self.vpin_buckets = max(1, vpin_buckets)
+        self.calibration_s = calibration_s
+        self.calibration_buckets = max(1, calibration_buckets)
+        self.regime_window_s = max(2, regime_window_s)
+        self.vpin_toxic = vpin_toxic
+        self.trend_efficiency = trend_efficiency
+        self.mr_efficiency = mr_efficiency
+
+        self._fixed_bucket_volume = bucket_volume
+        self.clear()
+
+    def clear(self):
+        """
+        Estado a zero (mudança de símbolo).
+        """
+        self.samples.clear()
+
+        # Delta / OFI
+        self.cum_delta = 0.0
+        self.ofi = 0.0
+        self.last_price: Optional[float] = None
+
+        # Book (só o topo interessa ao OFI)
+        self._bids = BookSide(is_bid=True)
+        self._asks = BookSide(is_bid=False)
+        self._best: Optional[Tuple[float, float, float, float]] = None
+
+        # VPIN
+        self.bucket_volume = self._fixed_bucket_volume
+        self._calib_start: Optional[int] = None
+        self._calib_volume = 0.0
+        self._bucket_buy = 0.0
+        self._bucket_sell = 0.0
+        self._imbalances: Deque[float] = deque()
+        self._imbalance_sum = 0.0
+        self.vpin: Optional[float] = None
+
+        # Amostragem por segundo + janela do regime
+        self._second: Optional[int] = None
+        self._window: Deque[Tuple[float, float]] = deque()   # (preço, delta)
+        self._path = 0.0                                       # Σ|Δpreço|
+        self.regime = REGIME_NEUTRAL
+
+    # ======================================================
+    # TRADES
+    # ======================================================
+
+    def on_trade(self, ts: int, price: float, qty: float, is_buy: bool):
+        """
+        Trade com lado do agressor. ts em ms.
+        """
+        self._roll(ts)
+
+        signed = qty if is_buy else -qty
+        self.cum_delta += signed
+        self.last_price = price
+
+        self._add_volume(ts, qty, is_buy)
+
+    def _add_volume(self, ts: int, qty: float, is_buy: bool):
+        V = self.bucket_volume
+        if V is None:
+            # Calibração: só mede o volume; os buckets começam depois
+            if self._calib_start is None:
+                self._calib_start = ts
+            if ts - self._calib_start < self.calibration_s * 1000:
+                self._calib_volume += qty
+                return
+            V = self.bucket_volume = max(
+                self._calib_volume / self.calibration_buckets, 1e-12
+            )
+
+        if is_buy:
+            self._fill(qty, 0.0, V)
+        else:
+            self._fill(0.0, qty, V)
+
+    def _fill(self, buy: float, sell: float, V: float):
+        """
+        Enche o bucket atual; o excesso passa para os seguintes
+        (proporcional ao lado), fechando buckets pelo caminho.
+        """
+        total = buy + sell
+        while total > 0:
+            room = V - self._bucket_buy - self._bucket_sell
+            take = min(room, total)
+            frac = take / total
+            self._bucket_buy += buy * frac
+            self._bucket_sell += sell * frac
+            buy -= buy * frac
+            sell -= sell * frac
+            total -= take
+
+            if self._bucket_buy + self._bucket_sell >= V * (1 - 1e-9):
+                self._close_bucket(V)
+
+    def _close_bucket(self, V: float):
+        imbalance = abs(self._bucket_buy - self._bucket_sell)
+        self._bucket_buy = self._bucket_sell = 0.0
+
+        self._imbalances.append(imbalance)
+        self._imbalance_sum += imbalance
+        if len(self._imbalances) > self.vpin_buckets:
+            self._imbalance_sum -= self._imbalances.popleft()
+
+        n = len(self._imbalances)
+        self.vpin = min(1.0, max(0.0, self._imbalance_sum / (n * V)))
+
+    # ======================================================
+    # BOOK
+    # ======================================================
+
+    def on_depth_snapshot(self, bids, asks):
+        self._bids.load(bids)
+        self._asks.load(asks)
+        # Snapshot = novo ponto de partida (sem contribuição de OFI)
+        self._best = None
+        self._update_ofi()
+
+    def on_depth_update(self, bids, asks):
+        for p, s in bids:
+            self._bids.set(p, s)
+        for p, s in asks:
+            self._asks.set(p, s)
+        self._update_ofi()
+
+    def _update_ofi(self):
+        bid, bid_size = self._bids.best()
+        ask, ask_size = self._asks.best()
+        if bid is None or ask is None:
+            return
+
+        prev = self._best
+        self._best = (bid, bid_size, ask, ask_size)
+        if prev is None:
+            return
+
+        prev_bid, prev_bid_size, prev_ask, prev_ask_size = prev
+        e = 0.0
+        if bid >= prev_bid:
+            e += bid_size
+        if bid <= prev_bid:
+            e -= prev_bid_size
+        if ask <= prev_ask:
+            e -= ask_size
+        if ask >= prev_ask:
+            e += prev_ask_size
+        self.ofi += e
+
+    @property
+    def best_bid_ask(self) -> Optional[Tuple[float, float, float, float]]:
+        return self._best
+
+    # ======================================================
+    # AMOSTRAGEM + REGIME
+    # ======================================================
+
+    def _roll(self, ts: int):
+        """
+        Fecha o segundo anterior quando o tempo das trades avança.
+        """
+        second = ts // 1000
+        if self._second is None:
+            self._second = second
+        elif second > self._second:
+            self._sample(self._second)
+            self._second = second
+
+    def flush(self):
+        """
+        Força a amostra do segundo em curso (ex.: fim de replay).
+        """
+        if self._second is not None:
+            self._sample(self._second)
+            self._second = None
+
+    def _sample(self, second: int):
+        if self.last_price is None:
+            return
+
+        self._update_regime()
+        self.samples.append(
+            ts=second,
+            cum_delta=self.cum_delta,
+            ofi=self.ofi,
+            vpin=self.vpin if self.vpin is not None else np.nan,
+            price=self.last_price,
+            regime=self.regime,
+        )
+
+    def _update_regime(self):
+        window = self._window
+        price = self.last_price
+
+        if window:
+            self._path += abs(price - window[-1][0])
+        window.append((price, self.cum_delta))
+        if len(window) > self.regime_window_s:
+            old = window.popleft()
+            self._path -= abs(window[0][0] - old[0])
+            if self._path < 1e-12:
+                self._path = 0.0
+
+        if self.vpin is not None and self.vpin >= self.vpin_toxic:
+            self.regime = REGIME_TOXIC
+            return
+        if len(window) < 2:
+            self.regime = REGIME_NEUTRAL
+            return
+
+        move = price - window[0][0]
+        flow = self.cum_delta - window[0][1]
+        efficiency = abs(move) / self._path if self._path > 0 else 0.0
+
+        if efficiency >= self.trend_efficiency and move * flow > 0:
+            self.regime = REGIME_TRENDING
+        elif efficiency <= self.mr_efficiency:
+            self.regime = REGIME_MEAN_REVERTING
+        else:
+            self.regime = REGIME_NEUTRAL
@@ -0,0 +1,180 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.chart_engine import ChartEngine
+
+
+# ==========================================================
+# SEGMENT TREE MIN / MAX
+# ==========================================================
+
+class MinMaxTree:
+    """
+    Segment tree (arrays NumPy, layout implícito 1-indexado)
+    com mínimo e máximo por nó.
+
+    - build vetorizado: O(n)
+    - set de uma folha: O(log n)
+    - query [l, r): O(log n)
+    """
+
+    def __init__(self, capacity: int):
+        size = 1
+        while size < max(1, capacity):
+            size <<= 1
+        self.size = size
+        self._mn = np.full(2 * size, np.inf)
+        self._mx = np.full(2 * size, -np.inf)
+
+    def build(self, pos: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+        """
+        Reinicia a árvore com folhas pos → (lo, hi).
+        """
+        size = self.size
+        self._mn.fill(np.inf)
+        self._mx.fill(-np.inf)
+        self._mn[size + pos] = lo
+        self._mx[size + pos] = hi
+
+        # Nível a nível, de baixo para cima
+        h = size // 2
+        while h >= 1:
+            self._mn[h : 2 * h] = np.minimum(self._mn[2 * h : 4 * h : 2], self._mn[2 * h + 1 : 4 * h : 2])
+            self._mx[h : 2 * h] = np.maximum(self._mx[2 * h : 4 * h : 2], self._mx[2 * h + 1 : 4 * h : 2])
+            h //= 2
+
+    def set(self, pos: int, lo: float, hi: float):
+        mn, mx = self._mn, self._mx
+        i = pos + self.size
+        mn[i] = lo
+        mx[i] = hi
+        i >>= 1
+        while i:
+            a, b = 2 * i, 2 * i + 1
+            mn[i] = mn[a] if mn[a] < mn[b] else mn[b]
+            mx[i] = mx[a] if mx[a] > mx[b] else mx[b]
+            i >>= 1
+
+    def query(self, l: int, r: int) -> Tuple[float, float]:
+        """
+        (min, max) das folhas [l, r). Vazio → (inf, -inf).
+        """
+        mn, mx = self._mn, self._mx
+        lo, hi = np.inf, -np.inf
+        l += self.size
+        r += self.size
+        while l < r:
+            if l & 1:
+                lo = min(lo, mn[l])
+                hi = max(hi, mx[l])
+                l += 1
+            if r & 1:
+                r -= 1
+                lo = min(lo, mn[r])
+                hi = max(hi, mx[r])
+            l >>= 1
+            r >>= 1
+        return float(lo), float(hi)
+
+
+# ==========================================================
+# ÍNDICE DE RANGE DO GRÁFICO
+# ==========================================================
+
+class ChartRangeIndex:
+    """
+    Índice min / max sobre a janela do ChartEngine para auto-scale.
+
+    - folhas indexadas por seq % capacidade (anel): candles que
+      saem da janela não precisam de ser apagados
+    - preço: min(low) / max(high); volume: max(volume)
+    - sync(): O(log n) por candle alterado (o em formação incluído)
+    - y_range(i0, i1): O(log n) por viewport
+    """
+
+    def __init__(self, engine: ChartEngine):
+        self.engine = engine
+
+        self._price: Optional[MinMaxTree] = None
+        self._volume: Optional[MinMaxTree] = None
+
+        # Estado do engine já indexado
+        self._version = None
+        self._revision = 0
+        self._end = 0
+
+    # ======================================================
+    # SINCRONIZAÇÃO
+    # ======================================================
+
+    def sync(self):
+        eng = self.engine
+
+        if self._version != eng.history_version or self._price is None \
+                or self._price.size < len(eng):
+            self._rebuild()
+            return
+
+        # Candle fechado corrigido
+        if self._revision != eng.revision:
+            self._revision = eng.revision
+            if eng.first_seq <= eng.revised_seq < self._end - 1:
+                self._set(eng.revised_seq, eng.row_at(eng.revised_seq))
+
+        # Último candle já indexado (pode ter mudado) + novos
+        for seq in range(max(self._end - 1, eng.first_seq), eng.end_seq):
+            self._set(seq, eng.row_at(seq))
+        self._end = eng.end_seq
+
+    def _rebuild(self):
+        eng = self.engine
+        self._version = eng.history_version
+        self._revision = eng.revision
+        self._end = eng.end_seq
+
+        capacity = max(eng.max_candles, len(eng)) + 1
+        self._price = MinMaxTree(capacity)
+        self._volume = MinMaxTree(capacity)
+
+        pos = np.arange(eng.first_seq, eng.end_seq) % self._price.size
+        self._price.build(pos, eng.low, eng.high)
+        self._volume.build(pos, eng.volume, eng.volume)
+
+    def _set(self, seq: int, row: np.ndarray):
+        pos = seq % self._price.size
+        self._price.set(pos, float(row[ChartEngine.LOW]), float(row[ChartEngine.HIGH]))
+        v = float(row[ChartEngine.VOLUME])
+        self._volume.set(pos, v, v)
+
+    # ======================================================
+    # QUERY
+    # ======================================================
+
+    def y_range(self, i0: int, i1: int) -> Optional[Tuple[float, float, float]]:
+        """
+        Candles [i0, i1) da janela do engine.
+
+        :return: (low mínimo, high máximo, volume máximo) ou None
+        """
+        eng = self.engine
+        i0, i1 = max(0, i0), min(len(eng), i1)
+        if i1 <= i0 or self._price is None:
+            return None
+
+        size = self._price.size
+        p0 = (eng.first_seq + i0) % size
+        length = i1 - i0
+
+        if p0 + length <= size:
+            parts = [(p0, p0 + length)]
+        else:
+            parts = [(p0, size), (0, p0 + length - size)]
+
+        lo, hi, vmax = np.inf, -np.inf, 0.0
+        for a, b in parts:
+            plo, phi = self._price.query(a, b)
+            lo, hi = min(lo, plo), max(hi, phi)
+            vmax = max(vmax, self._volume.query(a, b)[1])
+
+        return lo, hi, vmax
@@ -0,0 +1,169 @@
+import math
+from collections import deque
+from typing import Deque, Dict, Tuple, Union
+
+import numpy as np
+
+
+# ==========================================================
+# REBINNING (TICK → LINHA)
+# ==========================================================
+# Os stores guardam sempre resolução de tick.
+# As vistas pedem agregados grosseiros (N ticks por linha),
+# calculados na hora a partir dos dados base.
+# ==========================================================
+
+def rebin_dense(start_tick: int, vols: np.ndarray, row_ticks: int) -> Tuple[int, np.ndarray]:
+    """
+    Agrega um array denso de volumes por tick em linhas de `row_ticks`.
+
+    As linhas ficam alinhadas a múltiplos de row_ticks (estáveis entre
+    refreshes): padding nas pontas + reshape(-1, N).sum(axis=1).
+
+    :return: (tick inicial da primeira linha, volumes por linha)
+    """
+    if row_ticks <= 1 or len(vols) == 0:
+        return start_tick, vols
+
+    row_start = (start_tick // row_ticks) * row_ticks
+    pad_lo = start_tick - row_start
+    pad_hi = -(pad_lo + len(vols)) % row_ticks
+
+    padded = np.concatenate((
+        np.zeros(pad_lo, dtype=vols.dtype),
+        vols,
+        np.zeros(pad_hi, dtype=vols.dtype),
+    ))
+    return row_start, padded.reshape(-1, row_ticks).sum(axis=1)
+
+
+def rebin_sparse(levels: Dict[int, float], row_ticks: int) -> Dict[int, float]:
+    """
+    Versão esparsa (dict tick → qty) via bincount.
+
+    :return: { tick inicial da linha : qty }
+    """
+    if row_ticks <= 1 or not levels:
+        return levels
+
+    ticks = np.fromiter(levels.keys(), np.int64, len(levels))
+    qtys = np.fromiter(levels.values(), np.float64, len(levels))
+
+    rows = ticks // row_ticks
+    base = int(rows.min())
+    sums = np.bincount(rows - base, weights=qtys)
+
+    nz = np.flatnonzero(sums)
+    return {int(base + i) * row_ticks: float(sums[i]) for i in nz}
+
+
+# ==========================================================
+# TAMANHO DE LINHA (FIXO OU AUTO POR ATR)
+# ==========================================================
+
+def nice_ticks(raw: float) -> int:
+    """
+    Arredonda um nº de ticks para 1 / 2 / 5 × 10^n.
+    """
+    if raw <= 1:
+        return 1
+    exp = math.floor(math.log10(raw))
+    base = raw / 10 ** exp
+    nice = 1 if base < 1.5 else 2 if base < 3.5 else 5 if base < 7.5 else 10
+    return int(nice * 10 ** exp)
+
+
+class RowSizer:
+    """
+    Tamanho de linha em ticks, escolhido pelo utilizador.
+
+    - "auto" → ATR(period) / rows_per_atr, arredondado (1-2-5)
+    - inteiro N → N ticks por linha
+
+    Mantém só os últimos `period + 1` candles (O(1) por update).
+    """
+
+    AUTO = "auto"
+
+    # Opções apresentadas nas vistas
+    CHOICES = ["Auto", "1", "2", "5", "10", "25", "50", "100", "250", "500", "1000"]
+
+    def __init__(self, tick_size: float = 0.01, rows_per_atr: int = 10, period: int = 14):
+        self.tick_size = tick_size
+        self.rows_per_atr = rows_per_atr
+        self.period = period
+
+        self.mode: Union[str, int] = self.AUTO
+
+        # (high, low, close) dos candles mais recentes
+        self._candles: Deque[Tuple[float, float, float]] = deque(maxlen=period + 1)
+        self._auto_ticks = 1
+
+    # --------------------------
+    # CONFIGURAÇÃO
+    # --------------------------
+
+    def set_mode(self, value: Union[str, int]):
+        """
+        Aceita "Auto" / "auto" ou um nº de ticks (int ou texto).
+        """
+        text = str(value).strip().lower()
+        if text.startswith(self.AUTO):
+            self.mode = self.AUTO
+        else:
+            try:
+                self.mode = max(1, int(text.split()[0]))
+            except (ValueError, IndexError):
+                self.mode = self.AUTO
+
+    def label(self) -> str:
+        return "Auto" if self.mode == self.AUTO else str(self.mode)
+
+    def clear(self):
+        self._candles.clear()
+        self._auto_ticks = 1
+
+    # --------------------------
+    # CANDLES (ATR)
+    # --------------------------
+
+    def add_candles(self, candles):
+        self._candles.clear()
+        for c in list(candles)[-(self.period + 1):]:
+            self._candles.append((c.high, c.low, c.close))
+        self._update_auto()
+
+    def add_candle_update(self, candle, closed: bool):
+        if not closed:
+            return
+        self._candles.append((candle.high, candle.low, candle.close))
+        self._update_auto()
+
+    def _update_auto(self):
+        if not self._candles:
+            return
+        arr = np.array(self._candles, dtype=np.float64)
+        high, low, close = arr[:, 0], arr[:, 1], arr[:, 2]
+
+        # True range (o 1º candle não tem close anterior)
+        tr = high - low
+        if len(arr) > 1:
+            prev = close[:-1]
+            tr[1:] = np.maximum.reduce([
+                high[1:] - low[1:],
+                np.abs(high[1:] - prev),
+                np.abs(low[1:] - prev),
+            ])
+        atr = float(tr[-self.period:].mean())
+
+        self._auto_ticks = nice_ticks(atr / self.rows_per_atr / self.tick_size)
+
+    # --------------------------
+    # RESULTADO
+    # --------------------------
+
+    @property
+    def row_ticks(self) -> int:
+        if self.mode == self.AUTO:
+            return self._auto_ticks
+        return int(self.mode)
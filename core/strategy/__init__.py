@@ -0,0 +1 @@
+# Strategy package (estratégias incrementais + runtime fora da UI)
@@ -0,0 +1,217 @@
+# ==========================================================
+# BACKTEST VETORIZADO + SWEEPS DE PARÂMETROS
+# ==========================================================
+# Responsável por:
+# - correr as mesmas estratégias do runtime ao vivo (forma
+#   vetorizada `positions`) sobre arrays de candles (6, n)
+# - P&L, win rate, drawdown e exposição com NumPy
+# - grelhas de parâmetros distribuídas por um process pool,
+#   resultados entregues à medida que cada lote termina
+#
+# Convenção: a posição decidida no fecho do candle i ganha o
+# retorno de i para i+1; custos (bps do notional) em cada
+# mudança de posição.
+# ==========================================================
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Type, Union
+
+import multiprocessing as mp
+import numpy as np
+
+from core.strategy.base import Strategy
+from core.strategy.features import FeatureCache
+
+
+@dataclass
+class BacktestResult:
+    """
+    Resultado de uma combinação de parâmetros.
+
+    - pnl / max_drawdown em moeda de cotação para `notional`
+      por posição
+    - trades: posições não-flat (a última, aberta, conta a mercado)
+    """
+    strategy: str
+    params: Dict[str, float]
+    bars: int
+    trades: int
+    wins: int
+    pnl: float
+    max_drawdown: float
+    exposure: float
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.trades if self.trades else 0.0
+
+
+# ==========================================================
+# AVALIAÇÃO
+# ==========================================================
+
+def evaluate(
+    positions: np.ndarray,
+    features: FeatureCache,
+    notional: float = 10_000.0,
+    cost_bps: float = 2.0,
+    start: int = 0,
+    end: Optional[int] = None,
+) -> Dict[str, float]:
+    """
+    Métricas de uma série de posições em [start, end).
+
+    A posição está limitada a {-1, 0, +1}: cada mudança custa
+    |Δposição| × cost_bps; cada trade paga entrada + saída.
+    """
+    end = len(positions) if end is None else end
+    pos = positions[start:end]
+    n = len(pos)
+    if n < 2:
+        return {"trades": 0, "wins": 0, "pnl": 0.0, "max_drawdown": 0.0, "exposure": 0.0}
+
+    r = features.returns()[start + 1 : end]
+    cost = cost_bps / 10_000.0
+
+    # Retorno do candle i → i+1 atribuído ao candle i
+    earn = np.empty(n)
+    np.multiply(pos[:-1], r, out=earn[:-1])
+    earn[-1] = 0.0
+
+    # Trades = segmentos de posição constante não-flat
+    change = np.empty(n, dtype=bool)
+    change[0] = True
+    np.not_equal(pos[1:], pos[:-1], out=change[1:])
+    starts = np.flatnonzero(change)
+    seg_pos = pos[starts].astype(np.float64)
+    seg_earn = np.add.reduceat(earn, starts)
+
+    closed = np.ones(len(starts))
+    closed[-1] = 0.0
+    seg_net = seg_earn - cost * np.abs(seg_pos) * (1.0 + closed)
+
+    # Custos só nas mudanças (esparsas): |Δposição| × cost
+    earn[starts] -= cost * np.abs(np.diff(seg_pos, prepend=0.0))
+    equity = np.cumsum(earn, out=earn)
+    peak = np.maximum.accumulate(equity)
+    np.maximum(peak, 0.0, out=peak)
+    drawdown = np.subtract(peak, equity, out=peak)
+
+    traded = seg_pos != 0
+    return {
+        "trades": int(traded.sum()),
+        "wins": int((seg_net[traded] > 0).sum()),
+        "pnl": float(equity[-1] * notional),
+        "max_drawdown": float(drawdown.max() * notional),
+        "exposure": float(np.count_nonzero(pos) / n),
+    }
+
+
+def backtest(
+    strategy_cls: Type[Strategy],
+    features: FeatureCache,
+    params: Optional[Dict[str, float]] = None,
+    notional: float = 10_000.0,
+    cost_bps: float = 2.0,
+) -> BacktestResult:
+    params = {**strategy_cls.PARAMS, **(params or {})}
+    positions = strategy_cls.positions(features, **params)
+    stats = evaluate(positions, features, notional, cost_bps)
+    return BacktestResult(strategy=strategy_cls.name, params=params, bars=len(features), **stats)
+
+
+def param_grid(grid: Dict[str, Sequence]) -> List[Dict[str, float]]:
+    """
+    Produto cartesiano (ordem estável: o 1º parâmetro varia mais
+    devagar, por isso lotes consecutivos partilham features).
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+# ==========================================================
+# WORKERS DO POOL
+# ==========================================================
+# Cada processo carrega os candles uma vez (initializer) e
+# mantém o seu FeatureCache entre lotes.
+# ==========================================================
+
+_features: Optional[FeatureCache] = None
+
+
+def load_bars(source: Union[np.ndarray, str]) -> np.ndarray:
+    """
+    Array (6, n) ou caminho de um .npy (aberto em memory-map).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return np.load(source, mmap_mode="r")
+    return source
+
+
+def _init_worker(source):
+    global _features
+    _features = FeatureCache(load_bars(source))
+
+
+def _run_batch(strategy_cls, batch, notional, cost_bps) -> List[BacktestResult]:
+    return [backtest(strategy_cls, _features, params, notional, cost_bps) for params in batch]
+
+
+def sweep(
+    strategy_cls: Type[Strategy],
+    bars: Union[np.ndarray, str],
+    grid: Optional[Dict[str, Sequence]] = None,
+    processes: Optional[int] = None,
+    notional: float = 10_000.0,
+    cost_bps: float = 2.0,
+    batch_size: Optional[int] = None,
+    cancelled=None,
+) -> Iterator[BacktestResult]:
+    """
+    Corre a grelha (GRID da estratégia por omissão) e devolve os
+    resultados à medida que os lotes terminam.
+
+    :param bars: array (6, n) ou caminho .npy (memory-map partilhado)
+    :param processes: 1 → no próprio processo (sem pool)
+    :param cancelled: callable opcional; True → para de agendar
+    """
+    combos = param_grid(grid if grid is not None else strategy_cls.GRID)
+    if not combos:
+        return
+
+    processes = processes or os.cpu_count() or 1
+    if batch_size is None:
+        batch_size = max(1, len(combos) // (processes * 8))
+    batches = [combos[i : i + batch_size] for i in range(0, len(combos), batch_size)]
+
+    if processes == 1:
+        features = FeatureCache(load_bars(bars))
+        for batch in batches:
+            if cancelled is not None and cancelled():
+                return
+            for params in batch:
+                yield backtest(strategy_cls, features, params, notional, cost_bps)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(bars,),
+    ) as pool:
+        futures = [
+            pool.submit(_run_batch, strategy_cls, batch, notional, cost_bps)
+            for batch in batches
+        ]
+        try:
+            for future in as_completed(futures):
+                if cancelled is not None and cancelled():
+                    break
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
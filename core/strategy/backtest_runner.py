@@ -0,0 +1,132 @@
+# ==========================================================
+# BACKTEST RUNNER (SWEEPS FORA DA THREAD DA UI)
+# ==========================================================
+# Responsável por:
+# - completar o candle store do símbolo / timeframe ativos
+# - correr, por estratégia com BACKTEST, os parâmetros ao vivo
+#   e depois a grelha (GRID) num process pool
+# - entregar cada BacktestResult à UI (sinais queued)
+#
+# Tal como o SessionHistoryLoader: thread dedicada, um pedido
+# novo cancela o anterior (geração).
+# ==========================================================
+
+import logging
+import os
+import threading
+from typing import List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from core.data_engine.candle_store import CandleStore
+from core.strategy.backtest import backtest, param_grid, sweep
+from core.strategy.base import Strategy
+from core.strategy.features import FeatureCache
+
+
+class BacktestRunner(QObject):
+    """
+    Backtests das estratégias registadas no runtime.
+
+    - result(BacktestResult): um por combinação (os parâmetros
+      ao vivo primeiro, para o resumo aparecer logo)
+    - progress(concluídas, total) em combinações
+    - finished(str): mensagem final (ou de erro)
+    """
+
+    # ------------------------------------------------------
+    # SINAIS PÚBLICOS (QT)
+    # ------------------------------------------------------
+
+    result = Signal(object)       # BacktestResult
+    progress = Signal(int, int)   # (combinações concluídas, total)
+    finished = Signal(str)
+
+    # Histórico pedido ao candle store
+    DAYS = 365
+
+    def __init__(self, parent=None, store: Optional[CandleStore] = None):
+        super().__init__(parent)
+
+        self._logger = logging.getLogger(__name__)
+        self.store = store or CandleStore()
+
+        self._thread: Optional[threading.Thread] = None
+        self._generation = 0
+
+    # ======================================================
+    # API PÚBLICA (THREAD DA UI)
+    # ======================================================
+
+    def request(self, symbol: str, interval: str, strategies: List[Strategy]):
+        """
+        Agenda os backtests; cancela o pedido anterior.
+        """
+        self._generation += 1
+        generation = self._generation
+
+        # Cópias (classe + parâmetros): o runtime pode mudar
+        jobs = [
+            (type(s), dict(s.params))
+            for s in strategies
+            if type(s).BACKTEST
+        ]
+
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(generation, symbol.upper(), interval, jobs),
+            name="BacktestRunner",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def cancel(self):
+        self._generation += 1
+
+    # ======================================================
+    # THREAD ENTRYPOINT
+    # ======================================================
+
+    def _run(self, generation: int, symbol: str, interval: str, jobs):
+        try:
+            self._backtest(generation, symbol, interval, jobs)
+        except Exception as e:
+            self._logger.exception("BacktestRunner crashed: %s", e)
+            self.finished.emit(f"Backtest failed: {e}")
+
+    def _backtest(self, generation: int, symbol: str, interval: str, jobs):
+        def cancelled():
+            return generation != self._generation
+
+        bars = self.store.update(symbol, interval, self.DAYS)
+        if cancelled():
+            return
+        if bars.shape[1] < 2:
+            self.finished.emit(f"No {interval} history for {symbol}")
+            return
+
+        path = str(self.store.path(symbol, interval))
+        features = FeatureCache(self.store.load(symbol, interval, mmap=True))
+        # Um core fica livre para a UI
+        processes = max(1, (os.cpu_count() or 1) - 1)
+
+        total = sum(1 + len(param_grid(cls.GRID)) for cls, _ in jobs)
+        done = 0
+
+        # Parâmetros ao vivo primeiro (resumo do header)
+        for cls, params in jobs:
+            if cancelled():
+                return
+            self.result.emit(backtest(cls, features, params))
+            done += 1
+            self.progress.emit(done, total)
+
+        for cls, _ in jobs:
+            for res in sweep(cls, path, processes=processes, cancelled=cancelled):
+                if cancelled():
+                    return
+                self.result.emit(res)
+                done += 1
+                self.progress.emit(done, total)
+
+        self.finished.emit(f"{symbol} {interval}: {bars.shape[1]:,} bars, {done:,} runs")
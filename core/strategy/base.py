@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.data_engine.models import Candle, Trade
+
+
+# ==========================================================
+# SINAL DE ESTRATÉGIA (OUTPUT PARA UI)
+# ==========================================================
+
+POSITION_NAMES = {1: "Long", -1: "Short", 0: "Flat"}
+
+
+@dataclass
+class StrategySignal:
+    """
+    Mudança de posição-alvo de uma estratégia.
+
+    - ts: ms do evento que gerou o sinal (open_time nos candles)
+    - side: "Long" / "Short" / "Flat"
+    - strength: 0–100 (convicção, específica da estratégia)
+    """
+    ts: int
+    symbol: str
+    strategy: str
+    side: str
+    price: float
+    strength: int
+
+
+# ==========================================================
+# CONTRATO DAS ESTRATÉGIAS
+# ==========================================================
+
+class Strategy:
+    """
+    Estratégia com estado incremental.
+
+    Contrato:
+    - PARAMS: parâmetros por omissão (sobrepostos no construtor)
+    - EVENTS: eventos que recebe ("candle", "trade", "book")
+    - reset(): estado a zero (símbolo / timeframe novos)
+    - on_bar(o, h, l, c, v) → posição-alvo (+1 / -1 / 0) ou None
+      (mantém), chamado só com candles fechados, O(1)
+    - on_trade(trade) / on_book(bids, asks, snapshot) → idem
+
+    A posição é decidida no fecho do candle (ou no evento) e só
+    as mudanças geram StrategySignal. `strength` é lido no
+    momento da mudança.
+
+    Backtest (BACKTEST = True): positions(features, **params)
+    devolve, vetorizado, a mesma posição que on_bar teria no
+    fecho de cada candle; GRID é a grelha de parâmetros por
+    omissão das sweeps.
+    """
+
+    name = "Strategy"
+    PARAMS: Dict[str, float] = {}
+    EVENTS: Tuple[str, ...] = ("candle",)
+
+    BACKTEST = False
+    GRID: Dict[str, list] = {}
+
+    def __init__(self, **params):
+        unknown = set(params) - set(self.PARAMS)
+        if unknown:
+            raise ValueError(f"{self.name}: unknown params {sorted(unknown)}")
+
+        self.params = {**self.PARAMS, **params}
+        self.symbol = ""
+        self.reset()
+
+    def reset(self):
+        self.position = 0
+        self.strength = 0
+        self._signals: List[StrategySignal] = []
+
+    # ======================================================
+    # HOOKS (SUBCLASSES)
+    # ======================================================
+
+    def on_bar(self, o: float, h: float, l: float, c: float, v: float) -> Optional[int]:
+        return None
+
+    def on_trade(self, trade: Trade) -> Optional[int]:
+        return None
+
+    def on_book(
+        self,
+        bids: Sequence[Tuple[float, float]],
+        asks: Sequence[Tuple[float, float]],
+        snapshot: bool,
+    ) -> Optional[int]:
+        return None
+
+    @classmethod
+    def positions(cls, features, **params) -> np.ndarray:
+        """
+        Posição-alvo (int8) no fecho de cada candle.
+        """
+        raise NotImplementedError(f"{cls.name} has no vectorized form")
+
+    # ======================================================
+    # DESPACHO (THREAD DO RUNTIME)
+    # ======================================================
+
+    def on_candle(self, candle: Candle, closed: bool, emit: bool = True):
+        if not closed:
+            return
+        target = self.on_bar(candle.open, candle.high, candle.low, candle.close, candle.volume)
+        self._apply(target, candle.open_time, candle.close, emit)
+
+    def handle_trade(self, trade: Trade):
+        self._apply(self.on_trade(trade), trade.ts, trade.price, True)
+
+    def handle_book(self, bids, asks, snapshot: bool, ts: int, price: float):
+        self._apply(self.on_book(bids, asks, snapshot), ts, price, True)
+
+    def _apply(self, target: Optional[int], ts: int, price: float, emit: bool):
+        if target is None or target == self.position:
+            return
+        self.position = target
+        if emit:
+            self._signals.append(
+                StrategySignal(
+                    ts=ts,
+                    symbol=self.symbol,
+                    strategy=self.name,
+                    side=POSITION_NAMES[target],
+                    price=price,
+                    strength=int(max(0, min(100, self.strength))),
+                )
+            )
+
+    def take_signals(self) -> List[StrategySignal]:
+        signals, self._signals = self._signals, []
+        return signals
@@ -0,0 +1,347 @@
+import math
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+import numpy as np
+
+from core.microstructure_engine import BookSide
+from core.strategy.base import Strategy
+from core.strategy.features import hold_last, previous_valid
+
+
+# ==========================================================
+# ESTRATÉGIAS INCLUÍDAS
+# ==========================================================
+# Todas O(1) por evento (somas correntes / deques monotónicas).
+# Posição decidida no fecho do candle; None → mantém.
+# As de candles têm a forma vetorizada equivalente (positions)
+# sobre o FeatureCache, para backtests e sweeps.
+# ==========================================================
+
+
+class MomentumStrategy(Strategy):
+    """
+    Cruzamento de EMAs: long com fast > slow, short com fast < slow.
+    EMAs semeadas com o primeiro close; decide após `slow` candles.
+    """
+
+    name = "Momentum"
+    PARAMS = {"fast": 9, "slow": 21}
+    BACKTEST = True
+    GRID = {"fast": [5, 9, 12, 20], "slow": [21, 34, 50, 100, 200]}
+
+    def reset(self):
+        super().reset()
+        self._bars = 0
+        self._fast: Optional[float] = None
+        self._slow: Optional[float] = None
+
+    def on_bar(self, o, h, l, c, v):
+        a_fast = 2.0 / (self.params["fast"] + 1)
+        a_slow = 2.0 / (self.params["slow"] + 1)
+
+        if self._fast is None:
+            self._fast = self._slow = c
+        else:
+            self._fast += a_fast * (c - self._fast)
+            self._slow += a_slow * (c - self._slow)
+
+        self._bars += 1
+        if self._bars < self.params["slow"]:
+            return None
+
+        spread = self._fast - self._slow
+        self.strength = round(abs(spread) / self._slow * 10_000) if self._slow else 0
+        if spread > 0:
+            return 1
+        if spread < 0:
+            return -1
+        return None
+
+    @classmethod
+    def positions(cls, features, **params):
+        p = {**cls.PARAMS, **params}
+        spread = features.ema(p["fast"]) - features.ema(p["slow"])
+
+        events = np.sign(spread)
+        events[events == 0] = np.nan
+        events[: p["slow"] - 1] = np.nan
+        return hold_last(events)
+
+
+class MeanReversionStrategy(Strategy):
+    """
+    z-score do close contra a SMA / desvio padrão de `period`:
+    - z < -k → long, z > k → short
+    - sai (flat) quando z cruza o zero
+    """
+
+    name = "Mean Reversion"
+    PARAMS = {"period": 20, "k": 2.0}
+    BACKTEST = True
+    GRID = {"period": [10, 20, 30, 50, 100], "k": [1.0, 1.5, 2.0, 2.5, 3.0]}
+
+    def reset(self):
+        super().reset()
+        self._window: Deque[float] = deque()
+        # Somas deslocadas pelo 1º close (menos cancelamento)
+        self._shift: Optional[float] = None
+        self._s1 = 0.0
+        self._s2 = 0.0
+        self._prev_z: Optional[float] = None
+
+    def on_bar(self, o, h, l, c, v):
+        n = self.params["period"]
+        k = self.params["k"]
+
+        if self._shift is None:
+            self._shift = c
+        x = c - self._shift
+
+        window = self._window
+        window.append(x)
+        self._s1 += x
+        self._s2 += x * x
+        if len(window) > n:
+            old = window.popleft()
+            self._s1 -= old
+            self._s2 -= old * old
+        if len(window) < n:
+            return None
+
+        m = self._s1 / n
+        sd = math.sqrt(max(0.0, self._s2 / n - m * m))
+        mean = m + self._shift
+        if sd <= 1e-9 * abs(mean):
+            return None
+
+        z = (c - mean) / sd
+        prev_z, self._prev_z = self._prev_z, z
+        self.strength = round(abs(z) / (2 * k) * 100)
+
+        if z < -k:
+            return 1
+        if z > k:
+            return -1
+        if prev_z is not None and (prev_z < 0 <= z or prev_z > 0 >= z):
+            return 0
+        return None
+
+    @classmethod
+    def positions(cls, features, **params):
+        p = {**cls.PARAMS, **params}
+        k = p["k"]
+        period = p["period"]
+
+        # z e cruzamentos do zero só dependem de `period`: partilhados
+        # por todos os k da grelha
+        def compute():
+            mean, sd = features.mean_std(period)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                z = np.where(sd > 1e-9 * np.abs(mean), (features.close - mean) / sd, np.nan)
+            prev_z = previous_valid(z)
+            crossed = ((prev_z < 0) & (z >= 0)) | ((prev_z > 0) & (z <= 0))
+            return np.stack([z, np.where(crossed, 0.0, np.nan)])
+
+        z, events = features.get(("mr_zscore", period), compute)
+        events = events.copy()
+        events[z > k] = -1.0
+        events[z < -k] = 1.0
+        return hold_last(events)
+
+
+class BreakoutStrategy(Strategy):
+    """
+    Canal de Donchian dos `period` candles anteriores:
+    close acima do máximo → long, abaixo do mínimo → short.
+    """
+
+    name = "Breakout"
+    PARAMS = {"period": 20}
+    BACKTEST = True
+    GRID = {"period": [10, 20, 30, 55, 100, 200]}
+
+    def reset(self):
+        super().reset()
+        self._bars = 0
+        # (índice, valor): máximos decrescentes / mínimos crescentes
+        self._highs: Deque[Tuple[int, float]] = deque()
+        self._lows: Deque[Tuple[int, float]] = deque()
+
+    def on_bar(self, o, h, l, c, v):
+        n = self.params["period"]
+        i = self._bars
+        self._bars += 1
+
+        highs, lows = self._highs, self._lows
+        while highs and highs[0][0] < i - n:
+            highs.popleft()
+        while lows and lows[0][0] < i - n:
+            lows.popleft()
+
+        target = None
+        if i >= n:
+            upper, lower = highs[0][1], lows[0][1]
+            width = upper - lower
+            if c > upper:
+                target = 1
+                self.strength = round((c - upper) / width * 100) if width > 0 else 100
+            elif c < lower:
+                target = -1
+                self.strength = round((lower - c) / width * 100) if width > 0 else 100
+
+        # O candle atual só entra no canal dos seguintes
+        while highs and highs[-1][1] <= h:
+            highs.pop()
+        highs.append((i, h))
+        while lows and lows[-1][1] >= l:
+            lows.pop()
+        lows.append((i, l))
+
+        return target
+
+    @classmethod
+    def positions(cls, features, **params):
+        p = {**cls.PARAMS, **params}
+        upper = features.prev_high(p["period"])
+        lower = features.prev_low(p["period"])
+        c = features.close
+
+        events = np.select([c > upper, c < lower], [1.0, -1.0], default=np.nan)
+        return hold_last(events)
+
+
+class VolumeSpikeStrategy(Strategy):
+    """
+    Volume > mult × média dos `period` candles anteriores:
+    posição na direção do candle (close vs open) durante `hold`
+    candles a contar do spike.
+    """
+
+    name = "Volume Spike"
+    PARAMS = {"period": 20, "mult": 3.0, "hold": 5}
+    BACKTEST = True
+    GRID = {"period": [20, 50], "mult": [2.0, 3.0, 4.0], "hold": [1, 3, 5, 10]}
+
+    def reset(self):
+        super().reset()
+        self._bars = 0
+        self._volumes: Deque[float] = deque()
+        self._sum = 0.0
+        self._last_spike = -1
+        self._last_dir = 0
+
+    def on_bar(self, o, h, l, c, v):
+        n = self.params["period"]
+        i = self._bars
+        self._bars += 1
+
+        volumes = self._volumes
+        if len(volumes) == n:
+            avg = self._sum / n
+            if avg > 0 and v > self.params["mult"] * avg:
+                self._last_spike = i
+                self._last_dir = int(c > o) - int(c < o)
+                self.strength = round(v / avg / self.params["mult"] * 50)
+
+        volumes.append(v)
+        self._sum += v
+        if len(volumes) > n:
+            self._sum -= volumes.popleft()
+
+        if self._last_spike >= 0 and i - self._last_spike < self.params["hold"]:
+            return self._last_dir
+        return 0
+
+    @classmethod
+    def positions(cls, features, **params):
+        p = {**cls.PARAMS, **params}
+        avg = features.prev_volume_mean(p["period"])
+        v = features.volume
+        direction = np.sign(features.close - features.open).astype(np.int8)
+
+        with np.errstate(invalid="ignore"):
+            spike = (avg > 0) & (v > p["mult"] * avg)
+
+        idx = np.arange(len(v))
+        last = np.where(spike, idx, -1)
+        np.maximum.accumulate(last, out=last)
+        active = (last >= 0) & (idx - last < p["hold"])
+        return np.where(active, direction[np.maximum(last, 0)], 0).astype(np.int8)
+
+
+class FlowImbalanceStrategy(Strategy):
+    """
+    Order flow ao vivo (sem backtest em candles):
+    - delta agressor das últimas `trades` trades / volume
+    - desequilíbrio do topo do book bid / (bid + ask)
+    Long com fluxo ≥ threshold e book comprador, short no
+    simétrico, flat quando o fluxo perde força (< threshold / 2).
+    """
+
+    name = "Flow Imbalance"
+    PARAMS = {"trades": 200, "threshold": 0.4, "book": 0.55}
+    EVENTS = ("trade", "book")
+
+    def reset(self):
+        super().reset()
+        self._window: Deque[Tuple[float, float]] = deque()   # (qty, qty com sinal)
+        self._volume = 0.0
+        self._delta = 0.0
+        self._bids = BookSide(is_bid=True)
+        self._asks = BookSide(is_bid=False)
+        self._book_ratio = 0.5
+
+    def on_book(self, bids, asks, snapshot):
+        if snapshot:
+            self._bids.load(bids)
+            self._asks.load(asks)
+        else:
+            for p, s in bids:
+                self._bids.set(p, s)
+            for p, s in asks:
+                self._asks.set(p, s)
+
+        _, bid_size = self._bids.best()
+        _, ask_size = self._asks.best()
+        total = bid_size + ask_size
+        self._book_ratio = bid_size / total if total > 0 else 0.5
+        return None
+
+    def on_trade(self, trade):
+        qty = trade.qty
+        signed = qty if trade.side == "Buy" else -qty
+
+        window = self._window
+        window.append((qty, signed))
+        self._volume += qty
+        self._delta += signed
+        if len(window) > self.params["trades"]:
+            old_qty, old_signed = window.popleft()
+            self._volume -= old_qty
+            self._delta -= old_signed
+        if len(window) < self.params["trades"] or self._volume <= 0:
+            return None
+
+        flow = self._delta / self._volume
+        threshold = self.params["threshold"]
+        book = self.params["book"]
+        self.strength = round(abs(flow) * 100)
+
+        if flow >= threshold and self._book_ratio >= book:
+            return 1
+        if flow <= -threshold and self._book_ratio <= 1 - book:
+            return -1
+        if abs(flow) < threshold / 2:
+            return 0
+        return None
+
+
+# Estratégias registadas por omissão no runtime
+BUILTIN_STRATEGIES = (
+    MeanReversionStrategy,
+    MomentumStrategy,
+    VolumeSpikeStrategy,
+    BreakoutStrategy,
+    FlowImbalanceStrategy,
+)
@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy as np
+
+from core.data_engine.candle_store import CLOSE, HIGH, LOW, OPEN, T, VOLUME
+from core.indicator_engine import ema_array, rolling_sum
+
+
+# ==========================================================
+# FEATURES VETORIZADAS (BACKTEST)
+# ==========================================================
+# Séries derivadas dos candles, calculadas uma vez e reutilizadas
+# por todas as combinações de parâmetros que as pedem (ex: a EMA
+# de 21 serve todas as combinações com slow = 21).
+#
+# Convenção de alinhamento: o valor no índice i usa apenas
+# candles ≤ i (os "prev_*" usam só candles < i), NaN enquanto
+# a janela não está completa — igual ao estado incremental das
+# estratégias no fecho do candle i.
+# ==========================================================
+
+
+class FeatureCache:
+    """
+    Memo de features sobre um array de candles (6, n).
+    LRU limitado a `max_items` séries (grelhas largas não
+    esgotam a memória dos workers).
+    """
+
+    def __init__(self, bars: np.ndarray, max_items: int = 64):
+        self.bars = bars
+        self.max_items = max_items
+        self._memo: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.bars.shape[1]
+
+    # Colunas (views; o array pode ser um memory-map)
+    @property
+    def t(self) -> np.ndarray:
+        return self.bars[T]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.bars[OPEN]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.bars[HIGH]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.bars[LOW]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.bars[CLOSE]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.bars[VOLUME]
+
+    def get(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        memo = self._memo
+        value = memo.get(key)
+        if value is None:
+            value = memo[key] = compute()
+            if len(memo) > self.max_items:
+                memo.popitem(last=False)
+        else:
+            memo.move_to_end(key)
+        return value
+
+    def clear(self):
+        self._memo.clear()
+
+    # ======================================================
+    # FEATURES
+    # ======================================================
+
+    def returns(self) -> np.ndarray:
+        """
+        r[i] = close[i] / close[i-1] - 1 (r[0] = 0).
+        """
+        def compute():
+            c = self.close
+            r = np.zeros(len(c))
+            r[1:] = c[1:] / c[:-1] - 1.0
+            return r
+        return self.get("returns", compute)
+
+    def ema(self, period: int) -> np.ndarray:
+        """
+        EMA do close semeada com o primeiro close.
+        """
+        def compute():
+            c = np.asarray(self.close, dtype=np.float64)
+            if not len(c):
+                return c.copy()
+            return ema_array(c, 2.0 / (period + 1), float(c[0]))
+        return self.get(("ema", period), compute)
+
+    def mean_std(self, period: int):
+        """
+        (média, desvio padrão populacional) do close em `period`.
+        Somas deslocadas pelo 1º close, como na forma incremental.
+        """
+        def compute():
+            c = np.asarray(self.close, dtype=np.float64)
+            x = c - c[0] if len(c) else c
+            s1 = rolling_sum(x, period)
+            s2 = rolling_sum(x * x, period)
+            m = s1 / period
+            var = np.maximum(0.0, s2 / period - m * m)
+            return np.stack([m + (c[0] if len(c) else 0.0), np.sqrt(var)])
+        return self.get(("mean_std", period), compute)
+
+    def _prev_window(self, key, x: np.ndarray, period: int, reduce) -> np.ndarray:
+        def compute():
+            out = np.full(len(x), np.nan)
+            if len(x) > period:
+                windows = np.lib.stride_tricks.sliding_window_view(x, period)
+                # Janela de x[i - period : i] → índice i
+                out[period:] = reduce(windows[:-1], axis=1)
+            return out
+        return self.get((key, period), compute)
+
+    def prev_high(self, period: int) -> np.ndarray:
+        """
+        Máximo dos `period` highs anteriores (Donchian superior).
+        """
+        return self._prev_window("prev_high", self.high, period, np.max)
+
+    def prev_low(self, period: int) -> np.ndarray:
+        return self._prev_window("prev_low", self.low, period, np.min)
+
+    def prev_volume_mean(self, period: int) -> np.ndarray:
+        """
+        Média dos `period` volumes anteriores.
+        """
+        def compute():
+            v = np.asarray(self.volume, dtype=np.float64)
+            out = np.full(len(v), np.nan)
+            if len(v) > period:
+                out[period:] = rolling_sum(v, period)[period - 1 : -1] / period
+            return out
+        return self.get(("prev_volume_mean", period), compute)
+
+
+# ==========================================================
+# KERNELS DE POSIÇÃO
+# ==========================================================
+
+def hold_last(events: np.ndarray, initial: float = 0.0) -> np.ndarray:
+    """
+    Posição a partir de eventos (NaN = mantém): forward-fill do
+    último evento, `initial` antes do primeiro.
+    """
+    n = len(events)
+    idx = np.arange(n, dtype=np.int32)
+    idx[np.isnan(events)] = -1
+    np.maximum.accumulate(idx, out=idx)
+
+    # idx é crescente: antes do 1º evento fica -1
+    first = np.searchsorted(idx, 0)
+    pos = np.empty(n, dtype=np.int8)
+    pos[:first] = initial
+    pos[first:] = events[idx[first:]]
+    return pos
+
+
+def previous_valid(x: np.ndarray) -> np.ndarray:
+    """
+    Para cada i, o último valor não-NaN em x[:i] (NaN se nenhum).
+    """
+    n = len(x)
+    if not n:
+        return np.empty(0)
+    idx = np.where(np.isnan(x), -1, np.arange(n))
+    np.maximum.accumulate(idx, out=idx)
+    prev = np.empty(n, dtype=np.int64)
+    prev[0] = -1
+    prev[1:] = idx[:-1]
+    return np.where(prev >= 0, x[np.maximum(prev, 0)], np.nan)
@@ -0,0 +1,245 @@
+# ==========================================================
+# STRATEGY HOST (PROCESSO DAS ESTRATÉGIAS)
+# ==========================================================
+# Corre num processo próprio (sem Qt): uma estratégia lenta
+# ou presa ao CPU não disputa o GIL da UI.
+#
+# - inbox: lotes de eventos vindos da UI
+# - cada estratégia tem thread + fila próprias (uma estratégia
+#   lenta só atrasa a sua fila)
+# - outbox: lotes de sinais e estado por estratégia
+# ==========================================================
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Tuple
+
+from core.strategy.base import Strategy, StrategySignal
+
+
+# Tipos de itens nas filas
+CANDLE = "candle"
+TRADE = "trade"
+BOOK = "book"
+HISTORY = "history"
+RESET = "reset"
+REGISTER = "register"
+
+# Intervalo mínimo entre lotes de sinais / estado (s)
+BATCH_S = 0.1
+
+
+@dataclass
+class StrategyStats:
+    """
+    Estado de um worker.
+
+    - cpu_ms: CPU total da thread do worker (thread_time)
+    - load: fração de um core desde o último envio
+    """
+    name: str
+    position: int = 0
+    events: int = 0
+    signals: int = 0
+    cpu_ms: float = 0.0
+    load: float = 0.0
+    queued: int = 0
+    dropped: int = 0
+
+
+class StrategyWorker:
+    """
+    Thread + fila de uma estratégia.
+
+    - candles fechados / histórico / reset nunca são descartados
+    - updates do candle em formação são coalescidos (só o último)
+    - trades e book acima de MAX_QUEUE são descartados e contados
+      (o book da estratégia pode ficar desfasado até ao próximo
+      snapshot)
+    """
+
+    MAX_QUEUE = 20_000
+
+    def __init__(self, strategy: Strategy, outbox: List[StrategySignal], lock: threading.Lock):
+        self.strategy = strategy
+        self.stats = StrategyStats(strategy.name)
+
+        # Sinais partilhados com o loop do host
+        self._outbox = outbox
+        self._outbox_lock = lock
+
+        self._queue: Deque[Tuple[str, object]] = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        # Último preço / ts (eventos de book não trazem nenhum)
+        self._last_ts = 0
+        self._last_price = 0.0
+
+        # Janela da medição de carga
+        self._load_wall = time.perf_counter()
+        self._load_cpu = 0.0
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"Strategy-{strategy.name}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    # ======================================================
+    # FILA
+    # ======================================================
+
+    def put(self, kind: str, item):
+        items = self._queue
+        with self._cond:
+            if kind in (TRADE, BOOK) and len(items) >= self.MAX_QUEUE:
+                self.stats.dropped += 1
+                return
+            if kind == CANDLE and not item.closed and items:
+                last_kind, last = items[-1]
+                if last_kind == CANDLE and not last.closed:
+                    items[-1] = (kind, item)
+                    return
+            items.append((kind, item))
+            self.stats.queued = len(items)
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    # ======================================================
+    # LOOP DO WORKER
+    # ======================================================
+
+    def _run(self):
+        strategy = self.strategy
+        stats = self.stats
+        cpu_start = time.thread_time_ns()
+
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                batch = list(self._queue)
+                self._queue.clear()
+                stats.queued = 0
+
+            for kind, item in batch:
+                try:
+                    self._dispatch(kind, item)
+                except Exception as e:
+                    logging.getLogger(__name__).exception(
+                        "Strategy %s failed: %s", strategy.name, e
+                    )
+                # Por evento: lotes longos também aparecem na carga
+                stats.events += 1
+                stats.cpu_ms = (time.thread_time_ns() - cpu_start) / 1e6
+
+            stats.position = strategy.position
+
+            signals = strategy.take_signals()
+            if signals:
+                stats.signals += len(signals)
+                with self._outbox_lock:
+                    self._outbox.extend(signals)
+
+    def _dispatch(self, kind: str, item):
+        strategy = self.strategy
+
+        if kind == CANDLE:
+            strategy.on_candle(item.candle, item.closed)
+            self._last_ts, self._last_price = item.candle.open_time, item.candle.close
+        elif kind == TRADE:
+            trade = item.trade
+            strategy.handle_trade(trade)
+            self._last_ts, self._last_price = trade.ts, trade.price
+        elif kind == BOOK:
+            evt, snapshot = item
+            strategy.handle_book(evt.bids, evt.asks, snapshot, self._last_ts, self._last_price)
+        elif kind == HISTORY:
+            # Aquecimento: estado sim, sinais não (são passado).
+            # O último candle do REST ainda está em formação: entra
+            # quando fechar ao vivo (senão contaria duas vezes)
+            strategy.reset()
+            strategy.symbol = item.symbol
+            for candle in item.candles[:-1]:
+                strategy.on_candle(candle, True, emit=False)
+        elif kind == RESET:
+            strategy.reset()
+            strategy.symbol = item
+
+    def sample(self) -> StrategyStats:
+        """
+        Cópia do estado, com a carga desde a última amostra.
+        """
+        now = time.perf_counter()
+        cpu = self.stats.cpu_ms
+        wall = now - self._load_wall
+        if wall > 0:
+            self.stats.load = (cpu - self._load_cpu) / 1000 / wall
+        self._load_wall, self._load_cpu = now, cpu
+        return StrategyStats(**vars(self.stats))
+
+
+# ==========================================================
+# ENTRYPOINT DO PROCESSO
+# ==========================================================
+
+def host_main(inbox, outbox):
+    """
+    Loop do processo: distribui lotes da inbox pelos workers e
+    devolve ("signals", list) / ("stats", list) pela outbox.
+
+    Mensagens da inbox: lista de (kind, payload); None → termina.
+    """
+    workers: List[StrategyWorker] = []
+    by_event = {CANDLE: [], TRADE: [], BOOK: []}
+
+    signals: List[StrategySignal] = []
+    lock = threading.Lock()
+    last_flush = time.perf_counter()
+
+    while True:
+        try:
+            batch = inbox.get(timeout=BATCH_S)
+        except queue.Empty:
+            # Timeout → só flush
+            batch = []
+        if batch is None:
+            break
+
+        for kind, payload in batch:
+            if kind == REGISTER:
+                worker = StrategyWorker(payload, signals, lock)
+                workers.append(worker)
+                for event in payload.EVENTS:
+                    by_event[event].append(worker)
+            elif kind in (RESET, HISTORY):
+                targets = workers if kind == RESET else by_event[CANDLE]
+                for worker in targets:
+                    worker.put(kind, payload)
+            else:
+                for worker in by_event[kind]:
+                    worker.put(kind, payload)
+
+        now = time.perf_counter()
+        if now - last_flush >= BATCH_S:
+            last_flush = now
+            with lock:
+                out, signals[:] = list(signals), []
+            if out:
+                outbox.put(("signals", out))
+            outbox.put(("stats", [w.sample() for w in workers]))
+
+    for worker in workers:
+        worker.stop()
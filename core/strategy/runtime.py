@@ -0,0 +1,219 @@
+# ==========================================================
+# STRATEGY RUNTIME (ESTRATÉGIAS FORA DA THREAD DA UI)
+# ==========================================================
+# Responsável por:
+# - receber candles / trades / book do CoreDataEngine
+# - enviá-los em lotes ao processo das estratégias (host.py)
+# - devolver StrategySignal à UI em lotes (sinais queued)
+# - expor o estado / CPU medido por estratégia
+#
+# Os slots da UI só acrescentam a uma lista; o envio (pickle)
+# acontece num timer a cada FLUSH_MS e a leitura dos resultados
+# numa thread bloqueada na queue (sem disputar o GIL).
+# ==========================================================
+
+import logging
+import multiprocessing as mp
+import threading
+from typing import List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from core.data_engine.events import (
+    CandleHistory,
+    CandleUpdate,
+    DepthSnapshotEvent,
+    DepthUpdateEvent,
+    SymbolChanged,
+    TradeEvent,
+)
+from core.strategy import host
+from core.strategy.base import Strategy
+from core.strategy.host import StrategyStats
+
+
+class StrategyRuntime(QObject):
+    """
+    Runtime de estratégias ao vivo.
+
+    - register(): a estratégia (instância, picklable) é enviada
+      ao processo host, onde ganha thread + fila próprias
+    - attach(engine): liga aos sinais do CoreDataEngine
+    - signals_ready(list[StrategySignal]) em lotes
+    - stats(): último StrategyStats recebido por estratégia
+    """
+
+    # ------------------------------------------------------
+    # SINAIS PÚBLICOS (QT)
+    # ------------------------------------------------------
+
+    signals_ready = Signal(object)   # list[StrategySignal]
+
+    # Intervalo de envio dos eventos para o host (ms)
+    FLUSH_MS = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._logger = logging.getLogger(__name__)
+
+        self._strategies: List[Strategy] = []
+        self._stats: List[StrategyStats] = []
+        self._pending: List[Tuple[str, object]] = []
+        self._wants_trades = False
+        self._wants_book = False
+        self.symbol = ""
+        self.timeframe = "1m"
+
+        # Processo host + filas (arranque preguiçoso)
+        self._ctx = mp.get_context("spawn")
+        self._process: Optional[mp.process.BaseProcess] = None
+        self._inbox = None
+        self._outbox = None
+        self._reader: Optional[threading.Thread] = None
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.FLUSH_MS)
+        self._flush_timer.timeout.connect(self._flush)
+
+    # ======================================================
+    # REGISTO / CICLO DE VIDA
+    # ======================================================
+
+    def register(self, strategy: Strategy) -> Strategy:
+        strategy.symbol = self.symbol
+        self._strategies.append(strategy)
+        self._stats.append(StrategyStats(strategy.name))
+        self._wants_trades |= "trade" in strategy.EVENTS
+        self._wants_book |= "book" in strategy.EVENTS
+        self._pending.append((host.REGISTER, strategy))
+        return strategy
+
+    @property
+    def strategies(self) -> List[Strategy]:
+        """
+        Instâncias registadas (configuração; o estado vivo está no host).
+        """
+        return list(self._strategies)
+
+    def stats(self) -> List[StrategyStats]:
+        return list(self._stats)
+
+    def start(self):
+        if self._process is not None:
+            return
+
+        self._inbox = self._ctx.Queue()
+        self._outbox = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=host.host_main,
+            args=(self._inbox, self._outbox),
+            name="StrategyHost",
+            daemon=True,
+        )
+        self._process.start()
+
+        self._reader = threading.Thread(
+            target=self._read,
+            args=(self._outbox,),
+            name="StrategyRuntimeReader",
+            daemon=True,
+        )
+        self._reader.start()
+
+        self._flush_timer.start()
+        self._logger.info("StrategyRuntime host started (pid %s)", self._process.pid)
+
+    def stop(self):
+        if self._process is None:
+            return
+        self._flush_timer.stop()
+        self._inbox.put(None)
+        self._outbox.put(None)
+        self._process.join(1.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+
+    # ======================================================
+    # ENVIO / RECEÇÃO
+    # ======================================================
+
+    def _flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        if not self._process.is_alive():
+            # Host morreu: descarta em vez de acumular na queue
+            self._logger.warning("StrategyRuntime host is not running; dropping %d events", len(batch))
+            return
+        try:
+            self._inbox.put(batch)
+        except Exception as e:
+            self._logger.warning("StrategyRuntime send failed: %s", e)
+
+    def _read(self, outbox):
+        """
+        Thread de leitura: bloqueada em get() até haver resultados.
+        """
+        while True:
+            try:
+                msg = outbox.get()
+            except (EOFError, OSError):
+                return
+            if msg is None:
+                return
+
+            kind, payload = msg
+            if kind == "signals":
+                self.signals_ready.emit(payload)
+            elif kind == "stats":
+                self._stats = payload
+
+    # ======================================================
+    # LIGAÇÃO AO CORE DATA ENGINE
+    # ======================================================
+
+    def attach(self, engine):
+        engine.symbol_changed.connect(self.on_symbol_changed)
+        engine.candle_history.connect(self.on_candle_history)
+        engine.candle_update.connect(self.on_candle_update)
+        engine.trade.connect(self.on_trade)
+        engine.depth_snapshot.connect(self.on_depth_snapshot)
+        engine.depth_update.connect(self.on_depth_update)
+        self.start()
+
+    # ======================================================
+    # SLOTS (THREAD DA UI → LOTE PENDENTE)
+    # ======================================================
+
+    def on_symbol_changed(self, evt: SymbolChanged):
+        self.symbol = evt.symbol
+        self._pending.append((host.RESET, evt.symbol))
+
+    def on_candle_history(self, evt: CandleHistory):
+        self.symbol = evt.symbol
+        self.timeframe = evt.timeframe
+        self._pending.append((host.HISTORY, evt))
+
+    def on_candle_update(self, evt: CandleUpdate):
+        pending = self._pending
+        # Candle em formação: só o último conta
+        if not evt.closed and pending:
+            kind, last = pending[-1]
+            if kind == host.CANDLE and not last.closed:
+                pending[-1] = (host.CANDLE, evt)
+                return
+        pending.append((host.CANDLE, evt))
+
+    def on_trade(self, evt: TradeEvent):
+        if self._wants_trades:
+            self._pending.append((host.TRADE, evt))
+
+    def on_depth_snapshot(self, evt: DepthSnapshotEvent):
+        if self._wants_book:
+            self._pending.append((host.BOOK, (evt, True)))
+
+    def on_depth_update(self, evt: DepthUpdateEvent):
+        if self._wants_book:
+            self._pending.append((host.BOOK, (evt, False)))
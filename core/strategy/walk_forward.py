@@ -0,0 +1,255 @@
+# ==========================================================
+# WALK-FORWARD (OTIMIZAÇÃO IN-SAMPLE / OUT-OF-SAMPLE)
+# ==========================================================
+# Responsável por:
+# - janelas deslizantes (ou ancoradas) treino → teste
+# - escolher em cada fold a melhor combinação da grelha no
+#   treino e medi-la no teste seguinte
+#
+# Nada é recalculado por fold:
+# 1) as posições de todas as combinações são calculadas uma vez
+#    sobre o histórico completo (FeatureCache partilhado) e
+#    gravadas numa matriz int8 (combinações × candles) em .npy
+# 2) os folds correm num process pool; cada worker abre candles
+#    e matriz em memory-map e só avalia fatias [início, fim)
+#
+# As posições no índice i só usam candles ≤ i, por isso fatiar
+# a matriz é igual a correr a estratégia aquecida até ao fold.
+# ==========================================================
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Type, Union
+
+import multiprocessing as mp
+import numpy as np
+
+from core.strategy.backtest import evaluate, load_bars, param_grid
+from core.strategy.base import Strategy
+from core.strategy.features import FeatureCache
+
+
+@dataclass
+class Fold:
+    """
+    Treino em [train_start, train_end), teste em [train_end, test_end).
+    """
+    index: int
+    train_start: int
+    train_end: int
+    test_end: int
+
+
+@dataclass
+class FoldResult:
+    fold: Fold
+    params: Dict[str, float]
+    in_sample: Dict[str, float]
+    out_of_sample: Dict[str, float]
+
+
+def make_folds(
+    n: int,
+    train: int,
+    test: int,
+    step: Optional[int] = None,
+    anchored: bool = False,
+) -> List[Fold]:
+    """
+    Folds sobre n candles (em nº de candles).
+
+    - step: avanço entre folds (omissão: test → testes contíguos)
+    - anchored: o treino começa sempre no candle 0
+    """
+    step = step or test
+    folds = []
+    start = 0
+    while start + train + test <= n:
+        folds.append(Fold(
+            index=len(folds),
+            train_start=0 if anchored else start,
+            train_end=start + train,
+            test_end=start + train + test,
+        ))
+        start += step
+    return folds
+
+
+# ==========================================================
+# WORKERS DO POOL
+# ==========================================================
+# Os mesmos globais servem as duas fases: candles (+ features)
+# e a matriz de posições, ambos em memory-map.
+# ==========================================================
+
+_features: Optional[FeatureCache] = None
+_positions: Optional[np.ndarray] = None
+
+
+def _init_worker(bars_source, positions_path, mode):
+    global _features, _positions
+    _features = FeatureCache(load_bars(bars_source))
+    _positions = np.load(positions_path, mmap_mode=mode)
+
+
+def _fill_rows(strategy_cls, first_row, batch) -> int:
+    for offset, params in enumerate(batch):
+        _positions[first_row + offset] = strategy_cls.positions(_features, **params)
+    _positions.flush()
+    return len(batch)
+
+
+def _run_fold(fold: Fold, combos, notional, cost_bps, objective) -> FoldResult:
+    scores = [
+        evaluate(_positions[row], _features, notional, cost_bps, fold.train_start, fold.train_end)
+        for row in range(len(combos))
+    ]
+    best = max(range(len(combos)), key=lambda row: scores[row][objective])
+    return FoldResult(
+        fold=fold,
+        params=combos[best],
+        in_sample=scores[best],
+        out_of_sample=evaluate(
+            _positions[best], _features, notional, cost_bps, fold.train_end, fold.test_end
+        ),
+    )
+
+
+# ==========================================================
+# API
+# ==========================================================
+
+def walk_forward(
+    strategy_cls: Type[Strategy],
+    bars: Union[np.ndarray, str],
+    train: int,
+    test: int,
+    grid: Optional[Dict[str, Sequence]] = None,
+    step: Optional[int] = None,
+    anchored: bool = False,
+    processes: Optional[int] = None,
+    notional: float = 10_000.0,
+    cost_bps: float = 2.0,
+    objective: str = "pnl",
+    workdir: Optional[str] = None,
+    cancelled=None,
+) -> Iterator[FoldResult]:
+    """
+    Walk-forward da grelha (GRID da estratégia por omissão);
+    devolve os FoldResult à medida que os folds terminam.
+
+    :param bars: array (6, n) ou caminho .npy (memory-map partilhado)
+    :param objective: métrica de evaluate() maximizada no treino
+    :param workdir: pasta dos .npy intermédios (omissão: temporária,
+                    apagada no fim)
+    """
+    combos = [
+        {**strategy_cls.PARAMS, **params}
+        for params in param_grid(grid if grid is not None else strategy_cls.GRID)
+    ]
+    n = load_bars(bars).shape[1]
+    folds = make_folds(n, train, test, step, anchored)
+    if not combos or not folds:
+        return
+
+    own_dir = workdir is None
+    work = Path(workdir or tempfile.mkdtemp(prefix="omniflow_wf_"))
+    work.mkdir(parents=True, exist_ok=True)
+    try:
+        # Candles em .npy para os workers os abrirem em memory-map
+        if not isinstance(bars, (str, os.PathLike)):
+            bars_path = str(work / "bars.npy")
+            np.save(bars_path, np.ascontiguousarray(bars, dtype=np.float64))
+            bars = bars_path
+
+        positions_path = str(work / "positions.npy")
+        np.lib.format.open_memmap(
+            positions_path, mode="w+", dtype=np.int8, shape=(len(combos), n)
+        ).flush()
+
+        processes = processes or os.cpu_count() or 1
+        if processes == 1:
+            _init_worker(bars, positions_path, "r+")
+            _fill_rows(strategy_cls, 0, combos)
+            for fold in folds:
+                if cancelled is not None and cancelled():
+                    return
+                yield _run_fold(fold, combos, notional, cost_bps, objective)
+            return
+
+        ctx = mp.get_context("spawn")
+        batch_size = max(1, len(combos) // (processes * 4))
+
+        # Fase 1: matriz de posições (cada worker escreve as suas linhas)
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(bars, positions_path, "r+"),
+        ) as pool:
+            futures = [
+                pool.submit(_fill_rows, strategy_cls, i, combos[i : i + batch_size])
+                for i in range(0, len(combos), batch_size)
+            ]
+            for future in as_completed(futures):
+                future.result()
+                if cancelled is not None and cancelled():
+                    for f in futures:
+                        f.cancel()
+                    return
+
+        # Fase 2: folds (só leitura)
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(bars, positions_path, "r"),
+        ) as pool:
+            futures = [
+                pool.submit(_run_fold, fold, combos, notional, cost_bps, objective)
+                for fold in folds
+            ]
+            try:
+                for future in as_completed(futures):
+                    if cancelled is not None and cancelled():
+                        break
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        if own_dir:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+def summarize(results: List[FoldResult]) -> Dict[str, float]:
+    """
+    Agregado out-of-sample (folds por ordem) e eficiência
+    walk-forward: P&L por candle no teste / no treino.
+    """
+    results = sorted(results, key=lambda r: r.fold.index)
+    oos = [r.out_of_sample for r in results]
+    trades = sum(o["trades"] for o in oos)
+    wins = sum(o["wins"] for o in oos)
+
+    is_rate = sum(r.in_sample["pnl"] for r in results) / max(
+        1, sum(r.fold.train_end - r.fold.train_start for r in results)
+    )
+    oos_rate = sum(o["pnl"] for o in oos) / max(
+        1, sum(r.fold.test_end - r.fold.train_end for r in results)
+    )
+
+    return {
+        "folds": len(results),
+        "oos_pnl": float(sum(o["pnl"] for o in oos)),
+        "oos_trades": trades,
+        "oos_win_rate": wins / trades if trades else 0.0,
+        "oos_max_drawdown": float(max((o["max_drawdown"] for o in oos), default=0.0)),
+        "profitable_folds": sum(o["pnl"] > 0 for o in oos),
+        "efficiency": oos_rate / is_rate if is_rate > 0 else 0.0,
+        "distinct_params": len({tuple(sorted(r.params.items())) for r in results}),
+    }
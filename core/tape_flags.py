@@ -0,0 +1,306 @@
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+
+# ==========================================================
+# JANELAS DESLIZANTES (TEMPO)
+# ==========================================================
+# Cada janela guarda as trades dos últimos window_ms por ordem
+# de chegada e mantém os agregados de forma incremental:
+# entrar / sair da janela custa O(1) amortizado, a consulta O(1).
+# ==========================================================
+
+
+def _price_key(price: float) -> float:
+    """
+    Chave de "mesmo preço" (|Δ| < 1e-6 na versão por scan).
+    """
+    return round(price, 6)
+
+
+class PriceCountWindow:
+    """
+    Nº de trades por preço exato na janela (iceberg).
+    """
+
+    def __init__(self, window_ms: int):
+        self.window_ms = window_ms
+        self._items: Deque[Tuple[int, float]] = deque()
+        self._counts: Dict[float, int] = {}
+
+    def evict(self, now_ms: int):
+        limit = now_ms - self.window_ms
+        items, counts = self._items, self._counts
+        while items and items[0][0] < limit:
+            _, key = items.popleft()
+            n = counts[key] - 1
+            if n:
+                counts[key] = n
+            else:
+                del counts[key]
+
+    def add(self, ts: int, price: float):
+        key = _price_key(price)
+        self._items.append((ts, key))
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def count(self, price: float) -> int:
+        return self._counts.get(_price_key(price), 0)
+
+    def clear(self):
+        self._items.clear()
+        self._counts.clear()
+
+
+class PriceNotionalWindow:
+    """
+    Notional acumulado por preço exato na janela (absorção).
+    """
+
+    def __init__(self, window_ms: int):
+        self.window_ms = window_ms
+        self._items: Deque[Tuple[int, float, float]] = deque()
+        # preço → [nº de trades, notional]
+        self._levels: Dict[float, list] = {}
+
+    def evict(self, now_ms: int):
+        limit = now_ms - self.window_ms
+        items, levels = self._items, self._levels
+        while items and items[0][0] < limit:
+            _, key, notional = items.popleft()
+            level = levels[key]
+            level[0] -= 1
+            if level[0]:
+                level[1] -= notional
+            else:
+                # Sem trades → zera (sem erro de arredondamento acumulado)
+                del levels[key]
+
+    def add(self, ts: int, price: float, notional: float):
+        key = _price_key(price)
+        self._items.append((ts, key, notional))
+        level = self._levels.get(key)
+        if level is None:
+            self._levels[key] = [1, notional]
+        else:
+            level[0] += 1
+            level[1] += notional
+
+    def notional(self, price: float) -> float:
+        level = self._levels.get(_price_key(price))
+        return level[1] if level is not None else 0.0
+
+    def clear(self):
+        self._items.clear()
+        self._levels.clear()
+
+
+class SweepWindow:
+    """
+    Agregados de sweep na janela:
+    - notional total (soma corrente)
+    - nº de preços distintos (arredondados a 2 casas)
+    - min / max de preço (deques monotónicas)
+    """
+
+    def __init__(self, window_ms: int):
+        self.window_ms = window_ms
+        self._items: Deque[Tuple[int, int, float, float]] = deque()
+        self._levels: Dict[float, int] = {}
+        self._notional = 0.0
+
+        # (id, preço): crescente em _min, decrescente em _max
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+        self._next_id = 0
+
+    def evict(self, now_ms: int):
+        limit = now_ms - self.window_ms
+        items, levels = self._items, self._levels
+        while items and items[0][0] < limit:
+            _, idx, price, notional = items.popleft()
+            self._notional -= notional
+
+            key = round(price, 2)
+            n = levels[key] - 1
+            if n:
+                levels[key] = n
+            else:
+                del levels[key]
+
+            if self._min and self._min[0][0] == idx:
+                self._min.popleft()
+            if self._max and self._max[0][0] == idx:
+                self._max.popleft()
+
+        if not items:
+            self._notional = 0.0
+
+    def add(self, ts: int, price: float, notional: float):
+        idx = self._next_id
+        self._next_id += 1
+
+        self._items.append((ts, idx, price, notional))
+        self._notional += notional
+
+        key = round(price, 2)
+        self._levels[key] = self._levels.get(key, 0) + 1
+
+        while self._min and self._min[-1][1] >= price:
+            self._min.pop()
+        self._min.append((idx, price))
+
+        while self._max and self._max[-1][1] <= price:
+            self._max.pop()
+        self._max.append((idx, price))
+
+    @property
+    def empty(self) -> bool:
+        return not self._items
+
+    @property
+    def notional(self) -> float:
+        return self._notional
+
+    @property
+    def levels(self) -> int:
+        return len(self._levels)
+
+    @property
+    def price_range(self) -> float:
+        if not self._items:
+            return 0.0
+        return self._max[0][1] - self._min[0][1]
+
+    def clear(self):
+        self._items.clear()
+        self._levels.clear()
+        self._min.clear()
+        self._max.clear()
+        self._notional = 0.0
+
+
+# ==========================================================
+# DETETOR DE FLAGS DO TAPE
+# ==========================================================
+
+# Bits das flags (histórico colunar do tape)
+FLAG_BITS = {
+    "Block": 1,
+    "Iceberg": 2,
+    "Sweep": 4,
+    "Absorb": 8,
+}
+
+
+def flags_to_mask(flags) -> int:
+    mask = 0
+    for flag in flags:
+        mask |= FLAG_BITS.get(flag, 0)
+    return mask
+
+
+def mask_to_flags(mask: int) -> List[str]:
+    return [name for name, bit in FLAG_BITS.items() if mask & bit]
+
+
+class TapeFlagDetector:
+    """
+    Flags heurísticas do tape sobre janelas deslizantes incrementais:
+    - Block   → notional ≥ block_threshold
+    - Iceberg → ≥ iceberg_count trades ao mesmo preço na janela
+                (e trade atual pequena)
+    - Sweep   → ≥ sweep_price_levels preços, range ≥ min_price_diff
+                e notional ≥ sweep_min_notional na janela
+    - Absorb  → notional ao mesmo preço na janela ≥ absorb_volume
+
+    As janelas contêm as trades anteriores à atual (a trade é
+    avaliada e só depois entra). O(1) amortizado por trade.
+    """
+
+    def __init__(
+        self,
+        block_threshold: float = 100_000.0,
+        iceberg_window_ms: int = 400,
+        iceberg_count: int = 5,
+        sweep_window_ms: int = 300,
+        sweep_price_levels: int = 4,
+        sweep_min_notional: float = 5_000.0,
+        sweep_min_price_diff: float = 1.0,
+        absorb_window_ms: int = 800,
+        absorb_volume: float = 20_000.0,
+    ):
+        self.block_threshold = block_threshold
+        self.iceberg_count = iceberg_count
+        self.sweep_price_levels = sweep_price_levels
+        self.sweep_min_notional = sweep_min_notional
+        self.sweep_min_price_diff = sweep_min_price_diff
+        self.absorb_volume = absorb_volume
+
+        self._iceberg = PriceCountWindow(iceberg_window_ms)
+        self._sweep = SweepWindow(sweep_window_ms)
+        self._absorb = PriceNotionalWindow(absorb_window_ms)
+
+    def configure(self, **params):
+        """
+        Atualiza thresholds / janelas (mudança de settings).
+        Uma janela com duração nova recomeça vazia.
+        """
+        windows = {
+            "iceberg_window_ms": self._iceberg,
+            "sweep_window_ms": self._sweep,
+            "absorb_window_ms": self._absorb,
+        }
+        for name, value in params.items():
+            window = windows.get(name)
+            if window is None:
+                setattr(self, name, value)
+            elif window.window_ms != value:
+                window.window_ms = value
+                window.clear()
+
+    def clear(self):
+        self._iceberg.clear()
+        self._sweep.clear()
+        self._absorb.clear()
+
+    def update(self, ts: int, price: float, notional: float, evaluate: bool = True) -> List[str]:
+        """
+        Avalia a trade contra a janela e acrescenta-a.
+
+        :param evaluate: False → só mantém as janelas (flags desligadas)
+        """
+        self._iceberg.evict(ts)
+        self._sweep.evict(ts)
+        self._absorb.evict(ts)
+
+        flags: List[str] = []
+        if evaluate:
+            # Block
+            if notional >= self.block_threshold:
+                flags.append("Block")
+
+            # Iceberg
+            if self._iceberg.count(price) >= self.iceberg_count \
+                    and notional < self.block_threshold * 0.05:
+                flags.append("Iceberg")
+
+            # Sweep
+            sweep = self._sweep
+            if (
+                not sweep.empty
+                and sweep.levels >= self.sweep_price_levels
+                and sweep.price_range >= self.sweep_min_price_diff
+                and sweep.notional >= self.sweep_min_notional
+            ):
+                flags.append("Sweep")
+
+            # Absorption
+            if self._absorb.notional(price) >= self.absorb_volume:
+                flags.append("Absorb")
+
+        self._iceberg.add(ts, price)
+        self._sweep.add(ts, price, notional)
+        self._absorb.add(ts, price, notional)
+
+        return flags
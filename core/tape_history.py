@@ -0,0 +1,182 @@
+from typing import Optional
+
+import numpy as np
+
+
+# ==========================================================
+# HISTÓRICO COLUNAR DO TAPE
+# ==========================================================
+# Centenas de milhares a milhões de trades em arrays NumPy
+# (um por campo), num anel endereçado por seq % capacidade:
+# trades antigas saem sem cópias. Pesquisas = máscaras
+# booleanas vetorizadas sobre as colunas.
+# ==========================================================
+
+
+SIDE_BUY = 1
+SIDE_SELL = -1
+
+
+class TradeHistory:
+    """
+    Anel colunar de trades com seq absoluto.
+
+    Colunas: ts (ms), price, qty, notional, side (+1 / -1), flags (bits)
+    - extend(): escrita em bloco (1 ou 2 slices)
+    - query(): filtros combinados, devolve os seqs (ordem cronológica)
+    """
+
+    def __init__(self, capacity: int = 1_000_000):
+        self.capacity = max(1, capacity)
+
+        self.ts = np.zeros(self.capacity, dtype=np.int64)
+        self.price = np.zeros(self.capacity)
+        self.qty = np.zeros(self.capacity)
+        self.notional = np.zeros(self.capacity)
+        self.side = np.zeros(self.capacity, dtype=np.int8)
+        self.flags = np.zeros(self.capacity, dtype=np.uint8)
+
+        # Seq a seguir à última trade / nº de trades guardadas
+        self.end_seq = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def first_seq(self) -> int:
+        return self.end_seq - self._count
+
+    def clear(self):
+        self.end_seq = 0
+        self._count = 0
+
+    # ======================================================
+    # ESCRITA
+    # ======================================================
+
+    def extend(self, ts, price, qty, side, flags):
+        """
+        Acrescenta um bloco de trades (arrays do mesmo tamanho).
+        """
+        n = len(ts)
+        if not n:
+            return
+
+        cap = self.capacity
+        if n > cap:
+            # Só as últimas `cap` cabem; os seqs continuam a contar
+            self.end_seq += n - cap
+            ts, price, qty, side, flags = (a[-cap:] for a in (ts, price, qty, side, flags))
+            n = cap
+
+        price = np.asarray(price, dtype=np.float64)
+        qty = np.asarray(qty, dtype=np.float64)
+        notional = price * qty
+
+        p0 = self.end_seq % cap
+        first = min(n, cap - p0)
+        for column, values in (
+            (self.ts, ts),
+            (self.price, price),
+            (self.qty, qty),
+            (self.notional, notional),
+            (self.side, side),
+            (self.flags, flags),
+        ):
+            column[p0 : p0 + first] = values[:first]
+            if first < n:
+                column[: n - first] = values[first:]
+
+        self.end_seq += n
+        self._count = min(cap, self._count + n)
+
+    # ======================================================
+    # LEITURA
+    # ======================================================
+
+    def contains(self, seq: int) -> bool:
+        return self.first_seq <= seq < self.end_seq
+
+    def row(self, seq: int) -> tuple:
+        """
+        (ts, price, qty, notional, side, flags) de um seq guardado.
+        """
+        p = seq % self.capacity
+        return (
+            int(self.ts[p]),
+            float(self.price[p]),
+            float(self.qty[p]),
+            float(self.notional[p]),
+            int(self.side[p]),
+            int(self.flags[p]),
+        )
+
+    def _segments(self):
+        """
+        Slices físicos (ordem cronológica) e seq do primeiro elemento.
+        """
+        cap = self.capacity
+        first = self.first_seq
+        p0 = first % cap
+        a_len = min(self._count, cap - p0)
+
+        segments = [(slice(p0, p0 + a_len), first)]
+        if a_len < self._count:
+            segments.append((slice(0, self._count - a_len), first + a_len))
+        return segments
+
+    def query(
+        self,
+        side: Optional[int] = None,
+        min_notional: float = 0.0,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        ts_min: Optional[int] = None,
+        ts_max: Optional[int] = None,
+        flags: int = 0,
+    ) -> np.ndarray:
+        """
+        Seqs das trades que passam todos os filtros (crescente).
+
+        :param flags: bits exigidos (qualquer um deles); 0 → sem filtro
+        """
+        if not self._count:
+            return np.empty(0, dtype=np.int64)
+
+        out = []
+        for sl, seq0 in self._segments():
+            mask = None
+
+            def _and(cond):
+                nonlocal mask
+                mask = cond if mask is None else mask & cond
+
+            if side is not None:
+                _and(self.side[sl] == side)
+            if min_notional > 0:
+                _and(self.notional[sl] >= min_notional)
+            if price_min is not None:
+                _and(self.price[sl] >= price_min)
+            if price_max is not None:
+                _and(self.price[sl] <= price_max)
+            if ts_min is not None:
+                _and(self.ts[sl] >= ts_min)
+            if ts_max is not None:
+                _and(self.ts[sl] <= ts_max)
+            if flags:
+                _and((self.flags[sl] & flags) != 0)
+
+            if mask is None:
+                n = sl.stop - sl.start
+                out.append(np.arange(seq0, seq0 + n, dtype=np.int64))
+            else:
+                out.append(np.flatnonzero(mask).astype(np.int64) + seq0)
+
+        return out[0] if len(out) == 1 else np.concatenate(out)
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        if not self._count:
+            return None
+        return int(self.ts[(self.end_seq - 1) % self.capacity])
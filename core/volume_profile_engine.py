@@ -0,0 +1,937 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.row_size import rebin_dense
+
+
+# ==========================================================
+# DATA CLASS — BALDE DE VOLUME POR PREÇO
+# ==========================================================
+
+@dataclass
+class ProfileBucket:
+    """
+    Representa um nível de preço no Volume Profile
+    """
+    price: float
+    volume: float
+
+
+# ==========================================================
+# TICK HISTOGRAM (ARRAY DENSO)
+# ==========================================================
+
+class TickHistogram:
+    """
+    Histograma de volume indexado por tick (array NumPy denso).
+
+    - índice i ↔ tick (origin + i), preço = tick * tick_size
+    - cresce automaticamente (dobra capacidade) quando o preço sai do range
+    - aceita quantidades negativas (decremento quando trades envelhecem)
+
+    POC mantido incrementalmente:
+    - incremento → comparação O(1) com o máximo atual
+    - decremento do próprio POC → recalculado (argmax) só na próxima leitura
+    """
+
+    def __init__(
+        self,
+        tick_size: float = 0.01,
+        capacity: int = 1024,
+        dtype=np.float64,
+    ):
+        self.tick_size = tick_size
+        self.origin: Optional[int] = None
+        self.volume = np.zeros(capacity, dtype=dtype)
+        self.total = 0.0
+
+        # Range ocupado [lo, hi] (índices) — pode sobrestimar após decrementos
+        self._lo = capacity
+        self._hi = -1
+
+        self._poc_idx = -1
+        self._poc_dirty = False
+
+    # --------------------------
+    # ÍNDICES
+    # --------------------------
+
+    def tick_of(self, price: float) -> int:
+        return int(round(price / self.tick_size))
+
+    def _index(self, tick: int) -> int:
+        """
+        Converte tick em índice, crescendo o array se necessário.
+        """
+        if self.origin is None:
+            self.origin = tick - len(self.volume) // 2
+
+        idx = tick - self.origin
+        if 0 <= idx < len(self.volume):
+            return idx
+
+        # Crescimento: novo array com margem dos dois lados
+        size = len(self.volume)
+        need_lo = min(0, idx)
+        need_hi = max(size, idx + 1)
+        new_size = size
+        while new_size < (need_hi - need_lo) * 2:
+            new_size *= 2
+
+        shift = (new_size - (need_hi - need_lo)) // 2 - need_lo
+        grown = np.zeros(new_size, dtype=self.volume.dtype)
+        grown[shift : shift + size] = self.volume
+
+        self.volume = grown
+        self.origin -= shift
+        self._lo += shift
+        self._hi += shift
+        if self._poc_idx >= 0:
+            self._poc_idx += shift
+
+        return tick - self.origin
+
+    # --------------------------
+    # ATUALIZAÇÃO
+    # --------------------------
+
+    def add(self, tick: int, qty: float):
+        """
+        Soma qty (pode ser negativa) ao nível `tick`. O(1) amortizado.
+        """
+        idx = self._index(tick)
+        v = self.volume[idx] + qty
+        if v < 1e-12:
+            v = 0.0
+        self.volume[idx] = v
+        self.total = max(0.0, self.total + qty)
+
+        if qty > 0:
+            if idx < self._lo:
+                self._lo = idx
+            if idx > self._hi:
+                self._hi = idx
+            if not self._poc_dirty and (
+                self._poc_idx < 0 or v > self.volume[self._poc_idx]
+            ):
+                self._poc_idx = idx
+        elif idx == self._poc_idx:
+            self._poc_dirty = True
+
+    def add_array(self, ticks: np.ndarray, qtys: np.ndarray):
+        """
+        Versão vetorizada de add() (ex: histórico em chunks).
+        """
+        if len(ticks) == 0:
+            return
+        self._index(int(ticks.min()))
+        self._index(int(ticks.max()))
+
+        idx = ticks - self.origin
+        np.add.at(self.volume, idx, qtys)
+        np.maximum(self.volume, 0.0, out=self.volume)
+
+        self.total = float(self.volume.sum())
+        self._lo = min(self._lo, int(idx.min()))
+        self._hi = max(self._hi, int(idx.max()))
+        self._poc_dirty = True
+
+    def add_dense(self, start_tick: int, vols: np.ndarray):
+        """
+        Soma um bloco contíguo de volumes a partir de `start_tick`.
+        Uma única operação de slice (merge de histogramas, candles espalhados).
+        """
+        n = len(vols)
+        if n == 0:
+            return
+        self._index(start_tick)
+        self._index(start_tick + n - 1)
+        i0 = start_tick - self.origin
+
+        seg = self.volume[i0 : i0 + n]
+        before = float(seg.sum())
+        seg += vols
+        np.maximum(seg, 0.0, out=seg)
+        self.total = max(0.0, self.total + float(seg.sum()) - before)
+
+        nz = np.flatnonzero(vols > 0)
+        if len(nz):
+            self._lo = min(self._lo, i0 + int(nz[0]))
+            self._hi = max(self._hi, i0 + int(nz[-1]))
+        self._poc_dirty = True
+
+    def merge(self, other: "TickHistogram"):
+        """
+        Soma outro histograma (mesmo tick_size) a este.
+        """
+        start, vols = other.occupied()
+        self.add_dense(start, vols)
+
+    def compact(self) -> "TickHistogram":
+        """
+        Cópia congelada e compacta (float32, só o range ocupado).
+        Usada para sessões concluídas guardadas em cache.
+        """
+        start, vols = self.occupied()
+        out = TickHistogram(self.tick_size, capacity=max(1, len(vols)), dtype=np.float32)
+        if len(vols):
+            out.origin = start
+            out.volume[:] = vols
+            out._lo, out._hi = 0, len(vols) - 1
+            out.total = self.total
+            out._poc_dirty = True
+        return out
+
+    def clear(self):
+        self.volume[:] = 0.0
+        self.origin = None
+        self.total = 0.0
+        self._lo = len(self.volume)
+        self._hi = -1
+        self._poc_idx = -1
+        self._poc_dirty = False
+
+    # --------------------------
+    # LEITURA
+    # --------------------------
+
+    def is_empty(self) -> bool:
+        return self.total <= 1e-12
+
+    def occupied(self) -> Tuple[int, np.ndarray]:
+        """
+        Devolve (tick inicial, volumes) do range ocupado.
+        """
+        if self._hi < self._lo:
+            return 0, self.volume[:0]
+        return self.origin + self._lo, self.volume[self._lo : self._hi + 1]
+
+    def poc_tick(self) -> Optional[int]:
+        if self.is_empty():
+            return None
+        if self._poc_dirty or self._poc_idx < 0:
+            start, vols = self.occupied()
+            self._poc_idx = int(np.argmax(vols)) + (start - self.origin)
+            self._poc_dirty = False
+        return self.origin + self._poc_idx
+
+    def value_area(self, pct: float = 0.7) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Value Area pelo algoritmo standard de expansão a partir do POC.
+
+        Em cada passo compara a soma das 2 linhas seguintes acima
+        com as 2 seguintes abaixo e adiciona o par maior, até
+        acumular `pct` do volume total.
+
+        :return: (val_tick, vah_tick)
+        """
+        poc = self.poc_tick()
+        if poc is None:
+            return None, None
+
+        start, vols = self.occupied()
+        return value_area_bounds(vols, poc - start, pct, start)
+
+
+def spread_candles(
+    hist: TickHistogram,
+    high: np.ndarray,
+    low: np.ndarray,
+    volume: np.ndarray,
+):
+    """
+    Distribui o volume de cada candle uniformemente entre low e high.
+
+    Vetorizado com um array de diferenças + cumsum:
+    custo O(candles + range de preço), sem loop por candle.
+    """
+    if len(volume) == 0:
+        return
+
+    lo = np.rint(np.asarray(low, dtype=np.float64) / hist.tick_size).astype(np.int64)
+    hi = np.rint(np.asarray(high, dtype=np.float64) / hist.tick_size).astype(np.int64)
+    hi = np.maximum(hi, lo)
+    rate = np.asarray(volume, dtype=np.float64) / (hi - lo + 1)
+
+    base = int(lo.min())
+    diff = np.zeros(int(hi.max()) - base + 2, dtype=np.float64)
+    np.add.at(diff, lo - base, rate)
+    np.add.at(diff, hi - base + 1, -rate)
+
+    dens = np.cumsum(diff[:-1])
+    np.maximum(dens, 0.0, out=dens)
+    hist.add_dense(base, dens)
+
+
+def histogram_profile(
+    hist: TickHistogram,
+    max_levels: int = 2000,
+    row_ticks: int = 1,
+) -> Tuple[List[ProfileBucket], Optional[float], Optional[float], Optional[float]]:
+    """
+    Converte um histograma em (buckets, POC, VAH, VAL) para a view.
+
+    - row_ticks > 1 → rebinning na hora (reshape/sum) a partir da
+      resolução de tick; POC e Value Area calculados nas linhas
+    - preço de cada linha = limite inferior da linha
+
+    Devolve o range contíguo de níveis (incluindo níveis vazios) do
+    preço mais alto para o mais baixo. Se o range exceder `max_levels`,
+    devolve apenas os `max_levels` níveis de maior volume.
+    """
+    start, vols = hist.occupied()
+    if not vols.size or hist.is_empty():
+        return [], None, None, None
+
+    tick = hist.tick_size
+
+    if row_ticks > 1:
+        start, vols = rebin_dense(start, vols, row_ticks)
+        poc_idx = int(np.argmax(vols))
+        val_idx, vah_idx = value_area_bounds(vols, poc_idx, 0.7)
+        step = row_ticks
+        poc_tick = start + poc_idx * step
+        val_tick, vah_tick = start + val_idx * step, start + vah_idx * step
+    else:
+        step = 1
+        poc_tick = hist.poc_tick()
+        val_tick, vah_tick = hist.value_area(0.7)
+
+    nz = np.flatnonzero(vols > 1e-6)
+    if nz[-1] - nz[0] + 1 <= max_levels:
+        nz = np.arange(nz[0], nz[-1] + 1)
+    elif len(nz) > max_levels:
+        # Limitar a max_levels níveis (maior volume) para evitar scroll gigante
+        top = np.argpartition(vols[nz], -max_levels)[-max_levels:]
+        nz = np.sort(nz[top])
+
+    buckets = [
+        ProfileBucket(price=(start + int(i) * step) * tick, volume=float(vols[i]))
+        for i in nz[::-1]
+    ]
+
+    return buckets, poc_tick * tick, vah_tick * tick, val_tick * tick
+
+
+def value_area_bounds(
+    vols: np.ndarray,
+    poc_idx: int,
+    pct: float = 0.7,
+    offset: int = 0,
+) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Expansão a partir do POC sobre um array de volumes por linha.
+
+    :return: (índice inferior, índice superior) + offset
+    """
+    n = len(vols)
+    if n == 0:
+        return None, None
+
+    target = float(vols.sum()) * pct
+    acc = float(vols[poc_idx])
+    lo = hi = poc_idx
+
+    # Listas Python → acesso escalar rápido no loop
+    v = vols.tolist()
+
+    while acc < target and (lo > 0 or hi < n - 1):
+        up = v[hi + 1] + (v[hi + 2] if hi + 2 < n else 0.0) if hi < n - 1 else -1.0
+        down = v[lo - 1] + (v[lo - 2] if lo - 2 >= 0 else 0.0) if lo > 0 else -1.0
+
+        if up >= down:
+            step = min(2, n - 1 - hi)
+            hi += step
+            acc += up
+        else:
+            step = min(2, lo)
+            lo -= step
+            acc += down
+
+    return lo + offset, hi + offset
+
+
+# ==========================================================
+# AGREGADOR DE VOLUME PROFILE (LÓGICA)
+# ==========================================================
+
+class VolumeProfileAggregator:
+    """
+    Responsável por:
+    - manter um histograma incremental por tick (trades da janela)
+    - retirar trades que saem da janela (decremento)
+    - calcular POC, VAH, VAL
+    - devolver buckets prontos para desenhar
+
+    Custo:
+    - por trade: O(1) amortizado
+    - por refresh: O(níveis de preço), independente do nº de trades
+    """
+
+    def __init__(self, tick_size: float = 0.01, max_trades: int = 200_000):
+        # Histograma da janela + trades ainda dentro dela (para decremento)
+        self.histogram = TickHistogram(tick_size)
+        self.trades: Deque[Tuple[int, int, float]] = deque()
+        self.max_trades = max_trades
+
+        # Candles do timeframe atual
+        self.candles: List = []
+
+        # Timeframe em ms (default 1m)
+        self.timeframe_ms = 60_000
+
+        # Símbolo atual
+        self.symbol = "BTCUSDT"
+
+        # Janela de cálculo (nº de candles)
+        self.window_candles = 120
+
+        # Nº máximo de níveis devolvidos à view (virtualizada)
+        self.max_levels = 2000
+
+
+    # ------------------------------------------------------
+    # ALTERAÇÃO DE SÍMBOLO
+    # ------------------------------------------------------
+    def set_symbol(self, symbol: str):
+        self.symbol = symbol.upper()
+        self._reset()
+
+
+    # ------------------------------------------------------
+    # ALTERAÇÃO DE TIMEFRAME
+    # ------------------------------------------------------
+    def set_timeframe(self, tf: str):
+        mapping = {
+            "1m": 60_000,
+            "5m": 300_000,
+            "15m": 900_000,
+            "1h": 3_600_000,
+            "4h": 14_400_000,
+            "1d": 86_400_000,
+        }
+        self.timeframe_ms = mapping.get(tf.lower(), 60_000)
+        self._reset()
+
+    def _reset(self):
+        self.trades.clear()
+        self.candles.clear()
+        self.histogram.clear()
+
+
+    # ------------------------------------------------------
+    # HISTÓRICO DE CANDLES
+    # ------------------------------------------------------
+    def add_candles(self, candles: List):
+        # Guarda apenas a janela relevante
+        self.candles = list(candles)[-self.window_candles :]
+        self._expire()
+
+
+    def add_candle_update(self, candle, closed: bool):
+        # Só adiciona candle fechado
+        if not closed:
+            return
+        self.candles.append(candle)
+        self.candles = self.candles[-self.window_candles :]
+        self._expire()
+
+
+    # ------------------------------------------------------
+    # TRADES
+    # ------------------------------------------------------
+    def add_trade(self, trade):
+        # Ignora trades de outro símbolo
+        if trade.symbol.upper() != self.symbol:
+            return
+
+        tick = self.histogram.tick_of(trade.price)
+        self.histogram.add(tick, trade.qty)
+        self.trades.append((trade.ts, tick, trade.qty))
+
+        # Limite de memória → a trade mais antiga sai do histograma
+        if len(self.trades) > self.max_trades:
+            _, old_tick, old_qty = self.trades.popleft()
+            self.histogram.add(old_tick, -old_qty)
+
+
+    # ------------------------------------------------------
+    # INÍCIO DA JANELA TEMPORAL
+    # ------------------------------------------------------
+    def _window_start_ms(self) -> Optional[int]:
+        if not self.candles:
+            return None
+        return (
+            self.candles[-1].open_time
+            - self.timeframe_ms * (self.window_candles - 1)
+        )
+
+    def _expire(self):
+        """
+        Remove do histograma as trades que saíram da janela temporal.
+        """
+        cutoff = self._window_start_ms()
+        if cutoff is None:
+            return
+        while self.trades and self.trades[0][0] < cutoff:
+            _, tick, qty = self.trades.popleft()
+            self.histogram.add(tick, -qty)
+
+
+    # ------------------------------------------------------
+    # CÁLCULO DO VOLUME PROFILE
+    # ------------------------------------------------------
+    def profile(
+        self,
+        row_ticks: int = 1,
+    ) -> Tuple[List[ProfileBucket], Optional[float], Optional[float], Optional[float]]:
+        """
+        Retorna (com linhas de `row_ticks` ticks):
+        - lista de buckets (preço, volume)
+        - POC
+        - VAH
+        - VAL
+        """
+        self._expire()
+
+        hist = self.histogram
+
+        # Fallback: espalhar o volume dos candles entre low e high
+        if hist.is_empty() and self.candles:
+            hist = TickHistogram(self.histogram.tick_size)
+            spread_candles(
+                hist,
+                np.fromiter((c.high for c in self.candles), np.float64),
+                np.fromiter((c.low for c in self.candles), np.float64),
+                np.fromiter((c.volume for c in self.candles), np.float64),
+            )
+
+        return histogram_profile(hist, self.max_levels, row_ticks)
+
+
+# ==========================================================
+# SESSÕES (DIÁRIAS / SEMANAIS / COMPOSITES / FIXED RANGE)
+# ==========================================================
+
+DAY_MS = 86_400_000
+
+
+def day_of(ts_ms: int) -> int:
+    return int(ts_ms // DAY_MS)
+
+
+def week_start_day(day: int) -> int:
+    """
+    Primeiro dia (segunda-feira UTC) da semana de `day`.
+    O dia 0 (1970-01-01) foi uma quinta → segunda = dia 4.
+    """
+    return day - (day - 4) % 7
+
+
+class _Coverage:
+    """
+    Intervalos [start, end) já agregados numa sessão (disjuntos, ordenados).
+
+    Evita contar duas vezes o mesmo período quando chegam
+    candles de fontes/resoluções diferentes (histórico do gráfico,
+    chunks REST, updates ao vivo).
+    """
+
+    __slots__ = ("spans",)
+
+    def __init__(self):
+        self.spans: List[List[int]] = []
+
+    def uncovered(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        mask = np.ones(len(start), dtype=bool)
+        for s, e in self.spans:
+            mask &= (end <= s) | (start >= e)
+        return mask
+
+    def add(self, start: np.ndarray, end: np.ndarray):
+        if len(start) == 0:
+            return
+
+        # Runs contíguos → um intervalo cada
+        breaks = np.flatnonzero(start[1:] > end[:-1]) + 1
+        firsts = np.concatenate(([0], breaks))
+        lasts = np.concatenate((breaks - 1, [len(start) - 1]))
+
+        spans = self.spans + [
+            [int(start[a]), int(end[b])] for a, b in zip(firsts, lasts)
+        ]
+        spans.sort()
+
+        merged: List[List[int]] = []
+        for s, e in spans:
+            if merged and s <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], e)
+            else:
+                merged.append([s, e])
+        self.spans = merged
+
+    def covers(self, start: int, end: int) -> bool:
+        return any(s <= start and e >= end for s, e in self.spans)
+
+
+class _CandleColumns:
+    """
+    Candles agregados (colunar, ordenados por início) para as
+    bordas dos fixed ranges.
+
+    Buffer crescente (capacidade duplica → append amortizado O(1))
+    com início móvel: trim() descarta os candles de dias já
+    removidos sem copiar a cada candle.
+    """
+
+    __slots__ = ("_buf", "_head", "_tail")
+
+    # Linhas do buffer
+    START, HIGH, LOW, VOL = range(4)
+
+    def __init__(self, capacity: int = 1024):
+        self._buf = np.empty((4, capacity))
+        self._head = 0
+        self._tail = 0
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def column(self, row: int) -> np.ndarray:
+        return self._buf[row, self._head : self._tail]
+
+    def append(self, start, high, low, vol):
+        n = len(start)
+        if not n:
+            return
+
+        if self._tail + n > self._buf.shape[1]:
+            used = len(self)
+            capacity = max(1024, 2 * (used + n))
+            buf = np.empty((4, capacity))
+            buf[:, :used] = self._buf[:, self._head : self._tail]
+            self._buf, self._head, self._tail = buf, 0, used
+
+        a, b = self._tail, self._tail + n
+        out_of_order = a > self._head and start[0] < self._buf[self.START, a - 1]
+        self._buf[self.START, a:b] = start
+        self._buf[self.HIGH, a:b] = high
+        self._buf[self.LOW, a:b] = low
+        self._buf[self.VOL, a:b] = vol
+        self._tail = b
+
+        # Chunks de histórico mais antigo chegam fora de ordem (raro)
+        if out_of_order:
+            live = self._buf[:, self._head : self._tail]
+            live[:] = live[:, np.argsort(live[self.START], kind="stable")]
+
+    def trim(self, start_ms: int):
+        """
+        Descarta candles que começam antes de start_ms.
+        """
+        self._head += int(np.searchsorted(self.column(self.START), start_ms, side="left"))
+
+    def clear(self):
+        self._head = self._tail = 0
+
+
+class SessionProfile:
+    """
+    Histograma de uma sessão diária (UTC) + cobertura temporal.
+    Quando a cobertura fecha o dia inteiro, a sessão é congelada (compacta).
+    """
+
+    __slots__ = ("day", "histogram", "coverage", "complete")
+
+    def __init__(self, day: int, tick_size: float):
+        self.day = day
+        self.histogram = TickHistogram(tick_size)
+        self.coverage = _Coverage()
+        self.complete = False
+
+
+class SessionProfileStore:
+    """
+    Store de perfis por sessão diária, alimentado em streaming.
+
+    Fontes (todas em chunks vetorizados):
+    - candles (qualquer resolução) → volume espalhado entre low e high
+    - trades ao vivo → histograma "forming" do candle em curso,
+      descartado quando o candle fecha (o candle fechado substitui-o)
+
+    Consultas:
+    - session(kind)      → sessão diária ou semanal atual
+    - composite(days)    → últimos N dias
+    - fixed_range(a, b)  → intervalo arbitrário
+
+    Sessões concluídas ficam em cache (compactas) e as uniões de
+    dias concluídos são memorizadas: um composite de 30 dias custa
+    um merge de histogramas já agregados + o dia em curso.
+    """
+
+    def __init__(self, tick_size: float = 0.01, max_days: int = 400, memo_size: int = 8):
+        self.tick_size = tick_size
+        self.symbol = "BTCUSDT"
+        self.interval_ms = 60_000
+
+        self.max_days = max_days
+        self.sessions: Dict[int, SessionProfile] = {}
+
+        # Candles agregados (colunar) → bordas dos fixed ranges
+        self._candles = _CandleColumns()
+
+        # Trades do(s) candle(s) em formação: { open_time : histograma }
+        self._forming: Dict[int, TickHistogram] = {}
+
+        # Fim do último período coberto por candles fechados
+        self.live_from: Optional[int] = None
+
+        # Memo de merges de dias concluídos: (primeiro, último, n) → histograma
+        self._memo: Dict[Tuple[int, int, int], TickHistogram] = {}
+        self._memo_size = memo_size
+
+    # --------------------------
+    # CONFIGURAÇÃO
+    # --------------------------
+
+    def set_symbol(self, symbol: str):
+        self.symbol = symbol.upper()
+        self.clear()
+
+    def set_interval(self, interval_ms: int):
+        """
+        Resolução dos candles ao vivo (timeframe do gráfico).
+        As sessões já agregadas mantêm-se válidas.
+        """
+        self.interval_ms = interval_ms
+        self._forming.clear()
+
+    def clear(self):
+        self.sessions.clear()
+        self._memo.clear()
+        self._forming.clear()
+        self.live_from = None
+        self._candles.clear()
+
+    def _session(self, day: int) -> SessionProfile:
+        sess = self.sessions.get(day)
+        if sess is None:
+            sess = SessionProfile(day, self.tick_size)
+            self.sessions[day] = sess
+            while len(self.sessions) > self.max_days:
+                self.sessions.pop(min(self.sessions))
+        return sess
+
+    # --------------------------
+    # INGESTÃO: CANDLES
+    # --------------------------
+
+    def add_candle_arrays(
+        self,
+        open_time: np.ndarray,
+        interval_ms: int,
+        high: np.ndarray,
+        low: np.ndarray,
+        volume: np.ndarray,
+    ):
+        """
+        Ingere um chunk de candles fechados (arrays colunares).
+
+        Cada sessão só recebe os candles que não se sobrepõem
+        ao que já tem agregado; sessões concluídas são ignoradas.
+        """
+        start = np.asarray(open_time, dtype=np.int64)
+        if len(start) == 0:
+            return
+
+        order = np.argsort(start, kind="stable")
+        start = start[order]
+        end = start + int(interval_ms)
+        high = np.asarray(high, dtype=np.float64)[order]
+        low = np.asarray(low, dtype=np.float64)[order]
+        volume = np.asarray(volume, dtype=np.float64)[order]
+
+        days = start // DAY_MS
+        bounds = np.flatnonzero(np.diff(days)) + 1
+
+        kept = []
+        for a, b in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(start)]))):
+            sess = self._session(int(days[a]))
+            if sess.complete:
+                continue
+
+            idx = np.arange(a, b)[sess.coverage.uncovered(start[a:b], end[a:b])]
+            if not len(idx):
+                continue
+
+            spread_candles(sess.histogram, high[idx], low[idx], volume[idx])
+            sess.coverage.add(start[idx], end[idx])
+            kept.append(idx)
+
+            day_start = sess.day * DAY_MS
+            if sess.coverage.covers(day_start, day_start + DAY_MS):
+                sess.histogram = sess.histogram.compact()
+                sess.complete = True
+
+        if kept:
+            idx = np.concatenate(kept)
+            self._candles.append(start[idx], high[idx], low[idx], volume[idx])
+            # Candles só interessam aos dias ainda guardados
+            self._candles.trim(min(self.sessions) * DAY_MS)
+
+            last_end = int(end[idx].max())
+            if self.live_from is None or last_end > self.live_from:
+                self.live_from = last_end
+                # Trades em formação agora cobertos por candles fechados
+                for t in [t for t in self._forming if t < last_end]:
+                    self._forming.pop(t)
+
+    def add_candles(self, candles, interval_ms: int):
+        """
+        Ingere uma lista de Candle (ex: histórico do gráfico).
+        """
+        candles = list(candles)
+        if not candles:
+            return
+        self.add_candle_arrays(
+            np.fromiter((c.open_time for c in candles), np.int64, len(candles)),
+            interval_ms,
+            np.fromiter((c.high for c in candles), np.float64, len(candles)),
+            np.fromiter((c.low for c in candles), np.float64, len(candles)),
+            np.fromiter((c.volume for c in candles), np.float64, len(candles)),
+        )
+
+    def add_candle_update(self, candle, closed: bool):
+        """
+        Candle ao vivo: só os fechados entram nas sessões.
+        """
+        if closed:
+            self.add_candles([candle], self.interval_ms)
+
+    # --------------------------
+    # INGESTÃO: TRADES
+    # --------------------------
+
+    def add_trade(self, trade):
+        """
+        Trade ao vivo → histograma do candle em formação.
+        """
+        if trade.symbol.upper() != self.symbol:
+            return
+        if self.live_from is not None and trade.ts < self.live_from:
+            return
+
+        open_time = (trade.ts // self.interval_ms) * self.interval_ms
+        hist = self._forming.get(open_time)
+        if hist is None:
+            hist = self._forming[open_time] = TickHistogram(self.tick_size, capacity=256)
+        hist.add(hist.tick_of(trade.price), trade.qty)
+
+    # --------------------------
+    # CONSULTAS
+    # --------------------------
+
+    def current_day(self) -> Optional[int]:
+        if self._forming:
+            return day_of(max(self._forming))
+        if self.live_from is not None:
+            return day_of(self.live_from - 1)
+        return max(self.sessions) if self.sessions else None
+
+    def _merge_days(self, first: int, last: int) -> TickHistogram:
+        """
+        Merge dos dias [first, last] + trades em formação desses dias.
+
+        Dias concluídos vêm de um merge memorizado; os restantes
+        (tipicamente só o dia atual) são somados por cima.
+        """
+        out = TickHistogram(self.tick_size)
+        days = [d for d in range(first, last + 1) if d in self.sessions]
+
+        complete = [d for d in days if self.sessions[d].complete]
+        if complete:
+            key = (first, last, len(complete))
+            base = self._memo.get(key)
+            if base is None:
+                base = TickHistogram(self.tick_size)
+                for d in complete:
+                    base.merge(self.sessions[d].histogram)
+                base = base.compact()
+                self._memo[key] = base
+                while len(self._memo) > self._memo_size:
+                    self._memo.pop(next(iter(self._memo)))
+            out.merge(base)
+
+        for d in days:
+            if not self.sessions[d].complete:
+                out.merge(self.sessions[d].histogram)
+
+        for open_time, hist in self._forming.items():
+            if first <= day_of(open_time) <= last:
+                out.merge(hist)
+
+        return out
+
+    def session(self, kind: str = "day") -> TickHistogram:
+        """
+        Sessão atual: "day" (UTC) ou "week" (segunda → domingo UTC).
+        """
+        today = self.current_day()
+        if today is None:
+            return TickHistogram(self.tick_size)
+        first = week_start_day(today) if kind == "week" else today
+        return self._merge_days(first, today)
+
+    def composite(self, days: int) -> TickHistogram:
+        """
+        Composite dos últimos `days` dias (inclui o dia atual).
+        """
+        today = self.current_day()
+        if today is None:
+            return TickHistogram(self.tick_size)
+        return self._merge_days(today - max(1, days) + 1, today)
+
+    def fixed_range(self, start_ms: int, end_ms: int) -> TickHistogram:
+        """
+        Perfil de um intervalo arbitrário [start_ms, end_ms).
+
+        - dias inteiros dentro do intervalo → merge das sessões
+        - bordas parciais → candles agregados (espalhados) + forming
+        """
+        out = TickHistogram(self.tick_size)
+        if end_ms <= start_ms:
+            return out
+
+        first_full = -(-start_ms // DAY_MS)
+        last_full = end_ms // DAY_MS - 1
+
+        if first_full <= last_full:
+            out.merge(self._merge_days(first_full, last_full))
+            edges = [(start_ms, first_full * DAY_MS), ((last_full + 1) * DAY_MS, end_ms)]
+        else:
+            edges = [(start_ms, end_ms)]
+
+        for a, b in edges:
+            if b <= a:
+                continue
+            candles = self._candles
+            starts = candles.column(candles.START)
+            lo = np.searchsorted(starts, a, side="left")
+            hi = np.searchsorted(starts, b, side="left")
+            if hi > lo:
+                spread_candles(
+                    out,
+                    candles.column(candles.HIGH)[lo:hi],
+                    candles.column(candles.LOW)[lo:hi],
+                    candles.column(candles.VOL)[lo:hi],
+                )
+
+            # Forming só entra pelas bordas (os dias inteiros já o incluem)
+            for open_time, hist in self._forming.items():
+                if a <= open_time < b:
+                    out.merge(hist)
+
+        return out
@@ -0,0 +1,112 @@
+"""
+Backtest headless das estratégias incluídas sobre o candle store.
+
+- completa o candle store (REST /klines) do símbolo / timeframe
+- corre a grelha de parâmetros (GRID) de cada estratégia com
+  BACKTEST num process pool (candles partilhados em memory-map)
+- imprime as melhores combinações e grava relatório JSON em reports/
+
+Exemplo:
+    python tools/backtest.py --symbol BTCUSDT --tf 1m --days 365
+"""
+
+# ==========================================================
+# IMPORTS STANDARD
+# ==========================================================
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+# Raiz do projeto no sys.path (executável de qualquer pasta)
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# ==========================================================
+# CORE
+# ==========================================================
+
+from core.data_engine.candle_store import CandleStore
+from core.strategy.backtest import param_grid, sweep
+from core.strategy.builtin import BUILTIN_STRATEGIES
+
+
+# ==========================================================
+# DEFAULTS
+# ==========================================================
+
+DEFAULT_SYMBOL = "BTCUSDT"
+DEFAULT_TF = "1m"
+DEFAULT_DAYS = 365
+DEFAULT_TOP = 5
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL)
+    parser.add_argument("--tf", default=DEFAULT_TF)
+    parser.add_argument("--days", type=float, default=DEFAULT_DAYS)
+    parser.add_argument("--strategy", action="append", help="nome (repetível); omissão: todas")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--cost-bps", type=float, default=2.0)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument("--store", default=None, help="pasta do candle store")
+    args = parser.parse_args()
+
+    symbol = args.symbol.upper()
+    store = CandleStore(args.store)
+
+    def progress(done, total):
+        print(f"\r[store] {symbol} {args.tf}: {done:,}/{total:,}", end="", flush=True)
+
+    bars = store.update(symbol, args.tf, args.days, progress)
+    print(f"\n[store] {bars.shape[1]:,} candles em {store.path(symbol, args.tf)}")
+    if bars.shape[1] < 2:
+        sys.exit(1)
+
+    strategies = [
+        cls for cls in BUILTIN_STRATEGIES
+        if cls.BACKTEST and (not args.strategy or cls.name in args.strategy)
+    ]
+
+    report = {"symbol": symbol, "timeframe": args.tf, "bars": bars.shape[1], "strategies": {}}
+    for cls in strategies:
+        combos = len(param_grid(cls.GRID))
+        t0 = time.perf_counter()
+        results = list(sweep(
+            cls,
+            str(store.path(symbol, args.tf)),
+            processes=args.processes,
+            cost_bps=args.cost_bps,
+        ))
+        elapsed = time.perf_counter() - t0
+        results.sort(key=lambda r: r.pnl, reverse=True)
+
+        print(f"\n{cls.name}: {combos:,} combinações em {elapsed:.1f}s")
+        for r in results[: args.top]:
+            params = ", ".join(f"{k}={v:g}" for k, v in r.params.items())
+            print(
+                f"  {params:<32} P&L {r.pnl:+12,.2f}  win {r.win_rate * 100:5.1f}%"
+                f"  trades {r.trades:6,}  maxDD {r.max_drawdown:10,.2f}"
+            )
+
+        report["strategies"][cls.name] = {
+            "combinations": combos,
+            "seconds": round(elapsed, 3),
+            "top": [asdict(r) for r in results[: args.top]],
+        }
+
+    reports_dir = Path("reports")
+    reports_dir.mkdir(exist_ok=True)
+    path = reports_dir / f"backtest_{symbol}_{args.tf}_{int(time.time())}.json"
+    with open(path, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nRelatório: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Walk-forward headless das estratégias incluídas sobre o candle store.
+
+- completa o candle store (REST /klines) do símbolo / timeframe
+- por estratégia com BACKTEST: posições de toda a grelha
+  calculadas uma vez (matriz em memory-map), folds treino → teste
+  num process pool
+- grava relatório JSON + TXT em reports/ (como o verify_suite)
+
+Exemplo:
+    python tools/walk_forward.py --symbol BTCUSDT --tf 1m --days 365 \\
+        --train-days 60 --test-days 14
+"""
+
+# ==========================================================
+# IMPORTS STANDARD
+# ==========================================================
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict
+
+# Raiz do projeto no sys.path (executável de qualquer pasta)
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# ==========================================================
+# CORE
+# ==========================================================
+
+from core.data_engine.candle_store import INTERVALS, T, CandleStore
+from core.strategy.backtest import param_grid
+from core.strategy.builtin import BUILTIN_STRATEGIES
+from core.strategy.walk_forward import summarize, walk_forward
+
+
+# ==========================================================
+# DEFAULTS
+# ==========================================================
+
+DEFAULT_SYMBOL = "BTCUSDT"
+DEFAULT_TF = "1m"
+DEFAULT_DAYS = 365
+DEFAULT_TRAIN_DAYS = 60
+DEFAULT_TEST_DAYS = 14
+
+
+def _iso(ms: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M", time.gmtime(ms / 1000))
+
+
+def write_reports(symbol: str, timeframe: str, report: Dict):
+    """
+    Escreve relatório JSON + TXT (tabela de folds por estratégia).
+    """
+    reports_dir = Path("reports")
+    reports_dir.mkdir(exist_ok=True)
+
+    base = reports_dir / f"walkforward_{symbol}_{timeframe}_{int(time.time())}"
+
+    with open(base.with_suffix(".json"), "w") as fh:
+        json.dump(report, fh, indent=2)
+
+    lines = [
+        f"Walk-forward {symbol} {timeframe}: {report['bars']:,} bars, "
+        f"train {report['train_bars']:,} / test {report['test_bars']:,}"
+        + (" (anchored)" if report["anchored"] else ""),
+    ]
+    for name, entry in report["strategies"].items():
+        s = entry["summary"]
+        lines += [
+            "",
+            f"== {name} ({entry['combinations']} combinations, {entry['seconds']:.1f}s)",
+            f"OOS P&L {s['oos_pnl']:+,.2f} | win {s['oos_win_rate'] * 100:.1f}% "
+            f"| trades {s['oos_trades']:,} | profitable folds {s['profitable_folds']}/{s['folds']} "
+            f"| efficiency {s['efficiency']:.2f}",
+        ]
+        for f in entry["folds"]:
+            params = ", ".join(f"{k}={v:g}" for k, v in f["params"].items())
+            lines.append(
+                f"  #{f['fold']['index']:<3} test {f['test_from']} → {f['test_to']}  "
+                f"{params:<32} IS {f['in_sample']['pnl']:+11,.2f}  "
+                f"OOS {f['out_of_sample']['pnl']:+11,.2f}  trades {f['out_of_sample']['trades']:5,}"
+            )
+
+    with open(base.with_suffix(".txt"), "w") as fh:
+        fh.write("\n".join(lines) + "\n")
+
+    return base
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL)
+    parser.add_argument("--tf", default=DEFAULT_TF)
+    parser.add_argument("--days", type=float, default=DEFAULT_DAYS)
+    parser.add_argument("--train-days", type=float, default=DEFAULT_TRAIN_DAYS)
+    parser.add_argument("--test-days", type=float, default=DEFAULT_TEST_DAYS)
+    parser.add_argument("--anchored", action="store_true")
+    parser.add_argument("--strategy", action="append", help="nome (repetível); omissão: todas")
+    parser.add_argument("--objective", default="pnl", help="métrica maximizada no treino")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--cost-bps", type=float, default=2.0)
+    parser.add_argument("--store", default=None, help="pasta do candle store")
+    args = parser.parse_args()
+
+    symbol = args.symbol.upper()
+    store = CandleStore(args.store)
+
+    def progress(done, total):
+        print(f"\r[store] {symbol} {args.tf}: {done:,}/{total:,}", end="", flush=True)
+
+    bars = store.update(symbol, args.tf, args.days, progress)
+    print(f"\n[store] {bars.shape[1]:,} candles em {store.path(symbol, args.tf)}")
+
+    bars_per_day = 86_400_000 // INTERVALS[args.tf]
+    train = int(args.train_days * bars_per_day)
+    test = int(args.test_days * bars_per_day)
+    if bars.shape[1] < train + test:
+        print("Histórico insuficiente para um fold")
+        sys.exit(1)
+
+    report = {
+        "symbol": symbol,
+        "timeframe": args.tf,
+        "bars": bars.shape[1],
+        "train_bars": train,
+        "test_bars": test,
+        "anchored": args.anchored,
+        "objective": args.objective,
+        "cost_bps": args.cost_bps,
+        "strategies": {},
+    }
+
+    strategies = [
+        cls for cls in BUILTIN_STRATEGIES
+        if cls.BACKTEST and (not args.strategy or cls.name in args.strategy)
+    ]
+    for cls in strategies:
+        t0 = time.perf_counter()
+        results = sorted(
+            walk_forward(
+                cls,
+                str(store.path(symbol, args.tf)),
+                train=train,
+                test=test,
+                anchored=args.anchored,
+                processes=args.processes,
+                cost_bps=args.cost_bps,
+                objective=args.objective,
+            ),
+            key=lambda r: r.fold.index,
+        )
+        elapsed = time.perf_counter() - t0
+        summary = summarize(results)
+        print(
+            f"{cls.name}: {summary['folds']} folds em {elapsed:.1f}s, "
+            f"OOS P&L {summary['oos_pnl']:+,.2f}, eficiência {summary['efficiency']:.2f}"
+        )
+
+        report["strategies"][cls.name] = {
+            "combinations": len(param_grid(cls.GRID)),
+            "seconds": round(elapsed, 3),
+            "summary": summary,
+            "folds": [
+                {
+                    **asdict(r),
+                    "test_from": _iso(bars[T, r.fold.train_end]),
+                    "test_to": _iso(bars[T, r.fold.test_end - 1]),
+                }
+                for r in results
+            ],
+        }
+
+    base = write_reports(symbol, args.tf, report)
+    print(f"Relatórios: {base}.json / {base}.txt")
+
+
+if __name__ == "__main__":
+    main()
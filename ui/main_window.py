@@ -318,6 +318,30 @@ class MainWindow(QMainWindow):
             dock.hide()
 
 
+    # ======================================================
+    # SHUTDOWN
+    # ======================================================
+
+    def closeEvent(self, event):
+        """
+        Paragem ordenada: threads / processos dos painéis e o
+        provider do data engine (não depender do fim dos daemons).
+        """
+        for panel in (
+            self.strategy_panel,
+            self.footprint_panel,
+            self.volume_profile_panel,
+            self.chart_panel,
+        ):
+            try:
+                panel.shutdown()
+            except Exception as e:
+                self._logger.warning("Shutdown of %s failed: %s", type(panel).__name__, e)
+
+        self.data_engine.stop()
+        super().closeEvent(event)
+
+
 # ==========================================================
 # FUNÇÃO RUN — ENTRY POINT DA APLICAÇÃO
 # ==========================================================
@@ -3,16 +3,17 @@
 # ==========================================================
 
 import logging
-import time
-from dataclasses import dataclass
+import math
+import threading
+from collections import deque
 from datetime import datetime
-from typing import List, Optional
+from typing import Deque, Dict, List, Optional, Tuple
 
 import numpy as np
 import pyqtgraph as pg
 
-from PySide6.QtCore import Qt, QPointF, Signal, QSettings
-from PySide6.QtGui import QFont
+from PySide6.QtCore import Qt, QLineF, QObject, QRectF, Signal, QSettings
+from PySide6.QtGui import QFont, QImage, QPainter, QPicture, QTransform
 from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
@@ -24,8 +25,11 @@ from PySide6.QtWidgets import (
 
 # Core engines
 from core.chart_engine import ChartEngine
+from core.chart_lod import CandlePyramid
+from core.indicator_engine import EMA, SMA, VWAP, IndicatorEngine
+from core.range_index import ChartRangeIndex
 from core.data_engine.models import Candle
-from core.data_engine.utils import clamp_prices
+from core.data_engine.utils import OutlierGuard
 
 # UI theme
 from ui.theme import colors, typography
@@ -43,26 +47,6 @@ pg.setConfigOptions(
 )
 
 
-# ==========================================================
-# INTERNAL CANDLE STRUCT (RENDER-FRIENDLY)
-# ==========================================================
-
-@dataclass
-class Candle:
-    """
-    Candle normalizada para renderização:
-    - t → timestamp em segundos
-    - open/high/low/close
-    - volume
-    """
-    t: float
-    open: float
-    high: float
-    low: float
-    close: float
-    volume: float
-
-
 # ==========================================================
 # CUSTOM TIME AXIS
 # ==========================================================
@@ -96,14 +80,20 @@ class PriceViewBox(pg.ViewBox):
     - Zoom centrado no cursor
     - Pan suave
     - Detecção de interação do utilizador
+    - Duplo clique → reset (follow + auto-scale)
     """
 
-    def __init__(self, on_user_action=None, *args, **kwargs):
+    def __init__(self, on_user_action=None, on_pan=None, on_reset=None, *args, **kwargs):
         super().__init__(*args, enableMenu=False, **kwargs)
         self.setMouseEnabled(x=True, y=True)
         self._on_user_action = on_user_action
+        self._on_pan = on_pan
+        self._on_reset = on_reset
         self.setLimits(minXRange=1, minYRange=0.0001)
 
+        # Eixo y controlado pelo painel (auto-scale) → zoom só em x
+        self.auto_y = False
+
     def wheelEvent(self, ev, axis=None):
         """
         Zoom com rato:
@@ -136,81 +126,725 @@ class PriceViewBox(pg.ViewBox):
 
         cx, cy = center.x(), center.y()
         self.setXRange(cx - width / 2, cx + width / 2, padding=0)
-        self.setYRange(cy - height / 2, cy + height / 2, padding=0)
+        if not self.auto_y:
+            self.setYRange(cy - height / 2, cy + height / 2, padding=0)
 
     def mouseDragEvent(self, ev, axis=None):
         """
-        Pan manual → desativa follow-price.
+        Pan manual → desativa follow-price (e o auto-scale).
         """
         if self._on_user_action:
             self._on_user_action()
+        if self._on_pan:
+            self._on_pan()
         super().mouseDragEvent(ev, axis=axis)
 
+    def mouseDoubleClickEvent(self, ev):
+        if self._on_reset:
+            self._on_reset()
+            ev.accept()
+        else:
+            super().mouseDoubleClickEvent(ev)
+
 
 # ==========================================================
-# CANDLESTICK ITEM — RENDER DE ALTA PERFORMANCE
+# TILE RASTERIZER — HISTÓRICO EM QIMAGE FORA DO THREAD DA UI
 # ==========================================================
 
-class CandlestickItem(pg.GraphicsObject):
+class TileJob:
     """
-    Renderização manual de candles:
-    - Muito mais rápida que PlotDataItem
-    - Corpo e wick desenhados com QPainter
+    Pedido de rasterização de um chunk fechado.
+
+    - key → (nível, chunk); scale → (px / s, px / unidade y)
+    - rect → retângulo em coordenadas de dados coberto pela imagem
+    - data → (x, span, up, campos): cópias, seguras noutro thread
     """
 
-    def __init__(self, candles: List[Candle]):
-        super().__init__()
-        self.candles = candles
-        self.generatePicture()
+    __slots__ = ("owner", "key", "scale", "gen", "rect", "width", "height", "data", "cancelled")
+
+    def __init__(self, owner, key, scale, gen, rect, width, height, data):
+        self.owner = owner
+        self.key = key
+        self.scale = scale
+        self.gen = gen
+        self.rect = rect
+        self.width = width
+        self.height = height
+        self.data = data
+        self.cancelled = False
+
+
+class TileRasterizer(QObject):
+    """
+    Rasteriza chunks de barras fechadas em QImage num thread dedicado.
+
+    - cada item submete em cada paint a lista de tiles que quer;
+      pedidos anteriores que deixaram de estar na lista (viewport
+      mudou de posição / escala) são cancelados
+    - pintar num QImage é seguro fora do thread da UI; o resultado
+      chega por sinal queued e o item só faz blit
+    """
+
+    tile_ready = Signal(object, object)   # (TileJob, QImage)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._logger = logging.getLogger(__name__)
+
+        self._cond = threading.Condition()
+        self._queue: Deque[TileJob] = deque()
+        self._active: Optional[TileJob] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def submit(self, owner, jobs: List[TileJob]):
+        """
+        Substitui os pedidos de `owner` por `jobs` (thread da UI).
+        """
+        with self._cond:
+            if self._stopped:
+                return
+
+            keep = {id(job) for job in jobs}
+            known = {id(job) for job in self._queue}
+
+            for job in self._queue:
+                if job.owner is owner and id(job) not in keep:
+                    job.cancelled = True
+
+            active = self._active
+            if active is not None:
+                known.add(id(active))
+                if active.owner is owner and id(active) not in keep:
+                    active.cancelled = True
+
+            self._queue = deque(job for job in self._queue if not job.cancelled)
+            self._queue.extend(job for job in jobs if id(job) not in known)
+
+            if not self._queue:
+                return
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="ChartTileRasterizer",
+                    daemon=True,
+                )
+                self._thread.start()
+
+            self._cond.notify()
+
+    def stop(self):
+        """
+        Descarta os pedidos e termina o thread (fecho da app).
+        """
+        with self._cond:
+            self._stopped = True
+            for job in self._queue:
+                job.cancelled = True
+            self._queue.clear()
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+
+        if thread is not None:
+            thread.join(1.0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                job = self._queue.popleft()
+                self._active = job
+
+            image = None
+            if not job.cancelled:
+                try:
+                    image = self._rasterize(job)
+                except Exception:
+                    self._logger.exception("Falha a rasterizar tile %s", job.key)
+
+            with self._cond:
+                self._active = None
+
+            if image is not None and not job.cancelled:
+                self.tile_ready.emit(job, image)
+
+    @staticmethod
+    def _rasterize(job: TileJob) -> QImage:
+        image = QImage(job.width, job.height, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+
+        # Dados → pixels da imagem (linha 0 = y mínimo; a ViewBox inverte)
+        sx, sy = job.scale
+        rect = job.rect
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setTransform(QTransform(sx, 0, 0, sy, -rect.x() * sx, -rect.y() * sy))
+        job.owner._draw_bars(painter, *job.data)
+        painter.end()
+
+        return image
+
+
+class _Tile:
+    __slots__ = ("scale", "rect", "image")
+
+    def __init__(self, scale, rect, image):
+        self.scale = scale
+        self.rect = rect
+        self.image = image
+
+
+# ==========================================================
+# SEQ CHUNK ITEM — BASE DOS ITENS DE BARRAS
+# ==========================================================
+
+class SeqChunkItem(pg.GraphicsObject):
+    """
+    Base de renderização por chunks de seq (candles / volume).
+
+    Cache incremental:
+    - barras fechadas são gravadas em QPictures por chunk
+      (CHUNK barras, indexadas por seq absoluto do ChartEngine)
+    - só o chunk da barra que fechou é regravado
+    - a barra em formação é desenhada diretamente em cada paint
+      (O(1) draw calls por tick)
+    - pens / brushes criados uma vez
+
+    Level of detail:
+    - com mais de 1 barra por pixel desenha os blocos agregados
+      da CandlePyramid (1 coluna por bloco de 2^k barras)
+    - os chunks são por (nível, bloco) → pan sem regravar
+
+    Tiles (com TileRasterizer):
+    - chunks completos (todas as barras fechadas) são rasterizados
+      em QImage fora do thread da UI, por (nível, chunk, escala)
+    - o paint só faz blit; enquanto o tile não chega usa o tile
+      de outra escala (esticado) ou a QPicture já gravada
+    - gravação síncrona limitada a SYNC_CHUNKS por paint; o chunk
+      das barras recentes e tiles demasiado grandes (zoom muito
+      próximo) continuam em QPicture
+
+    Subclasses implementam _fields(src, a, b) (arrays por barra),
+    _fields_y(fields), _draw_bars(painter, x, span, up, fields)
+    e _y_span(i0, i1) (limites y do intervalo).
+    """
 
-    def generatePicture(self):
-        self.picture = pg.QtGui.QPicture()
-        painter = pg.QtGui.QPainter(self.picture)
+    CHUNK = 256
 
+    # Tiles: dimensão máxima (px), tiles guardados, passos de escala por oitava
+    TILE_MAX_PX = 4096
+    MAX_TILES = 32
+    SCALE_STEPS = 1024
+
+    # QPictures gravadas no paint enquanto faltam tiles
+    SYNC_CHUNKS = 1
+
+    def __init__(self, engine: ChartEngine, pyramid: CandlePyramid,
+                 rasterizer: Optional[TileRasterizer] = None):
+        super().__init__()
+        self.engine = engine
+        self.pyramid = pyramid
+
+        # { (nível, chunk) : QPicture }
+        self._chunks: Dict[Tuple[int, int], QPicture] = {}
+
+        # { (nível, chunk) : _Tile } (ordem = LRU) + pedidos em curso
+        self._rasterizer = rasterizer
+        self._tiles: Dict[Tuple[int, int], _Tile] = {}
+        self._pending: Dict[Tuple[int, int], TileJob] = {}
+        self._tile_gen = 0
+        if rasterizer is not None:
+            rasterizer.tile_ready.connect(self._on_tile)
+
+        # Estado do engine quando o cache foi validado
+        self._version = None
+        self._revision = 0
+        self._closed_end = 0
+        self._first_seq = 0
+
+        # Limites (y) — mantidos incrementalmente
+        self._bounds = QRectF()
+        self._y_lo = None
+        self._y_hi = None
+
+        self._build_palette()
+
+    # --------------------------
+    # PALETA (CACHE)
+    # --------------------------
+
+    def _build_palette(self):
         green = pg.mkColor(colors.ACCENT_GREEN)
         red = pg.mkColor(colors.ACCENT_RED)
 
-        if not self.candles:
-            painter.end()
-            return
+        self._pens = (pg.mkPen(red), pg.mkPen(green))
+        self._brushes = (pg.mkBrush(red), pg.mkBrush(green))
 
-        # Largura dinâmica baseada no espaçamento real
-        xs = [c.t for c in self.candles]
-        spacing = np.median(np.diff(xs)) if len(xs) > 1 else 1.0
-        w = max(0.2, spacing * 0.35)
+    def invalidate_colors(self):
+        self._build_palette()
+        self.invalidate()
 
-        for c in self.candles:
-            pen = pg.mkPen(green if c.close >= c.open else red)
-            painter.setPen(pen)
+    # --------------------------
+    # SINCRONIZAÇÃO COM O ENGINE
+    # --------------------------
 
-            # Wick
-            painter.drawLine(
-                QPointF(c.t, c.low),
-                QPointF(c.t, c.high),
-            )
+    def invalidate(self):
+        """
+        Descarta todo o cache (mudança de histórico / tema).
+        """
+        self._chunks.clear()
+        self._clear_tiles()
+        self._version = None
+        self.sync()
 
-            # Body
-            painter.setBrush(pg.mkBrush(pen.color()))
-            rect = pg.QtCore.QRectF(
-                c.t - w,
-                min(c.open, c.close),
-                w * 2,
-                abs(c.close - c.open) or 0.001,
+    def sync(self):
+        """
+        Invalida só o necessário após uma alteração no engine. O(1).
+        """
+        eng = self.engine
+
+        if self._version != eng.history_version:
+            self._chunks.clear()
+            self._clear_tiles()
+            self._version = eng.history_version
+            self._recompute_bounds()
+        else:
+            # Barra(s) fechada(s) desde o último sync → regravar o(s) chunk(s) finais
+            # (nunca têm tile: só chunks completos são rasterizados)
+            if eng.closed_end_seq != self._closed_end:
+                self._drop_chunks(lambda level, k: k >= (
+                    (min(self._closed_end, eng.closed_end_seq) >> level) // self.CHUNK
+                ))
+
+            # Barra fechada corrigida (kline atrasado) → o chunk dela,
+            # em todos os níveis; pode já ter tile
+            if eng.revision != self._revision and eng.revised_seq >= eng.first_seq:
+                seq = eng.revised_seq
+                revised = lambda level, k: k == (seq >> level) // self.CHUNK
+                self._drop_chunks(revised)
+                self._stale_tiles(revised)
+                self._extend_bounds(eng.index_of(seq))
+
+            # Barras antigas saíram da janela → chunks iniciais mudam
+            if eng.first_seq != self._first_seq:
+                stale = lambda level, k: k <= (eng.first_seq >> level) // self.CHUNK
+                self._drop_chunks(stale)
+                self._stale_tiles(stale)
+
+            self._extend_bounds()
+
+        self._revision = eng.revision
+        self._closed_end = eng.closed_end_seq
+        self._first_seq = eng.first_seq
+        self.update()
+
+    def _drop_chunks(self, predicate):
+        for key in [key for key in self._chunks if predicate(*key)]:
+            del self._chunks[key]
+
+    def _clear_tiles(self):
+        self._tiles.clear()
+        self._pending.clear()
+        self._tile_gen += 1
+
+    def _stale_tiles(self, predicate):
+        """
+        Tiles cujo conteúdo mudou: continuam a ser mostrados até
+        chegar a versão nova.
+        """
+        for key, tile in self._tiles.items():
+            if predicate(*key):
+                tile.scale = None
+        self._pending.clear()
+        self._tile_gen += 1
+
+    def _recompute_bounds(self):
+        n = len(self.engine)
+        if not n:
+            self._y_lo = self._y_hi = None
+        else:
+            self._y_lo, self._y_hi = self._y_span(0, n)
+        self._update_bounds()
+
+    def _extend_bounds(self, i: Optional[int] = None):
+        n = len(self.engine)
+        if not n:
+            return
+        i = n - 1 if i is None else i
+        lo, hi = self._y_span(i, i + 1)
+        if self._y_lo is None or lo < self._y_lo or hi > self._y_hi:
+            self._y_lo = lo if self._y_lo is None else min(self._y_lo, lo)
+            self._y_hi = hi if self._y_hi is None else max(self._y_hi, hi)
+        self._update_bounds()
+
+    def _update_bounds(self):
+        eng = self.engine
+        if not len(eng) or self._y_lo is None:
+            bounds = QRectF()
+        else:
+            t = eng.t
+            w = eng.spacing
+            bounds = QRectF(
+                float(t[0]) - w,
+                self._y_lo,
+                float(t[-1] - t[0]) + 2 * w,
+                max(self._y_hi - self._y_lo, 1e-9),
             )
-            painter.drawRect(rect)
+        if bounds != self._bounds:
+            self.prepareGeometryChange()
+            self._bounds = bounds
+
+    def _y_span(self, i0: int, i1: int) -> Tuple[float, float]:
+        raise NotImplementedError
+
+    # --------------------------
+    # DADOS DOS CHUNKS
+    # --------------------------
 
+    def _chunk_data(self, level: int, k: int):
+        """
+        (x, span, up, campos) das barras fechadas do chunk, ou None.
+        """
+        if level == 0:
+            eng = self.engine
+            a = max(k * self.CHUNK, eng.first_seq)
+            b = min((k + 1) * self.CHUNK, eng.closed_end_seq)
+            i0, i1 = eng.index_of(a), eng.index_of(b)
+            if i1 <= i0:
+                return None
+            return self._bars(eng, i0, i1)
+
+        lvl = self.pyramid.level(level)
+        a = max(k * self.CHUNK, lvl.base) - lvl.base
+        b = min((k + 1) * self.CHUNK, lvl.end) - lvl.base
+        if b <= a:
+            return None
+        return self._bars(lvl, a, b)
+
+    def _bars(self, src, a: int, b: int):
+        """
+        :param src: ChartEngine (candles) ou PyramidLevel (blocos)
+        """
+        if src is self.engine:
+            x = src.t[a:b].copy()
+            span = np.full(b - a, src.spacing)
+        else:
+            t0, t1 = src.t0[a:b], src.t1[a:b]
+            x = (t0 + t1) * 0.5
+            span = t1 - t0 + self.engine.spacing
+        up = src.close[a:b] >= src.open[a:b]
+        return x, span, up, self._fields(src, a, b)
+
+    def _fields(self, src, a: int, b: int) -> tuple:
+        """
+        Cópias dos arrays que _draw_bars usa (seguras noutro thread).
+        """
+        raise NotImplementedError
+
+    def _fields_y(self, fields) -> Tuple[float, float]:
+        raise NotImplementedError
+
+    def _draw_bars(self, painter: QPainter, x, span, up, fields):
+        """
+        :param span: largura de cada coluna (segundos, antes da margem)
+        """
+        raise NotImplementedError
+
+    # --------------------------
+    # GRAVAÇÃO DE CHUNKS
+    # --------------------------
+
+    def _chunk_picture(self, level: int, k: int) -> QPicture:
+        pic = self._chunks.get((level, k))
+        if pic is not None:
+            return pic
+
+        pic = QPicture()
+        painter = QPainter(pic)
+        data = self._chunk_data(level, k)
+        if data is not None:
+            self._draw_bars(painter, *data)
         painter.end()
 
+        self._chunks[(level, k)] = pic
+        return pic
+
+    # --------------------------
+    # TILES
+    # --------------------------
+
+    def _tile_scale(self, vb, painter) -> Optional[Tuple[float, float]]:
+        """
+        Escala atual (px de dispositivo por unidade), quantizada só para
+        absorver ruído de vírgula flutuante: o tile final é blit 1:1.
+        """
+        px, py = vb.viewPixelSize()
+        if px <= 0 or py <= 0:
+            return None
+
+        device = painter.device()
+        dpr = device.devicePixelRatioF() if device is not None else 1.0
+
+        steps = self.SCALE_STEPS
+        return tuple(
+            2.0 ** (round(math.log2(dpr / p) * steps) / steps) for p in (px, py)
+        )
+
+    def _tile_job(self, level: int, k: int, scale) -> Optional[TileJob]:
+        """
+        Pedido (novo ou em curso) do tile; None se o chunk está
+        vazio ou a imagem passaria de TILE_MAX_PX.
+        """
+        key = (level, k)
+        job = self._pending.get(key)
+        if job is not None and job.scale == scale:
+            return job
+
+        data = self._chunk_data(level, k)
+        if data is None:
+            return None
+
+        x, span, _, fields = data
+        lo, hi = self._fields_y(fields)
+        sx, sy = scale
+
+        # Margem de 2 px (pen / antialias)
+        x0 = float((x - span * 0.5).min()) - 2 / sx
+        y0 = lo - 2 / sy
+        width = int(math.ceil((float((x + span * 0.5).max()) + 2 / sx - x0) * sx))
+        height = int(math.ceil((hi + 2 / sy - y0) * sy))
+        if not (0 < width <= self.TILE_MAX_PX and 0 < height <= self.TILE_MAX_PX):
+            return None
+
+        rect = QRectF(x0, y0, width / sx, height / sy)
+        return TileJob(self, key, scale, self._tile_gen, rect, width, height, data)
+
+    def _on_tile(self, job: TileJob, image: QImage):
+        if job.owner is not self or job.gen != self._tile_gen \
+                or self._pending.get(job.key) is not job:
+            return
+
+        del self._pending[job.key]
+        self._tiles.pop(job.key, None)
+        self._tiles[job.key] = _Tile(job.scale, job.rect, image)
+
+        while len(self._tiles) > self.MAX_TILES:
+            del self._tiles[next(iter(self._tiles))]
+
+        self.update()
+
+    def _paint_chunk(self, painter, level: int, k: int, scale, wanted, budget) -> int:
+        """
+        Desenha um chunk fechado. :return: gravações síncronas restantes
+        """
+        key = (level, k)
+        complete = ((k + 1) * self.CHUNK) << level <= self.engine.closed_end_seq
+
+        if scale is None or not complete:
+            painter.drawPicture(0, 0, self._chunk_picture(level, k))
+            return budget
+
+        tile = self._tiles.get(key)
+        if tile is not None and tile.scale == scale:
+            painter.drawImage(tile.rect, tile.image)
+            return budget
+
+        job = self._tile_job(level, k, scale)
+        if job is None:
+            painter.drawPicture(0, 0, self._chunk_picture(level, k))
+            return budget
+        wanted[key] = job
+
+        # Enquanto o tile não chega
+        if tile is not None:
+            painter.drawImage(tile.rect, tile.image)
+        elif key in self._chunks or budget > 0:
+            if key not in self._chunks:
+                budget -= 1
+            painter.drawPicture(0, 0, self._chunk_picture(level, k))
+        return budget
+
+    # --------------------------
+    # PINTURA
+    # --------------------------
+
     def paint(self, painter, *args):
-        painter.drawPicture(0, 0, self.picture)
+        eng = self.engine
+        if not len(eng):
+            return
+
+        # Barras visíveis (culling por seq) + nível de detalhe
+        vb = self.getViewBox()
+        t = eng.t
+        level = 0
+        scale = None
+        if vb is not None:
+            (x0, x1), _ = vb.viewRange()
+            i0 = max(0, int(np.searchsorted(t, x0 - eng.spacing)) - 1)
+            i1 = min(len(t), int(np.searchsorted(t, x1 + eng.spacing)) + 1)
+            level = min(self.pyramid.level_for(vb.viewPixelSize()[0]), self.pyramid.depth)
+            if self._rasterizer is not None:
+                scale = self._tile_scale(vb, painter)
+        else:
+            i0, i1 = 0, len(t)
+
+        wanted: Dict[Tuple[int, int], TileJob] = {}
+        budget = self.SYNC_CHUNKS
+
+        seq0 = eng.first_seq + i0
+        seq1 = min(eng.first_seq + i1, eng.closed_end_seq)
+        if seq1 > seq0:
+            k0 = (seq0 >> level) // self.CHUNK
+            k1 = ((seq1 - 1) >> level) // self.CHUNK
+            for k in range(k0, k1 + 1):
+                budget = self._paint_chunk(painter, level, k, scale, wanted, budget)
+
+        # Pedidos fora da vista / de outra escala são cancelados
+        if self._rasterizer is not None and wanted != self._pending:
+            self._pending = wanted
+            self._rasterizer.submit(self, list(wanted.values()))
+
+        # Barra em formação (desenho direto)
+        if eng.live:
+            self._draw_bars(painter, *self._bars(eng, len(eng) - 1, len(eng)))
 
     def boundingRect(self):
-        return self.picture.boundingRect()
+        return self._bounds
 
-    def update_data(self, candles: List[Candle]):
-        self.candles = candles
-        self.generatePicture()
-        self.update()
+
+# ==========================================================
+# CANDLESTICK ITEM — RENDER DE ALTA PERFORMANCE
+# ==========================================================
+
+class CandlestickItem(SeqChunkItem):
+    """
+    Renderização manual de candles:
+    - Muito mais rápida que PlotDataItem
+    - Corpo e wick desenhados com QPainter
+    - nos níveis agregados: 1 coluna OHLC por bloco
+    """
+
+    def _y_span(self, i0, i1):
+        eng = self.engine
+        return float(eng.low[i0:i1].min()), float(eng.high[i0:i1].max())
+
+    def _fields(self, src, a, b):
+        return (
+            src.open[a:b].copy(),
+            src.high[a:b].copy(),
+            src.low[a:b].copy(),
+            src.close[a:b].copy(),
+        )
+
+    def _fields_y(self, fields):
+        _, h, l, _ = fields
+        return float(l.min()), float(h.max())
+
+    def _draw_bars(self, painter, x, span, up, fields):
+        """
+        Desenha colunas OHLC agrupadas por cor:
+        2 draw calls (wicks + corpos) por cor.
+        """
+        o, h, l, c = fields
+
+        w = np.maximum(span * 0.35, 0.2)
+        body_lo = np.minimum(o, c)
+        body_h = np.maximum(np.abs(c - o), 0.001)
+
+        for side in (0, 1):
+            idx = np.flatnonzero(up if side else ~up)
+            if not len(idx):
+                continue
+
+            painter.setPen(self._pens[side])
+            painter.setBrush(self._brushes[side])
+
+            painter.drawLines(
+                [QLineF(x[i], l[i], x[i], h[i]) for i in idx]
+            )
+            painter.drawRects(
+                [QRectF(x[i] - w[i], body_lo[i], w[i] * 2, body_h[i]) for i in idx]
+            )
+
+
+# ==========================================================
+# VOLUME BAR ITEM — DUAS CORES, SEM BRUSH POR BARRA
+# ==========================================================
+
+class VolumeBarItem(SeqChunkItem):
+    """
+    Barras de volume a partir dos arrays do ChartEngine:
+    - máscara NumPy (close >= open) separa as duas cores
+    - 1 drawRects por cor e por chunk, com o pen / brush da paleta
+    - nos níveis agregados: volume máximo do bloco
+    """
+
+    def _y_span(self, i0, i1):
+        return 0.0, float(self.engine.volume[i0:i1].max())
+
+    def _fields(self, src, a, b):
+        height = src.volume if src is self.engine else src.vmax
+        return (height[a:b].copy(),)
+
+    def _fields_y(self, fields):
+        return 0.0, float(fields[0].max())
+
+    def _draw_bars(self, painter, x, span, up, fields):
+        (height,) = fields
+        w = span * 0.4
+
+        for side in (0, 1):
+            idx = np.flatnonzero(up if side else ~up)
+            if not len(idx):
+                continue
+
+            painter.setPen(self._pens[side])
+            painter.setBrush(self._brushes[side])
+
+            painter.drawRects(
+                [QRectF(x[i] - w[i], 0.0, w[i] * 2, height[i]) for i in idx]
+            )
+
+
+# ==========================================================
+# INDICATOR LINE — HISTÓRICO + CAUDA
+# ==========================================================
+
+class IndicatorLine:
+    """
+    Série de indicador desenhada em dois PlotDataItems:
+    - history → valores dos candles fechados (setData só quando um fecha)
+    - tail    → último fechado + candle em formação (2 pontos por tick)
+    """
+
+    def __init__(self, plot: pg.PlotItem, pen):
+        self.history = pg.PlotDataItem(pen=pen, connect="finite")
+        self.tail = pg.PlotDataItem(pen=pen, connect="finite")
+
+        plot.addItem(self.history)
+        plot.addItem(self.tail)
+
+        # Só a janela visível (decimação segue o nível de detalhe)
+        self.history.setClipToView(True)
+
+    def set_downsampling(self, ds: int):
+        self.history.setDownsampling(ds=ds, auto=False, method="mean")
+
+    def update(self, t: np.ndarray, y: np.ndarray, closed: int, start: int):
+        """
+        :param closed: nº de candles fechados (prefixo de t / y)
+        :param start: primeiro índice alterado desde o último update
+        """
+        if start < closed:
+            self.history.setData(t[:closed].copy(), y[:closed].copy())
+
+        a = max(closed - 1, 0)
+        self.tail.setData(t[a:].copy(), y[a:].copy())
 
 
 # ==========================================================
@@ -241,9 +875,18 @@ class ChartPanel(QWidget):
         self.bar_limit = int(settings.value("chart_max_bars", 500))
 
         self.engine = ChartEngine(max_candles=self.bar_limit)
+        self.pyramid = CandlePyramid(self.engine)
+        self.indicators = IndicatorEngine(self.engine)
+        self.range_index = ChartRangeIndex(self.engine)
+
+        # Histórico de candles / volume rasterizado fora do thread da UI
+        self.rasterizer = TileRasterizer(self)
 
+        # Histórico completo recebido (fonte para reaplicar o limite de barras)
         self._raw_candles: List[Candle] = []
-        self._candles: List[Candle] = []
+
+        # Outlier clamp incremental (mediana móvel dos closes)
+        self._guard = OutlierGuard(band=0.4)
 
         self._logger = logging.getLogger(__name__)
         self._current_symbol = "N/A"
@@ -276,7 +919,7 @@ class ChartPanel(QWidget):
         self.price_label.setStyleSheet(f"color: {colors.MUTED};")
 
         self.bar_spin = QSpinBox()
-        self.bar_spin.setRange(300, 5000)
+        self.bar_spin.setRange(300, 100_000)
         self.bar_spin.setSingleStep(100)
         self.bar_spin.setValue(self.bar_limit)
         self.bar_spin.setSuffix(" bars")
@@ -294,10 +937,23 @@ class ChartPanel(QWidget):
         self.price_axis = TimeAxisItem(orientation="bottom")
         self.volume_axis = TimeAxisItem(orientation="bottom")
 
-        self.price_view = PriceViewBox(on_user_action=self._stop_follow)
-        self.volume_view = PriceViewBox(on_user_action=self._stop_follow)
+        self.price_view = PriceViewBox(
+            on_user_action=self._stop_follow,
+            on_pan=self._stop_autoscale,
+            on_reset=self._reset_view,
+        )
+        self.volume_view = PriceViewBox(
+            on_user_action=self._stop_follow,
+            on_reset=self._reset_view,
+        )
         self.volume_view.setMouseEnabled(x=True, y=False)
 
+        # Y-range calculado pelo painel (ChartRangeIndex), não pelo pyqtgraph
+        self.price_view.disableAutoRange()
+        self.volume_view.disableAutoRange()
+        self.price_view.auto_y = True
+        self.volume_view.auto_y = True
+
         # --------------------------
         # PRICE PLOT
         # --------------------------
@@ -311,6 +967,7 @@ class ChartPanel(QWidget):
 
         self.price_plot.setMenuEnabled(False)
         self.price_plot.setLabel("left", "Price")
+
         self.price_plot.getAxis("left").setPen(pg.mkPen(colors.MUTED))
         self.price_plot.getAxis("bottom").setPen(pg.mkPen(colors.MUTED))
 
@@ -336,17 +993,32 @@ class ChartPanel(QWidget):
         # ITEMS
         # --------------------------
 
-        self.candle_item = CandlestickItem([])
+        self.candle_item = CandlestickItem(self.engine, self.pyramid, self.rasterizer)
         self.price_plot.addItem(self.candle_item)
 
-        self.ma_fast = pg.PlotDataItem(pen=pg.mkPen(colors.HIGHLIGHT, width=2))
-        self.ma_slow = pg.PlotDataItem(pen=pg.mkPen(colors.ACCENT_BLUE, width=2))
-        self.price_plot.addItem(self.ma_fast)
-        self.price_plot.addItem(self.ma_slow)
-
-        self.volume_bar = pg.BarGraphItem(x=[], height=[], width=0.6)
+        # Indicadores (incrementais) → { série : linha }
+        self.indicators.add("ema_fast", EMA(9))
+        self.indicators.add("sma_slow", SMA(21))
+        self.indicators.add("vwap", VWAP(bands=(1.0,)))
+
+        band_pen = pg.mkPen(colors.MUTED, width=1, style=Qt.DashLine)
+        self._lines = {
+            "ema_fast": IndicatorLine(self.price_plot, pg.mkPen(colors.HIGHLIGHT, width=2)),
+            "sma_slow": IndicatorLine(self.price_plot, pg.mkPen(colors.ACCENT_BLUE, width=2)),
+            "vwap.vwap": IndicatorLine(self.price_plot, pg.mkPen(colors.TEXT, width=1)),
+            "vwap.upper1": IndicatorLine(self.price_plot, band_pen),
+            "vwap.lower1": IndicatorLine(self.price_plot, band_pen),
+        }
+
+        self.volume_bar = VolumeBarItem(self.engine, self.pyramid, self.rasterizer)
         self.volume_plot.addItem(self.volume_bar)
 
+        # Nível de detalhe (candles por pixel) da vista atual
+        self._lod_level = 0
+
+        self.price_view.sigXRangeChanged.connect(self._update_lod)
+        self.price_view.sigResized.connect(self._update_lod)
+
         # --------------------------
         # CROSSHAIR
         # --------------------------
@@ -378,36 +1050,76 @@ class ChartPanel(QWidget):
 
         self._apply_bar_limit()
 
+    def shutdown(self):
+        """
+        Para o rasterizador de tiles (chamado pelo MainWindow ao fechar).
+        """
+        self.rasterizer.stop()
+
     # ==========================================================
     # DATA UPDATE
     # ==========================================================
 
-    def update_data(self, candles: List[Candle]):
+    def set_history(self, candles: List[Candle]):
         """
-        Recebe candles do DataEngine.
+        Histórico completo (símbolo / timeframe novo).
         """
         if not candles:
             return
 
         ordered = sorted(candles, key=lambda c: c.open_time)
 
-        closes = np.array([c.close for c in ordered], dtype=float)
-        filtered = ordered
-
-        # Outlier clamp
-        if closes.size:
-            lower, upper = clamp_prices(closes, band=0.4)
-            if lower is not None:
-                filtered = [
-                    c for c in ordered
-                    if lower <= c.close <= upper
-                    and c.low > 0
-                    and c.high > 0
-                ]
+        # Outlier clamp (uma vez; depois mantido incrementalmente).
+        # O último candle está em formação: é verificado mas só entra
+        # no guard quando fechar (on_candle_update), uma única vez
+        ok = self._guard.filter_history([c.close for c in ordered[:-1]]).tolist()
+        ok.append(self._guard.accepts(ordered[-1].close))
+        filtered = [
+            c for c, keep in zip(ordered, ok)
+            if keep and c.low > 0 and c.high > 0
+        ]
 
         self._raw_candles = filtered or ordered
         self._apply_bar_limit()
 
+    def update_data(self, candles: List[Candle]):
+        """
+        Recebe candles do DataEngine (API legacy → histórico completo).
+        """
+        self.set_history(candles)
+
+    def on_candle_update(self, candle: Candle, closed: bool):
+        """
+        Update incremental (kline): O(1) no gráfico de candles.
+        """
+        accepted = self._guard.accepts(candle.close) and candle.low > 0 and candle.high > 0
+        if closed:
+            self._guard.add(candle.close)
+        if not accepted:
+            self._logger.debug("Outlier candle ignored: %s", candle)
+            return
+
+        kind = self.engine.update(candle, closed)
+        if kind is None:
+            return
+
+        if kind == "append":
+            self._raw_candles.append(candle)
+            if len(self._raw_candles) > 2 * self.bar_spin.maximum():
+                del self._raw_candles[: -self.bar_spin.maximum()]
+        elif kind == "revise":
+            if len(self._raw_candles) > 1:
+                self._raw_candles[-2] = candle
+        elif self._raw_candles:
+            self._raw_candles[-1] = candle
+
+        self.range_index.sync()
+        self.candle_item.sync()
+        self.volume_bar.sync()
+        self._update_overlays()
+        self._update_label()
+        self._follow()
+
     # ==========================================================
     # APPLY BAR LIMIT + RENDER
     # ==========================================================
@@ -416,46 +1128,97 @@ class ChartPanel(QWidget):
         """
         Aplica limite de candles e renderiza tudo.
         """
-        source = self._raw_candles[-self.bar_limit :] if self._raw_candles else []
+        self.engine.max_candles = self.bar_limit
+        self.engine.set_history(self._raw_candles)
+        self._candle_spacing = self.engine.spacing
+
+        self.range_index.sync()
+        self.candle_item.sync()
+        self.volume_bar.sync()
+        self._update_overlays()
+        self._update_label()
+        self._follow()
+
+    def _update_overlays(self):
+        """
+        Indicadores (só a cauda alterada).
+        """
+        start = self.indicators.sync()
+        if start is not None:
+            eng = self.engine
+            closed = eng.index_of(eng.closed_end_seq)
+            for name, line in self._lines.items():
+                line.update(eng.t, self.indicators.series(name), closed, start)
 
-        self._candles = [
-            Candle(
-                t=c.open_time / 1000.0,
-                open=c.open,
-                high=c.high,
-                low=c.low,
-                close=c.close,
-                volume=c.volume,
-            )
-            for c in source
-        ]
+        self._update_lod()
+
+    # ==========================================================
+    # LEVEL OF DETAIL
+    # ==========================================================
+
+    def _update_lod(self, *args):
+        """
+        Chamado em pan / zoom / resize.
+
+        - candles e volume escolhem o nível no paint; aqui só a
+          decimação (mean) das linhas por bloco de 2^nível candles
+        - auto-scale y dos dois painéis
+        """
+        level = min(
+            self.pyramid.level_for(self.price_view.viewPixelSize()[0]),
+            self.pyramid.depth,
+        )
+
+        if level != self._lod_level:
+            self._lod_level = level
+            for line in self._lines.values():
+                line.set_downsampling(1 << level)
+
+        self._autoscale()
+
+    def _autoscale(self):
+        """
+        Ajusta o y de preço e volume aos candles visíveis.
+        O(log n) por viewport (ChartRangeIndex).
+        """
+        eng = self.engine
+        if not len(eng) or not self.price_view.auto_y:
+            return
 
-        self.candle_item.update_data(self._candles)
+        (x0, x1), _ = self.price_view.viewRange()
+        t = eng.t
+        i0 = int(np.searchsorted(t, x0 - eng.spacing * 0.5))
+        i1 = int(np.searchsorted(t, x1 + eng.spacing * 0.5))
 
-        # Médias móveis
-        closes = np.array([c.close for c in self._candles], dtype=float)
-        x_vals = [c.t for c in self._candles]
+        rng = self.range_index.y_range(i0, i1)
+        if rng is None:
+            return
+        lo, hi, vmax = rng
 
-        self.ma_fast.setData(x_vals, closes if closes.size else [])
-        self.ma_slow.setData(x_vals, np.convolve(closes, np.ones(10)/10, mode="same") if closes.size else [])
+        pad = max((hi - lo) * 0.05, abs(hi) * 1e-4)
+        self.price_view.setYRange(lo - pad, hi + pad, padding=0)
+        self.volume_view.setYRange(0, max(vmax, 1e-9) * 1.1, padding=0)
 
-        # Volume
-        self.volume_bar.setOpts(
-            x=x_vals,
-            height=[c.volume for c in self._candles],
-            width=max(1.0, self._candle_spacing * 0.8),
-            brushes=[
-                pg.mkBrush(colors.ACCENT_GREEN if c.close >= c.open else colors.ACCENT_RED)
-                for c in self._candles
-            ],
+    def _update_label(self):
+        last = self.engine.last()
+        if last is None:
+            return
+        self.price_label.setText(
+            f"Price: {last[ChartEngine.CLOSE]:.2f} | V: {last[ChartEngine.VOLUME]:.2f}"
         )
 
-        # Follow price
-        if self._candles and self._follow_price:
-            last = self._candles[-1]
-            width = self._last_view_width or max(self._candle_spacing * 120, 60)
-            self.price_plot.setXRange(last.t - width, last.t, padding=0)
-            self.volume_plot.setXRange(last.t - width, last.t, padding=0)
+    def _follow(self):
+        """
+        Follow price: mantém o último candle encostado à direita.
+        """
+        last = self.engine.last()
+        if last is None or not self._follow_price:
+            return
+
+        t = float(last[ChartEngine.T])
+        width = self._last_view_width or max(self._candle_spacing * 120, 60)
+        self.price_plot.setXRange(t - width, t, padding=0)
+        self.volume_plot.setXRange(t - width, t, padding=0)
 
     # ==========================================================
     # INTERACTIONS
@@ -471,6 +1234,18 @@ class ChartPanel(QWidget):
     def _stop_follow(self):
         self._follow_price = False
 
+    def _stop_autoscale(self):
+        self.price_view.auto_y = False
+
+    def _reset_view(self):
+        """
+        Duplo clique: volta a seguir o preço com auto-scale.
+        """
+        self._follow_price = True
+        self.price_view.auto_y = True
+        self._follow()
+        self._autoscale()
+
     def _on_bar_limit_changed(self, value: int):
         self.bar_limit = value
         QSettings("OmniFlow", "TerminalUI").setValue("chart_max_bars", value)
@@ -3,21 +3,21 @@
 # ==========================================================
 
 import logging
-from collections import defaultdict, deque
-from dataclasses import dataclass
-from typing import Deque, Dict, List, Tuple, Optional
+import os
+import time
+from bisect import bisect_right
 
 # ==========================================================
 # IMPORTS QT
 # ==========================================================
 
-from PySide6.QtCore import QRectF, QTimer, Qt
-from PySide6.QtGui import QColor, QFont, QPainter
+import pyqtgraph as pg
+
+from PySide6.QtCore import QRectF, QSettings, QTimer, Qt
+from PySide6.QtGui import QBrush, QColor, QFont, QPen
 from PySide6.QtWidgets import (
+    QComboBox,
     QFrame,
-    QGraphicsScene,
-    QGraphicsTextItem,
-    QGraphicsView,
     QHBoxLayout,
     QLabel,
     QVBoxLayout,
@@ -32,351 +32,316 @@ from core.data_engine.events import (
     TradeEvent,
     CandleHistory,
     CandleUpdate,
+    FootprintHistoryBatch,
     TimeframeChanged,
     SymbolChanged,
 )
-from core.data_engine.models import Trade
+from core.data_engine.footprint_history import FootprintReconstructor
+
+# ==========================================================
+# FOOTPRINT STORE (CORE)
+# ==========================================================
+
+from core.footprint_engine import FootprintAggregator
+from core.row_size import RowSizer
 
 # ==========================================================
 # UI THEME
 # ==========================================================
 
 from ui.theme import colors, typography
+from ui.panels.chart_panel import TimeAxisItem
 
 
 # ==========================================================
-# DATA STRUCTURE — FOOTPRINT CELL
+# FOOTPRINT GRID ITEM (PINTURA DIRETA)
 # ==========================================================
 
-@dataclass
-class FootprintCell:
+class FootprintGridItem(pg.GraphicsObject):
     """
-    Representa um nível de preço no footprint.
+    Grelha footprint por candle, pintada diretamente com QPainter.
+
+    - Eixo X = tempo (segundos, igual ao ChartPanel)
+    - Eixo Y = preço
+    - Só os buckets e níveis dentro do viewport são desenhados
+      (bisect nos níveis ordenados de cada bucket)
+    - Nenhum QGraphicsItem por célula: pens/brushes são pré-construídos
+
+    Texto (sell x buy) só é desenhado quando a célula tem
+    tamanho suficiente em pixels.
+
+    Linhas de `row_ticks` ticks: agregadas na hora a partir
+    dos buckets base (resolução de tick), com cache por bucket.
     """
-    price: float
-    buy: float
-    sell: float
 
-    @property
-    def delta(self) -> float:
-        """
-        Delta = Buy Volume - Sell Volume
-        """
-        return self.buy - self.sell
+    # Níveis de intensidade pré-construídos (alpha)
+    INTENSITY_STEPS = 8
 
+    def __init__(self, store: FootprintAggregator):
+        super().__init__()
+        self.store = store
+        self.row_ticks = 1
+        self._bounds = QRectF()
+        self.font = typography.mono(8)
+        self._build_palette()
 
-# ==========================================================
-# FOOTPRINT AGGREGATOR (CORE LÓGICO)
-# ==========================================================
+    # --------------------------
+    # PALETA (CACHE)
+    # --------------------------
 
-class FootprintAggregator:
-    """
-    Agregador de trades por:
-    - bucket temporal (timeframe)
-    - nível de preço
-
-    Responsável por:
-    - acumular buy/sell
-    - combinar múltiplos candles
-    - fornecer células prontas para renderização
-    """
+    def _build_palette(self):
+        """
+        Constrói brushes/pens uma vez (e em mudança de tema).
+        """
+        def ramp(hex_color):
+            out = []
+            for i in range(self.INTENSITY_STEPS):
+                c = QColor(hex_color)
+                c.setAlpha(int(40 + 200 * (i + 1) / self.INTENSITY_STEPS))
+                out.append(QBrush(c))
+            return out
 
-    def __init__(self):
-        self.timeframe_ms = 60_000
-        self.symbol = "BTCUSDT"
+        self._buy_brushes = ramp(colors.ACCENT_GREEN)
+        self._sell_brushes = ramp(colors.ACCENT_RED)
 
-        # Estrutura:
-        # { bucket_time_ms : { price_level : FootprintCell } }
-        self.cells: Dict[int, Dict[float, FootprintCell]] = {}
+        self._grid_pen = QPen(QColor(colors.GRID))
+        self._grid_pen.setCosmetic(True)
 
-        # Buffer de trades recentes
-        self.trades: Deque[Trade] = deque(maxlen=5000)
+        self._poc_pen = QPen(QColor(colors.HIGHLIGHT))
+        self._poc_pen.setCosmetic(True)
+        self._poc_pen.setWidth(2)
 
-        # Quantos buckets combinar (efeito “cluster”)
-        self.bucket_history = 4
+        self._text_pen = QPen(QColor(colors.TEXT))
+        self._marker_brush = QBrush(QColor(colors.HIGHLIGHT))
+        self._absorb_brush = QBrush(QColor(colors.ACCENT_GREEN))
 
+    def invalidate_colors(self):
+        self._build_palette()
+        self.update()
 
     # --------------------------
-    # CONFIGURAÇÃO
+    # GEOMETRIA
     # --------------------------
 
-    def set_timeframe(self, tf: str):
+    def refresh(self):
         """
-        Atualiza timeframe e limpa estado.
+        Atualiza limites (para autorange / pan) e agenda repaint.
+        Custo O(1): usa os extremos mantidos pelo store.
         """
-        mapping = {
-            "1m": 60_000,
-            "5m": 300_000,
-            "15m": 900_000,
-            "1h": 3_600_000,
-            "4h": 14_400_000,
-            "1d": 86_400_000,
-        }
-        self.timeframe_ms = mapping.get(tf.lower(), 60_000)
-        self.cells.clear()
-        self.trades.clear()
-
-    def set_symbol(self, symbol: str):
-        """
-        Atualiza símbolo e limpa estado.
-        """
-        self.symbol = symbol.upper()
-        self.cells.clear()
-        self.trades.clear()
+        keys = self.store._keys
+        if keys and self.store.lo_tick is not None:
+            tf_s = self.store.timeframe_ms / 1000.0
+            tick = self.store.tick_size
+            lo = self.store.lo_tick
+            hi = self.store.hi_tick + max(1, self.row_ticks)
+            bounds = QRectF(
+                keys[0] / 1000.0 - tf_s,
+                lo * tick,
+                (keys[-1] - keys[0]) / 1000.0 + 2 * tf_s,
+                max(tick, (hi - lo + 1) * tick),
+            )
+        else:
+            bounds = QRectF()
+
+        if bounds != self._bounds:
+            self.prepareGeometryChange()
+            self._bounds = bounds
+        self.update()
 
+    def boundingRect(self):
+        return self._bounds
 
     # --------------------------
-    # INGESTÃO DE DADOS
+    # PINTURA
     # --------------------------
 
-    def add_candles(self, candles):
-        """
-        Garante buckets para candles históricos.
-        """
-        for c in candles:
-            self.cells.setdefault(c.open_time, {})
+    def paint(self, painter, *args):
+        vb = self.getViewBox()
+        if vb is None or not self.store.cells:
+            return
 
-    def add_candle_update(self, candle, closed: bool):
-        """
-        Garante bucket para candle atual.
-        """
-        self.cells.setdefault(candle.open_time, {})
+        (x0, x1), (y0, y1) = vb.viewRange()
 
-    def add_trade(self, trade: Trade):
-        """
-        Adiciona trade ao footprint.
-        """
-        if trade.symbol.upper() != self.symbol:
+        tf_s = self.store.timeframe_ms / 1000.0
+        tick = self.store.tick_size
+        row = max(1, self.row_ticks)
+        row_h = tick * row
+        half = tf_s * 0.45
+
+        buckets = self.store.buckets_between(
+            int((x0 - tf_s) * 1000),
+            int((x1 + tf_s) * 1000),
+        )
+        if not buckets:
             return
 
-        self.trades.append(trade)
+        lo_tick = int(y0 / tick) - 1
+        hi_tick = int(y1 / tick) + 1
 
-        # Bucket temporal
-        bucket = (trade.ts // self.timeframe_ms) * self.timeframe_ms
-        levels = self.cells.setdefault(bucket, {})
+        # Trabalhar em coordenadas de dispositivo (texto nítido)
+        tr = painter.transform()
+        painter.save()
+        painter.resetTransform()
+        painter.setFont(self.font)
 
-        # Nível de preço (normalizado)
-        price_level = round(trade.price, 2)
+        sample = tr.mapRect(QRectF(0, 0, 2 * half, row_h))
+        show_text = abs(sample.height()) >= 11 and abs(sample.width()) >= 70
 
-        cell = levels.get(price_level)
-        if not cell:
-            cell = FootprintCell(price=price_level, buy=0.0, sell=0.0)
-            levels[price_level] = cell
+        steps = self.INTENSITY_STEPS - 1
 
-        # Agressão
-        if trade.side.lower() == "buy":
-            cell.buy += trade.qty
-        else:
-            cell.sell += trade.qty
+        for bucket in buckets:
+            if bucket.lo is None or bucket.hi < lo_tick or bucket.lo > hi_tick:
+                continue
 
+            cx = bucket.open_time / 1000.0
+            buy_rows, sell_rows = bucket.rows(row)
 
-    # --------------------------
-    # OUTPUT PARA UI
-    # --------------------------
+            # Linhas ordenadas → bisect ao intervalo visível
+            ticks = bucket.levels(row)
+            levels = ticks[bisect_right(ticks, lo_tick - row) : bisect_right(ticks, hi_tick)]
+            if not levels:
+                continue
 
-    def latest_cells(self, depth: int = 18) -> List[FootprintCell]:
-        """
-        Retorna as células combinadas mais recentes,
-        prontas para renderização.
-        """
-        if not self.cells:
-            return []
+            vols = {
+                t: buy_rows.get(t, 0.0) + sell_rows.get(t, 0.0)
+                for t in levels
+            }
+            max_vol = max(vols.values()) or 1.0
+            poc = max(vols, key=vols.get)
+
+            for t in levels:
+                buy = buy_rows.get(t, 0.0)
+                sell = sell_rows.get(t, 0.0)
+                y = t * tick - tick / 2
+
+                left = tr.mapRect(QRectF(cx - half, y, half, row_h))
+                right = tr.mapRect(QRectF(cx, y, half, row_h))
+
+                painter.setPen(Qt.NoPen)
+                if sell > 0:
+                    painter.setBrush(self._sell_brushes[int(steps * min(1.0, sell / max_vol))])
+                    painter.drawRect(left)
+                if buy > 0:
+                    painter.setBrush(self._buy_brushes[int(steps * min(1.0, buy / max_vol))])
+                    painter.drawRect(right)
 
-        # Últimos N buckets
-        buckets = sorted(self.cells.keys())[-self.bucket_history :]
+                # Heurísticas visuais (iguais à vista anterior)
+                total = buy + sell
+                imbalance = buy >= sell * 2 and buy > 0
+                absorption = total > max_vol * 0.5 and abs(buy - sell) < total * 0.1
 
-        combined: Dict[float, FootprintCell] = {}
+                if imbalance or absorption:
+                    painter.setBrush(self._marker_brush if imbalance else self._absorb_brush)
+                    r = min(4.0, abs(right.height()) / 2)
+                    painter.drawEllipse(right.center(), r, r)
 
-        # Combinação vertical (clusters)
-        for b in buckets:
-            for price, cell in self.cells.get(b, {}).items():
-                tgt = combined.get(price)
-                if not tgt:
-                    combined[price] = FootprintCell(
-                        price=price,
-                        buy=cell.buy,
-                        sell=cell.sell,
-                    )
-                else:
-                    tgt.buy += cell.buy
-                    tgt.sell += cell.sell
+                if t == poc:
+                    painter.setBrush(Qt.NoBrush)
+                    painter.setPen(self._poc_pen)
+                    painter.drawRect(left.united(right))
 
-        # Filtrar níveis vazios
-        levels = [
-            c for c in combined.values()
-            if (c.buy + c.sell) > 0
-        ]
+                if show_text:
+                    painter.setPen(self._text_pen)
+                    painter.drawText(left, Qt.AlignCenter, _fmt_qty(sell))
+                    painter.drawText(right, Qt.AlignCenter, _fmt_qty(buy))
 
-        # Ordenar por preço (top-down)
-        levels.sort(key=lambda c: c.price, reverse=True)
+        painter.restore()
 
-        return levels[:depth]
+
+def _fmt_qty(v: float) -> str:
+    """
+    Formato compacto para volume dentro das células.
+    """
+    if v >= 1_000:
+        return f"{v / 1_000:.1f}K"
+    if v >= 10:
+        return f"{v:.1f}"
+    return f"{v:.2f}"
 
 
 # ==========================================================
 # FOOTPRINT VIEW (RENDERIZAÇÃO)
 # ==========================================================
 
-class FootprintView(QGraphicsView):
-    """
-    Vista gráfica do footprint.
+class FootprintView(pg.PlotWidget):
     """
+    Vista gráfica do footprint (grelha multi-candle).
 
-    def __init__(self, parent=None):
-        super().__init__(parent)
-
-        self.setRenderHint(QPainter.Antialiasing, True)
+    - Eixo temporal partilhado com o ChartPanel (setXLink)
+    - Eixo de preço segue o último preço até o utilizador interagir
+    """
 
-        self.scene = QGraphicsScene(self)
-        self.setScene(self.scene)
+    def __init__(self, store: FootprintAggregator, parent=None):
+        super().__init__(
+            parent,
+            axisItems={"bottom": TimeAxisItem(orientation="bottom")},
+        )
 
-        self.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        self.setMenuEnabled(False)
+        self.hideButtons()
+        self.showGrid(x=False, y=True, alpha=0.15)
 
-        self.row_height = 24
-        self.headers = ["Price", "Buy Vol", "Sell Vol", "Delta"]
-        self.font = typography.mono(10)
+        self.grid_item = FootprintGridItem(store)
+        self.addItem(self.grid_item)
 
+        self._store = store
+        self._follow_y = True
+        self._linked = False
 
-    # --------------------------
-    # RENDERIZAÇÃO
-    # --------------------------
+        # Interação do utilizador no eixo Y desativa o follow
+        self.getViewBox().sigRangeChangedManually.connect(self._on_manual_range)
 
-    def _populate(self, rows: List[FootprintCell]):
+    def link_time_axis(self, plot_item):
         """
-        Renderiza células footprint no QGraphicsScene.
+        Alinha o eixo temporal ao do gráfico principal.
         """
-        self.scene.clear()
-
-        # Largura das colunas
-        cols = [80, 90, 90, 70]
-        x_positions = []
-        x = 0
-        for c in cols:
-            x_positions.append(x)
-            x += c
-
-        # Headers
-        for header, x in zip(self.headers, x_positions):
-            t = self.scene.addText(
-                header,
-                typography.inter(10, QFont.DemiBold),
-            )
-            t.setDefaultTextColor(QColor(colors.MUTED))
-            t.setPos(x + 4, 2)
-
-        if not rows:
-            self.setSceneRect(0, 0, sum(cols), 22 + self.row_height * 2)
-            return
-
-        # Normalização de volume
-        max_vol = max((c.buy + c.sell) for c in rows) or 1.0
+        self.setXLink(plot_item)
+        self._linked = True
 
-        for i, row in enumerate(rows):
-            y = 22 + i * self.row_height
+    def _on_manual_range(self, *_):
+        self._follow_y = False
 
-            buy_intensity = min(1.0, row.buy / max_vol)
-            sell_intensity = min(1.0, row.sell / max_vol)
+    def mouseDoubleClickEvent(self, event):
+        self._follow_y = True
+        self.refresh()
+        super().mouseDoubleClickEvent(event)
 
-            # Barras de volume
-            buy_rect = QRectF(
-                x_positions[1],
-                y + 3,
-                cols[1] * buy_intensity,
-                self.row_height - 6,
-            )
-            sell_rect = QRectF(
-                x_positions[2] + (cols[2] * (1 - sell_intensity)),
-                y + 3,
-                cols[2] * sell_intensity,
-                self.row_height - 6,
-            )
-
-            self.scene.addRect(
-                buy_rect,
-                pen=QColor(colors.BACKGROUND),
-                brush=QColor(colors.ACCENT_GREEN).lighter(120),
-            )
-            self.scene.addRect(
-                sell_rect,
-                pen=QColor(colors.BACKGROUND),
-                brush=QColor(colors.ACCENT_RED).lighter(120),
-            )
+    def refresh(self):
+        """
+        Repaint barato: só o viewport é pintado no próximo frame.
+        """
+        self.grid_item.refresh()
 
-            # Heurísticas visuais
-            imbalance = row.buy >= row.sell * 2 and row.buy > 0
-            absorption = (
-                (row.buy + row.sell) > max_vol * 0.5
-                and abs(row.delta) < (row.buy + row.sell) * 0.1
-            )
+        store = self._store
+        if not store._keys:
+            return
 
-            if imbalance:
-                marker = self.scene.addEllipse(
-                    x_positions[3] + cols[3] - 14,
-                    y + 6,
-                    8,
-                    8,
-                    pen=QColor(colors.HIGHLIGHT),
-                    brush=QColor(colors.HIGHLIGHT),
+        vb = self.getViewBox()
+        tf_s = store.timeframe_ms / 1000.0
+        last_t = store._keys[-1] / 1000.0
+
+        # Sem gráfico ligado → seguir os últimos candles
+        if not self._linked:
+            vb.setXRange(last_t - tf_s * 12, last_t + tf_s, padding=0)
+
+        if self._follow_y and store.last_tick is not None:
+            (x0, x1), _ = vb.viewRange()
+            visible = store.buckets_between(int(x0 * 1000), int(x1 * 1000))
+            lows = [b.lo for b in visible if b.lo is not None]
+            highs = [b.hi for b in visible if b.hi is not None]
+            if lows:
+                tick = store.tick_size
+                vb.setYRange(
+                    min(lows) * tick - tick,
+                    max(highs) * tick + tick,
+                    padding=0.02,
                 )
-                marker.setToolTip("Imbalance: Buy ≥ 2x Sell")
-
-            if absorption:
-                bubble = self.scene.addEllipse(
-                    x_positions[1] + cols[1] - 14,
-                    y + 6,
-                    8,
-                    8,
-                    pen=QColor(colors.ACCENT_GREEN),
-                    brush=QColor(colors.ACCENT_GREEN),
-                )
-                bubble.setToolTip("Absorption: high volume, muted delta")
-
-            # Valores textuais
-            values = [
-                f"{row.price:.2f}",
-                f"{row.buy:.2f}",
-                f"{row.sell:.2f}",
-                f"{row.delta:+.2f}",
-            ]
-
-            colors_list = [
-                colors.TEXT,
-                colors.ACCENT_GREEN,
-                colors.ACCENT_RED,
-                colors.ACCENT_GREEN if row.delta >= 0 else colors.ACCENT_RED,
-            ]
-
-            aligns = [1, 1, 2, 1]
-
-            for idx, (val, color_hex, align) in enumerate(
-                zip(values, colors_list, aligns)
-            ):
-                txt = QGraphicsTextItem(str(val))
-                txt.setFont(self.font)
-                txt.setDefaultTextColor(QColor(color_hex))
-                w = txt.boundingRect().width()
-
-                xpos = (
-                    x_positions[idx]
-                    + (cols[idx] - w)
-                    * (0.1 if align == 0 else 0.5 if align == 1 else 0.8)
-                )
-
-                txt.setPos(xpos, y + 4)
-                self.scene.addItem(txt)
 
-        self.setSceneRect(
-            0,
-            0,
-            sum(cols),
-            22 + len(rows) * self.row_height,
-        )
-
-    def update_footprint(self, rows):
+    def update_footprint(self, rows=None):
         """
-        API pública.
+        API pública (mantida por compatibilidade).
         """
-        self._populate(rows)
+        self.refresh()
 
 
 # ==========================================================
@@ -392,8 +357,15 @@ class FootprintPanel(QWidget):
     - Delta
     - Imbalances
     - Absorption
+
+    Histórico:
+    - Buckets de candles fechados visíveis são reconstruídos
+      em background a partir de aggTrades (com cache em disco)
     """
 
+    # Máximo de buckets pedidos de cada vez ao reconstrutor
+    MAX_HISTORY_REQUEST = 200
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -405,6 +377,30 @@ class FootprintPanel(QWidget):
 
         self._pending_refresh = False
 
+        # Tamanho de linha (ticks) — persistente
+        self._settings = QSettings("OmniFlow", "FootprintPanel")
+        self._rows = RowSizer(self._agg.tick_size)
+        self._rows.set_mode(self._settings.value("row_size", "Auto") or "Auto")
+
+        # Reconstrução histórica (thread próprio)
+        self._history_enabled = not os.environ.get("OMNIFLOW_DISABLE_PROVIDER")
+        self._history = FootprintReconstructor(self, tick_size=self._agg.tick_size)
+        self._history.buckets_ready.connect(self._on_history_batch)
+        self._history.progress.connect(self._on_history_progress)
+
+        # Buckets já pedidos / intervalo de histórico conhecido
+        self._requested: set[int] = set()
+        self._history_span: tuple[int, int] | None = None
+
+        # Primeira trade live (buckets anteriores estão incompletos)
+        self._live_since: int | None = None
+
+        # Debounce de pedidos quando a vista muda
+        self._history_timer = QTimer(self)
+        self._history_timer.setSingleShot(True)
+        self._history_timer.setInterval(300)
+        self._history_timer.timeout.connect(self._request_visible_history)
+
         # Timer de refresh controlado
         self._refresh_timer = QTimer(self)
         self._refresh_timer.setInterval(120)
@@ -428,14 +424,32 @@ class FootprintPanel(QWidget):
         header.addWidget(lbl)
         header.addStretch()
 
+        self.history_label = QLabel("")
+        self.history_label.setFont(typography.inter(10))
+        self.history_label.setStyleSheet(f"color:{colors.MUTED};")
+        self.history_label.setVisible(False)
+        header.addWidget(self.history_label)
+
+        self.row_combo = QComboBox()
+        self.row_combo.addItems(RowSizer.CHOICES)
+        self.row_combo.setCurrentText(self._rows.label())
+        self.row_combo.setFont(typography.inter(10))
+        self.row_combo.setToolTip("Row size (ticks)")
+        self.row_combo.currentTextChanged.connect(self._on_row_size_changed)
+        header.addWidget(self.row_combo)
+
         header.addWidget(self._legend("Imbalance ≥2x", colors.HIGHLIGHT))
         header.addWidget(self._legend("Absorption", colors.ACCENT_GREEN))
 
         layout.addLayout(header)
 
-        self.view = FootprintView()
+        self.view = FootprintView(self._agg)
         layout.addWidget(self.view)
 
+        self.view.getViewBox().sigXRangeChanged.connect(
+            lambda *_: self._history_timer.start()
+        )
+
         QTimer.singleShot(0, self._wire_engine)
         self._refresh_timer.start()
 
@@ -474,6 +488,10 @@ class FootprintPanel(QWidget):
         engine = getattr(window, "data_engine", None) if window else None
 
         if engine:
+            chart = getattr(window, "chart_panel", None)
+            if chart is not None:
+                self.view.link_time_axis(chart.price_plot)
+
             engine.trade.connect(self._on_trade)
             engine.candle_history.connect(self._on_candle_history)
             engine.candle_update.connect(self._on_candle_update)
@@ -485,31 +503,122 @@ class FootprintPanel(QWidget):
                 lambda: self._wire_engine(attempts + 1),
             )
 
+    def shutdown(self):
+        """
+        Para a reconstrução histórica (chamado pelo MainWindow ao fechar).
+        """
+        self._history_timer.stop()
+        self._refresh_timer.stop()
+        self._history.stop()
+
 
     # --------------------------
     # EVENT HANDLERS
     # --------------------------
 
     def _on_trade(self, evt: TradeEvent):
+        if self._live_since is None and evt.trade.symbol.upper() == self._agg.symbol:
+            self._live_since = evt.trade.ts
         self._agg.add_trade(evt.trade)
         self._pending_refresh = True
 
     def _on_candle_history(self, evt: CandleHistory):
         self._agg.add_candles(evt.candles)
+        self._rows.add_candles(evt.candles)
+        if evt.candles:
+            self._history_span = (evt.candles[0].open_time, evt.candles[-1].open_time)
+            self._history_timer.start()
         self._pending_refresh = True
 
     def _on_candle_update(self, evt: CandleUpdate):
         self._agg.add_candle_update(evt.candle, evt.closed)
+        self._rows.add_candle_update(evt.candle, evt.closed)
+
+        # Candle fechado que começou antes do live → completar via REST
+        open_time = evt.candle.open_time
+        if (
+            evt.closed
+            and self._live_since is not None
+            and open_time <= self._live_since
+            and open_time not in self._requested
+        ):
+            self._request_history([open_time])
+
         self._pending_refresh = True
 
     def _on_timeframe_changed(self, evt: TimeframeChanged):
         self._agg.set_timeframe(evt.timeframe)
+        self._reset_history()
         self._pending_refresh = True
 
     def _on_symbol_changed(self, evt: SymbolChanged):
         self._agg.set_symbol(evt.symbol)
+        self._rows.clear()
+        self._reset_history()
+        self._pending_refresh = True
+
+    def _on_row_size_changed(self, text: str):
+        # Só muda a agregação da vista: os buckets base ficam por tick
+        self._rows.set_mode(text)
+        self._settings.setValue("row_size", self._rows.label())
+        self._pending_refresh = True
+
+
+    # --------------------------
+    # HISTÓRICO (aggTrades)
+    # --------------------------
+
+    def _reset_history(self):
+        self._history.cancel()
+        self._requested.clear()
+        self._history_span = None
+        self._live_since = None
+
+    def _request_visible_history(self):
+        """
+        Pede os buckets fechados visíveis que ainda não têm volume.
+        """
+        if self._history_span is None:
+            return
+
+        tf = self._agg.timeframe_ms
+        first, last = self._history_span
+        (x0, x1), _ = self.view.getViewBox().viewRange()
+
+        last_closed = (int(time.time() * 1000) // tf - 1) * tf
+        hi = min(last, last_closed, int(x1 * 1000) // tf * tf)
+        lo = max(first, int(x0 * 1000) // tf * tf, hi - (self.MAX_HISTORY_REQUEST - 1) * tf)
+        if hi < lo:
+            return
+
+        wanted = [t for t in range(lo, hi + 1, tf) if t not in self._requested]
+        self._request_history(self._agg.missing_buckets(wanted))
+
+    def _request_history(self, open_times):
+        if not open_times or not self._history_enabled:
+            return
+        self._requested.update(open_times)
+        self._history.request(self._agg.symbol, self._agg.timeframe_ms, open_times)
+
+    def _on_history_batch(self, batch: FootprintHistoryBatch):
+        # Descarta resultados de um contexto anterior
+        if (
+            batch.symbol != self._agg.symbol
+            or batch.timeframe_ms != self._agg.timeframe_ms
+            or abs(batch.tick_size - self._agg.tick_size) > 1e-12
+        ):
+            return
+
+        for open_time, buy, sell in batch.buckets:
+            self._agg.set_bucket(open_time, buy, sell)
         self._pending_refresh = True
 
+    def _on_history_progress(self, done: int, total: int):
+        busy = total > 0 and done < total
+        self.history_label.setVisible(busy)
+        if busy:
+            self.history_label.setText(f"History {done}/{total}")
+
 
     # --------------------------
     # REFRESH CONTROLADO
@@ -521,8 +630,8 @@ class FootprintPanel(QWidget):
 
         self._pending_refresh = False
 
-        rows = self._agg.latest_cells(depth=30)
-        self.view.update_footprint(rows)
+        self.view.grid_item.row_ticks = self._rows.row_ticks
+        self.view.refresh()
 
 
     # --------------------------
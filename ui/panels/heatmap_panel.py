@@ -2,135 +2,484 @@
 # IMPORTS STANDARD
 # ==========================================================
 
-import random
 import logging
+import math
+from typing import List, Optional, Tuple
+
+# ==========================================================
+# IMPORTS NUMÉRICOS
+# ==========================================================
+
+import numpy as np
 
 # ==========================================================
 # IMPORTS QT (GRÁFICOS)
 # ==========================================================
 
-from PySide6.QtGui import QColor, QPainter
+from PySide6.QtGui import QColor, QImage, QPainter
 from PySide6.QtWidgets import (
-    QGraphicsRectItem,
-    QGraphicsScene,
-    QGraphicsView,
+    QComboBox,
     QHBoxLayout,
     QLabel,
     QVBoxLayout,
     QWidget,
 )
-from PySide6.QtCore import QTimer
+from PySide6.QtCore import QRectF, Qt, QTimer
+
+# ==========================================================
+# CORE EVENTS
+# ==========================================================
+
+from core.data_engine.events import (
+    DepthSnapshotEvent,
+    DepthUpdateEvent,
+    SymbolChanged,
+)
 
 # ==========================================================
-# TEMA DA UI
+# TEMA DA UI + MODELO DE BOOK
 # ==========================================================
 
 from ui.theme import colors, typography
+from ui.panels.dom_panel import DepthModel
+
+
+# ==========================================================
+# PYRAMID LEVEL (RING BUFFER 2D)
+# ==========================================================
+
+class PyramidLevel:
+    """
+    Um nível da pirâmide do heatmap.
+
+    Guarda um ring buffer (colunas = tempo, linhas = preço)
+    com dois redutores:
+    - max  → picos de liquidez
+    - mean → liquidez média
+
+    factor = quantas amostras base (tempo) e quantas linhas base
+    (preço) cada célula deste nível representa.
+    """
+
+    def __init__(self, factor: int, rows: int, capacity: int):
+        self.factor = factor
+        self.rows = rows
+        self.capacity = capacity
+
+        # Nº total de colunas já escritas (monotónico)
+        self.count = 0
+
+        self.max = np.zeros((capacity, rows), dtype=np.float32)
+
+        # No nível base max == mean (uma amostra por célula)
+        self.mean = (
+            self.max if factor == 1
+            else np.zeros((capacity, rows), dtype=np.float32)
+        )
+
+        # Colunas filhas à espera de par (nível k-1 → k)
+        self.pending: List[Tuple[np.ndarray, np.ndarray]] = []
+
+    def write(self, col_max: np.ndarray, col_mean: np.ndarray):
+        """
+        Escreve a próxima coluna no ring buffer.
+        """
+        idx = self.count % self.capacity
+        self.max[idx] = col_max
+        if self.mean is not self.max:
+            self.mean[idx] = col_mean
+        self.count += 1
+
+    @property
+    def first(self) -> int:
+        """
+        Índice (em colunas do nível) da coluna mais antiga retida.
+        """
+        return max(0, self.count - self.capacity)
+
+    def window(self, start: int, stop: int, reducer: str) -> Tuple[np.ndarray, int]:
+        """
+        Devolve as colunas [start, stop) ainda retidas.
+
+        :return: (array (cols, rows), start efetivo após clipping)
+        """
+        start = max(start, self.first)
+        stop = min(stop, self.count)
+        if stop <= start:
+            return np.zeros((0, self.rows), dtype=np.float32), start
+
+        src = self.max if reducer == "max" else self.mean
+        idx = np.arange(start, stop) % self.capacity
+        return src[idx], start
+
+    def shift_rows(self, delta: int):
+        """
+        Desloca o eixo de preço em `delta` linhas deste nível.
+        Linhas que entram ficam a zero.
+        """
+        _shift_rows(self.max, delta)
+        if self.mean is not self.max:
+            _shift_rows(self.mean, delta)
+
+        for child_max, child_mean in self.pending:
+            _shift_rows(child_max, delta * 2)
+            if child_mean is not child_max:
+                _shift_rows(child_mean, delta * 2)
+
+
+def _shift_rows(arr: np.ndarray, delta: int):
+    """
+    Shift in-place no último eixo (preço).
+    delta > 0 → preços sobem (linhas antigas descem de índice).
+    """
+    if delta == 0:
+        return
+    if abs(delta) >= arr.shape[-1]:
+        arr[...] = 0.0
+        return
+    if delta > 0:
+        arr[..., :-delta] = arr[..., delta:]
+        arr[..., -delta:] = 0.0
+    else:
+        arr[..., -delta:] = arr[..., :delta]
+        arr[..., :-delta] = 0.0
+
+
+# ==========================================================
+# HEATMAP PYRAMID (MULTI-RESOLUÇÃO)
+# ==========================================================
+
+class HeatmapPyramid:
+    """
+    Histórico de liquidez multi-resolução.
+
+    - Nível 0: uma coluna por amostra (ex: 100 ms), uma linha por price_step
+    - Nível k: 2^k amostras × 2^k linhas por célula (max / mean)
+
+    Os níveis são mantidos incrementalmente: cada par de colunas
+    completas do nível k-1 gera uma coluna do nível k, logo o custo
+    por amostra é O(rows) amortizado.
+
+    Todos os níveis têm a mesma capacidade em colunas, portanto os
+    níveis grosseiros retêm 2^k vezes mais tempo de histórico.
+    """
+
+    def __init__(self, rows: int = 512, capacity: int = 6000, levels: int = 3):
+        if rows % (2 ** levels):
+            raise ValueError("rows must be divisible by 2**levels")
+
+        self.rows = rows
+        self.capacity = capacity
+        self.levels: List[PyramidLevel] = [
+            PyramidLevel(2 ** k, rows // (2 ** k), capacity)
+            for k in range(levels + 1)
+        ]
+
+    @property
+    def count(self) -> int:
+        """
+        Nº total de amostras base recebidas.
+        """
+        return self.levels[0].count
+
+    @property
+    def row_alignment(self) -> int:
+        """
+        Granularidade mínima de shift de preço (em linhas base).
+        """
+        return self.levels[-1].factor
+
+    def clear(self):
+        for k, lvl in enumerate(self.levels):
+            self.levels[k] = PyramidLevel(lvl.factor, lvl.rows, lvl.capacity)
+
+    # --------------------------
+    # INGESTÃO
+    # --------------------------
+
+    def push(self, column: np.ndarray):
+        """
+        Adiciona uma amostra (coluna de liquidez por linha de preço).
+        """
+        column = np.asarray(column, dtype=np.float32)
+        self.levels[0].write(column, column)
+
+        child_max, child_mean = column, column
+        for lvl in self.levels[1:]:
+            lvl.pending.append((child_max, child_mean))
+            if len(lvl.pending) < 2:
+                break
+
+            (m0, a0), (m1, a1) = lvl.pending
+            lvl.pending = []
+
+            child_max = np.maximum(m0, m1).reshape(-1, 2).max(axis=1)
+            child_mean = ((a0 + a1) * 0.5).reshape(-1, 2).mean(axis=1)
+            lvl.write(child_max, child_mean)
+
+    def shift_rows(self, delta: int):
+        """
+        Re-ancora o eixo de preço (delta múltiplo de row_alignment).
+        Custo O(memória), mas só acontece quando o preço sai da janela.
+        """
+        if delta % self.row_alignment:
+            raise ValueError("delta must be a multiple of row_alignment")
+        for lvl in self.levels:
+            lvl.shift_rows(delta // lvl.factor)
+
+    # --------------------------
+    # SELEÇÃO DE NÍVEL
+    # --------------------------
+
+    def level_for(self, density: float, oldest_sample: int) -> int:
+        """
+        Escolhe o nível adequado à densidade atual
+        (amostras base por pixel).
+
+        - Nível mais grosseiro cujo fator ≤ densidade
+        - Sobe de nível se o início da vista já não está retido
+        """
+        k = 0
+        for i, lvl in enumerate(self.levels):
+            if lvl.factor <= max(1.0, density):
+                k = i
+
+        while (
+            k < len(self.levels) - 1
+            and self.levels[k].first > 0
+            and oldest_sample < self.levels[k].first * self.levels[k].factor
+        ):
+            k += 1
+
+        return k
 
 
 # ==========================================================
 # HEATMAP VIEW (CAMADA GRÁFICA)
 # ==========================================================
 
-class HeatmapView(QGraphicsView):
+class HeatmapView(QWidget):
     """
     Vista gráfica do heatmap de liquidez.
 
     Responsabilidades:
-    - Desenhar células (retângulos) coloridas
-    - Permitir zoom com scroll
-    - Permitir pan (drag)
+    - Escolher o nível da pirâmide conforme a densidade de pixels
+    - Converter a janela visível numa QImage (LUT de cores)
+    - Zoom com scroll (Ctrl → eixo de preço)
+    - Pan com drag (duplo clique → volta a seguir o live)
+
+    O custo por frame é proporcional aos pixels, não às amostras.
     """
 
-    def __init__(self, parent=None):
+    def __init__(self, pyramid: Optional[HeatmapPyramid] = None, parent=None):
         super().__init__(parent)
 
-        # Ativar antialiasing para melhor qualidade visual
-        self.setRenderHint(QPainter.Antialiasing, True)
+        self.setMinimumHeight(120)
+        self.setMouseTracking(False)
 
-        # Cena gráfica Qt
-        self.scene = QGraphicsScene(self)
-        self.setScene(self.scene)
+        self.pyramid = pyramid or HeatmapPyramid()
 
-        # Interação
-        self.setDragMode(QGraphicsView.ScrollHandDrag)
-        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        # Redutor ativo ("max" ou "mean")
+        self.reducer = "max"
 
-        # Dimensões do heatmap (dummy)
-        self.rows = 10
-        self.cols = 80
+        # Janela temporal (amostras base)
+        # anchor: fim da janela em amostras absolutas quando em pausa
+        # (pan); None → segue o live
+        self.span = 600.0
+        self.anchor: Optional[float] = None
 
-        # Dimensões de cada célula
-        self.cell_width = 12
-        self.cell_height = 26
-
-        # População inicial com dados fictícios
-        self.populate(self._dummy_data())
+        # Janela de preço (linhas base)
+        self.row_center = self.pyramid.rows / 2
+        self.row_span = self.pyramid.rows / 2
 
+        self._drag_origin = None
+        self._lut: Optional[np.ndarray] = None
+        self._last_level = 0
 
     # ======================================================
-    # DADOS FICTÍCIOS
+    # ESTADO DA VISTA
     # ======================================================
 
-    def _dummy_data(self):
+    def reset_view(self):
         """
-        Gera matriz de valores aleatórios [0..1].
-
-        Cada valor representa intensidade de liquidez.
+        Volta a seguir o live com o zoom por defeito.
         """
-        return [
-            [random.random() for _ in range(self.cols)]
-            for _ in range(self.rows)
-        ]
+        self.span = 600.0
+        self.anchor = None
+        self.row_center = self.pyramid.rows / 2
+        self.row_span = self.pyramid.rows / 2
+        self.update()
+
+    def _clamp(self):
+        max_span = float(self.pyramid.capacity * self.pyramid.levels[-1].factor)
+        self.span = min(max(20.0, self.span), max_span)
+        if self.anchor is not None:
+            count = self.pyramid.count
+            self.anchor = max(self.anchor, count - max_span)
+            if self.anchor >= count:
+                # Pan até ao presente → volta a seguir o live
+                self.anchor = None
+        self.row_span = min(max(8.0, self.row_span), float(self.pyramid.rows))
+        half = self.row_span / 2
+        self.row_center = min(max(half, self.row_center), self.pyramid.rows - half)
+
+    def shift_rows(self, delta: int):
+        """
+        O pyramid deslocou as linhas `delta` (recentragem no mid).
 
+        - em pausa / com pan vertical → mantém os mesmos preços
+          (drag em curso incluído)
+        - a seguir o live → continua centrada no mid
+        """
+        if self.anchor is None and self.row_center == self.pyramid.rows / 2:
+            return
+        self.row_center -= delta
+        if self._drag_origin is not None:
+            pos0, end0, center0 = self._drag_origin
+            self._drag_origin = (pos0, end0, center0 - delta)
+        self._clamp()
 
     # ======================================================
-    # RENDERIZAÇÃO DO HEATMAP
+    # COLORMAP
     # ======================================================
 
-    def populate(self, data):
+    def _build_lut(self) -> np.ndarray:
         """
-        Renderiza o heatmap a partir de uma matriz 2D.
+        LUT de 256 cores ARGB32: fundo → azul → destaque.
         """
-        self.scene.clear()
+        stops = [
+            QColor(colors.BACKGROUND),
+            QColor(colors.ACCENT_BLUE),
+            QColor(colors.HIGHLIGHT),
+        ]
+        rgb = np.array(
+            [[c.red(), c.green(), c.blue()] for c in stops],
+            dtype=np.float32,
+        )
+        pos = np.linspace(0.0, 1.0, 256)
+        anchors = np.linspace(0.0, 1.0, len(stops))
+        chans = [np.interp(pos, anchors, rgb[:, i]) for i in range(3)]
+        r, g, b = (c.astype(np.uint32) for c in chans)
+        return (0xFF000000 | (r << 16) | (g << 8) | b).astype(np.uint32)
 
-        for y, row in enumerate(data):
-            for x, value in enumerate(row):
-                # Converter intensidade em valor de cor
-                intensity = int(80 + value * 140)
+    # ======================================================
+    # RENDERIZAÇÃO
+    # ======================================================
 
-                rect = QGraphicsRectItem(
-                    x * self.cell_width,
-                    y * self.cell_height,
-                    self.cell_width,
-                    self.cell_height,
-                )
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(colors.BACKGROUND))
+
+        pyr = self.pyramid
+        w, h = max(1, self.width()), max(1, self.height())
+
+        if pyr.count == 0:
+            painter.setPen(QColor(colors.MUTED))
+            painter.setFont(typography.inter(10))
+            painter.drawText(self.rect(), Qt.AlignCenter, "Waiting for depth…")
+            painter.end()
+            return
+
+        self._clamp()
+
+        # Janela visível em unidades base
+        b1 = pyr.count if self.anchor is None else self.anchor
+        b0 = b1 - self.span
+        r0 = self.row_center - self.row_span / 2
+        r1 = r0 + self.row_span
+
+        # Densidade = amostras base por pixel no eixo mais denso
+        density = max(self.span / w, self.row_span / h)
+        k = pyr.level_for(density, int(b0))
+        lvl = pyr.levels[k]
+        f = lvl.factor
+        self._last_level = k
+
+        data, c0 = lvl.window(
+            int(math.floor(b0 / f)),
+            int(math.ceil(b1 / f)),
+            self.reducer,
+        )
 
-                # Cor baseada na intensidade
-                rect.setBrush(
-                    QColor(colors.ACCENT_BLUE).darker(intensity)
-                )
+        lo_row = max(0, int(math.floor(r0 / f)))
+        hi_row = min(lvl.rows, int(math.ceil(r1 / f)))
+        data = data[:, lo_row:hi_row]
+
+        if data.size:
+            # Redução extra se ainda houver mais colunas que pixels
+            step = data.shape[0] // w
+            if step >= 2:
+                n = (data.shape[0] // step) * step
+                blocks = data[:n].reshape(-1, step, data.shape[1])
+                data = blocks.max(axis=1) if self.reducer == "max" else blocks.mean(axis=1)
+            else:
+                step = 1
+
+            self._draw_image(painter, data, c0, step, f, lo_row, hi_row, b0, r0, w, h)
+
+        painter.setPen(QColor(colors.MUTED))
+        painter.setFont(typography.mono(9))
+        painter.drawText(
+            6, 14,
+            f"L{k} ×{f} {self.reducer}" + ("" if self.anchor is None else "  (paused)"),
+        )
+        painter.end()
 
-                # Contorno discreto
-                rect.setPen(QColor(colors.BACKGROUND))
+    def _draw_image(self, painter, data, c0, step, f, lo_row, hi_row, b0, r0, w, h):
+        """
+        Converte o slice (cols, rows) numa QImage e desenha-a
+        escalada para a área correspondente.
+        """
+        vmax = float(data.max())
+        if vmax <= 0:
+            return
 
-                self.scene.addItem(rect)
+        norm = np.log1p(data) / math.log1p(vmax)
+        idx = np.clip(norm * 255.0, 0, 255).astype(np.uint8)
 
-        # Definir área total da cena
-        self.setSceneRect(
-            0,
-            0,
-            self.cols * self.cell_width,
-            self.rows * self.cell_height,
-        )
+        if self._lut is None:
+            self._lut = self._build_lut()
+
+        # (rows, cols) com o preço mais alto no topo
+        pixels = np.ascontiguousarray(self._lut[idx.T[::-1]])
+        img_h, img_w = pixels.shape
+        img = QImage(pixels.data, img_w, img_h, img_w * 4, QImage.Format_ARGB32).copy()
+
+        # Posição da imagem em coordenadas de ecrã
+        x0 = (c0 * f - b0) / self.span * w
+        x1 = ((c0 + img_w * step) * f - b0) / self.span * w
+        y_top = h - (hi_row * f - r0) / self.row_span * h
+        y_bot = h - (lo_row * f - r0) / self.row_span * h
 
+        painter.drawImage(QRectF(x0, y_top, x1 - x0, y_bot - y_top), img)
 
     def update_heatmap(self, data):
         """
-        API pública para atualizar o heatmap.
+        API pública para carregar uma matriz 2D externa
+        (linhas = preço, colunas = tempo).
         """
-        self.populate(data)
-
+        matrix = np.asarray(data, dtype=np.float32)
+        if matrix.ndim != 2:
+            return
+
+        self.pyramid.clear()
+        rows = min(matrix.shape[0], self.pyramid.rows)
+        for x in range(matrix.shape[1]):
+            col = np.zeros(self.pyramid.rows, dtype=np.float32)
+            col[:rows] = matrix[:rows, x][::-1]
+            self.pyramid.push(col)
+        self.update()
+
+    def set_reducer(self, reducer: str):
+        self.reducer = "mean" if reducer.lower() == "mean" else "max"
+        self.update()
+
+    def invalidate_colors(self):
+        """
+        Força reconstrução da LUT (ex: mudança de tema).
+        """
+        self._lut = None
+        self.update()
 
     # ======================================================
     # ZOOM COM SCROLL
@@ -139,10 +488,51 @@ class HeatmapView(QGraphicsView):
     def wheelEvent(self, event):
         """
         Zoom in / out com o scroll do rato.
+        - Normal → eixo temporal
+        - Ctrl   → eixo de preço
         """
-        factor = 1.1 if event.angleDelta().y() > 0 else 0.9
-        self.scale(factor, factor)
-        super().wheelEvent(event)
+        factor = 0.85 if event.angleDelta().y() > 0 else 1 / 0.85
+
+        if event.modifiers() & Qt.ControlModifier:
+            self.row_span *= factor
+        else:
+            self.span *= factor
+
+        self._clamp()
+        self.update()
+        event.accept()
+
+    # ======================================================
+    # PAN COM DRAG
+    # ======================================================
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            # Fim da janela no início do drag (absoluto)
+            self._drag_origin = (
+                event.position(),
+                self.pyramid.count if self.anchor is None else self.anchor,
+                self.row_center,
+            )
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._drag_origin is not None:
+            pos0, end0, center0 = self._drag_origin
+            d = event.position() - pos0
+            self.anchor = end0 - d.x() / max(1, self.width()) * self.span
+            self.row_center = center0 + d.y() / max(1, self.height()) * self.row_span
+            self._clamp()
+            self.update()
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self._drag_origin = None
+        super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
+        super().mouseDoubleClickEvent(event)
 
 
 # ==========================================================
@@ -157,11 +547,14 @@ class HeatmapPanel(QWidget):
     - Visualizar concentração de ordens (DOM / depth)
     - Ajudar a identificar zonas de liquidez
 
-    Estado atual:
-    - Dados fictícios
-    - Estrutura pronta para depth real
+    Funcionamento:
+    - Mantém o book via DepthModel (snapshot + updates)
+    - Amostra o book a cada 100 ms para a pirâmide
+    - Re-ancora o eixo de preço quando o mid sai da zona central
     """
 
+    SAMPLE_INTERVAL_MS = 100
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -171,10 +564,18 @@ class HeatmapPanel(QWidget):
         # Logger local
         self._logger = logging.getLogger(__name__)
 
-        # Timer para refresh de dados dummy
-        self._refresh_timer = QTimer(self)
-        self._refresh_timer.setInterval(2000)
-        self._refresh_timer.timeout.connect(self._refresh_dummy_data)
+        # Estado do book + histórico multi-resolução
+        self._book = DepthModel()
+        self._pyramid = HeatmapPyramid()
+
+        # Eixo de preço: linha i ↔ origin + i * step
+        self._price_origin: Optional[float] = None
+        self._price_step: Optional[float] = None
+
+        # Timer de amostragem do book
+        self._sample_timer = QTimer(self)
+        self._sample_timer.setInterval(self.SAMPLE_INTERVAL_MS)
+        self._sample_timer.timeout.connect(self._sample)
 
 
         # ==================================================
@@ -192,7 +593,7 @@ class HeatmapPanel(QWidget):
         layout.addWidget(lbl)
 
         # Vista gráfica
-        self.view = HeatmapView()
+        self.view = HeatmapView(self._pyramid)
         layout.addWidget(self.view)
 
 
@@ -202,12 +603,18 @@ class HeatmapPanel(QWidget):
 
         legend = QHBoxLayout()
 
-        legend_label = QLabel("Volume Intensity (DUMMY DATA)")
+        legend_label = QLabel("Liquidity Intensity")
         legend_label.setFont(typography.inter(10))
         legend_label.setStyleSheet(f"color:{colors.MUTED};")
 
+        self.reducer_combo = QComboBox()
+        self.reducer_combo.addItems(["max", "mean"])
+        self.reducer_combo.setFont(typography.inter(10))
+        self.reducer_combo.currentTextChanged.connect(self.view.set_reducer)
+
         legend.addWidget(legend_label)
         legend.addStretch()
+        legend.addWidget(self.reducer_combo)
 
         layout.addLayout(legend)
 
@@ -217,22 +624,7 @@ class HeatmapPanel(QWidget):
         # ==================================================
 
         self._wire_engine()
-        self._refresh_timer.start()
-
-
-    # ======================================================
-    # DADOS FICTÍCIOS
-    # ======================================================
-
-    def _refresh_dummy_data(self):
-        """
-        Gera novos dados fictícios periodicamente.
-        """
-        dummy_data = [
-            [random.random() for _ in range(self.view.cols)]
-            for _ in range(self.view.rows)
-        ]
-        self.view.update_heatmap(dummy_data)
+        self._sample_timer.start()
 
 
     # ======================================================
@@ -248,8 +640,9 @@ class HeatmapPanel(QWidget):
 
         if engine:
             try:
-                engine.depth_snapshot.connect(self._on_depth)
-                engine.depth_update.connect(self._on_depth)
+                engine.depth_snapshot.connect(self._on_depth_snapshot)
+                engine.depth_update.connect(self._on_depth_update)
+                engine.symbol_changed.connect(self._on_symbol_changed)
                 self._logger.info("HeatmapPanel wired to CoreDataEngine")
             except Exception as e:
                 self._logger.warning("HeatmapPanel wire failed: %s", e)
@@ -261,15 +654,100 @@ class HeatmapPanel(QWidget):
 
 
     # ======================================================
-    # EVENT HANDLERS (FUTURO)
+    # EVENT HANDLERS
+    # ======================================================
+
+    def _on_depth_snapshot(self, evt: DepthSnapshotEvent):
+        self._book.apply_snapshot(evt.bids, evt.asks)
+
+    def _on_depth_update(self, evt: DepthUpdateEvent):
+        self._book.apply_update(evt.bids, evt.asks)
+
+    def _on_symbol_changed(self, evt: SymbolChanged):
+        """
+        Novo símbolo → histórico e eixo de preço reiniciados.
+        """
+        self._book = DepthModel()
+        self._pyramid.clear()
+        self._price_origin = None
+        self._price_step = None
+        self.view.reset_view()
+
+
+    # ======================================================
+    # AMOSTRAGEM DO BOOK
     # ======================================================
 
-    def _on_depth(self, evt):
+    def _sample(self):
+        """
+        Converte o estado atual do book numa coluna da pirâmide.
+        Custo O(níveis do book) por amostra.
+        """
+        bids, asks = self._book.bids, self._book.asks
+        if not bids or not asks:
+            return
+
+        prices = np.fromiter(
+            list(bids.keys()) + list(asks.keys()),
+            dtype=np.float64,
+        )
+        sizes = np.fromiter(
+            list(bids.values()) + list(asks.values()),
+            dtype=np.float64,
+        )
+
+        mid = (max(bids) + min(asks)) / 2
+        rows = self._pyramid.rows
+
+        if self._price_step is None:
+            self._price_step = self._nice_step(
+                (prices.max() - prices.min()) / (rows / 2)
+            )
+
+        self._recenter(mid)
+
+        idx = np.floor((prices - self._price_origin) / self._price_step).astype(np.int64)
+        mask = (idx >= 0) & (idx < rows)
+
+        column = np.bincount(idx[mask], weights=sizes[mask], minlength=rows)
+        self._pyramid.push(column[:rows])
+
+        self.view.update()
+
+    def _recenter(self, mid: float):
+        """
+        Mantém o mid na zona central do eixo de preço.
+        """
+        rows = self._pyramid.rows
+        align = self._pyramid.row_alignment
+        step = self._price_step
+
+        if self._price_origin is None:
+            origin = mid - (rows / 2) * step
+            self._price_origin = math.floor(origin / (step * align)) * step * align
+            return
+
+        mid_row = (mid - self._price_origin) / step
+        if rows / 4 <= mid_row <= rows * 3 / 4:
+            return
+
+        delta = int(round((mid_row - rows / 2) / align)) * align
+        if delta:
+            self._pyramid.shift_rows(delta)
+            self._price_origin += delta * step
+            self.view.shift_rows(delta)
+
+    @staticmethod
+    def _nice_step(raw: float) -> float:
         """
-        Handler para dados reais de depth.
-        Aqui será calculada a intensidade de liquidez.
+        Arredonda para 1 / 2 / 5 × 10^n.
         """
-        pass
+        if raw <= 0:
+            return 0.01
+        exp = math.floor(math.log10(raw))
+        base = raw / 10 ** exp
+        nice = 1 if base < 1.5 else 2 if base < 3.5 else 5 if base < 7.5 else 10
+        return nice * 10 ** exp
 
 
     # ======================================================
@@ -2,21 +2,20 @@
 # IMPORTS STANDARD
 # ==========================================================
 
-import random
 import logging
+import time
 
 # ==========================================================
 # IMPORTS NUMÉRICOS / GRÁFICOS
 # ==========================================================
 
-import numpy as np
 import pyqtgraph as pg
 
 # ==========================================================
 # IMPORTS QT
 # ==========================================================
 
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
@@ -30,7 +29,20 @@ from PySide6.QtWidgets import (
 # ==========================================================
 
 from ui.theme import colors, typography
-from core.data_engine.events import TradeEvent, CandleUpdate
+from ui.panels.chart_panel import TimeAxisItem
+from core.data_engine.events import (
+    DepthSnapshotEvent,
+    DepthUpdateEvent,
+    SymbolChanged,
+    TradeEvent,
+)
+from core.microstructure_engine import (
+    REGIME_MEAN_REVERTING,
+    REGIME_NAMES,
+    REGIME_TOXIC,
+    REGIME_TRENDING,
+    MicrostructureEngine,
+)
 
 
 # ==========================================================
@@ -45,16 +57,30 @@ class MicrostructurePanel(QWidget):
     - Visualizar métricas de order flow
     - Ajudar a identificar regime de mercado
 
-    Métricas representadas:
-    - Cumulative Delta
-    - OFI (Order Flow Imbalance)
-    - VPIN (proxy simplificada)
-
-    Estado atual:
-    - Dados fictícios (dummy)
-    - Estrutura pronta para dados reais
+    Métricas representadas (MicrostructureEngine):
+    - Cumulative Delta (lado do agressor)
+    - OFI (Order Flow Imbalance, topo do book)
+    - VPIN (buckets de volume igual)
+    - Regime de mercado
+
+    Trades e eventos de book alimentam o engine em O(1); os
+    gráficos leem as amostras por segundo dos anéis NumPy.
+
+    Desenho:
+    - curvas persistentes (uma por gráfico), atualizadas com
+      setData sobre views dos anéis (sem cópias)
+    - clipToView + autoDownsample → custo por frame limitado
+      pelos pixels, não pelas horas de histórico
+    - só redesenha quando há amostras novas e respeita um
+      orçamento de tempo por frame (DRAW_SHARE)
     """
 
+    # Tick do timer de refresh (ms)
+    FRAME_MS = 100
+
+    # Fração máxima do tempo do GUI gasta em setData
+    DRAW_SHARE = 0.2
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -64,18 +90,20 @@ class MicrostructurePanel(QWidget):
         # Logger local
         self._logger = logging.getLogger(__name__)
 
-        # Métricas internas (estado)
-        self._cum_delta = 0.0
-        self._ofi = 0.0
-        self._vpin = 50
+        # Engine de métricas (estado + anéis de amostras)
+        self.engine = MicrostructureEngine()
 
         # ==================================================
-        # TIMER DE REFRESH (dummy data)
+        # TIMER DE REFRESH
         # ==================================================
 
         self._refresh_timer = QTimer(self)
-        self._refresh_timer.setInterval(500)  # 2 Hz
-        self._refresh_timer.timeout.connect(self._refresh_dummy_data)
+        self._refresh_timer.setInterval(self.FRAME_MS)
+        self._refresh_timer.timeout.connect(self._refresh)
+
+        # Último end_seq desenhado / instante mínimo do próximo setData
+        self._drawn_seq = -1
+        self._next_draw = 0.0
 
 
         # ==================================================
@@ -90,9 +118,9 @@ class MicrostructurePanel(QWidget):
 
         header.addStretch()
 
-        # Label de regime de mercado (dummy)
-        self.regime = QLabel("Regime: TRENDING")
-        self.regime.setStyleSheet(f"color:{colors.ACCENT_GREEN};")
+        # Label de regime de mercado
+        self.regime = QLabel("Regime: —")
+        self.regime.setStyleSheet(f"color:{colors.MUTED};")
         header.addWidget(self.regime)
 
 
@@ -100,20 +128,29 @@ class MicrostructurePanel(QWidget):
         # CUMULATIVE DELTA PLOT
         # ==================================================
 
-        self.cum_delta_plot = pg.PlotWidget()
+        self.cum_delta_plot = pg.PlotWidget(
+            axisItems={"bottom": TimeAxisItem(orientation="bottom")},
+        )
         self.cum_delta_plot.showGrid(x=True, y=True, alpha=0.2)
         self.cum_delta_plot.setLabel("left", "Cumulative Delta")
         self.cum_delta_plot.getPlotItem().hideButtons()
 
+        self.cum_delta_curve = self._make_curve(self.cum_delta_plot, colors.ACCENT_BLUE)
+
 
         # ==================================================
         # OFI PLOT
         # ==================================================
 
-        self.ofi_plot = pg.PlotWidget()
+        self.ofi_plot = pg.PlotWidget(
+            axisItems={"bottom": TimeAxisItem(orientation="bottom")},
+        )
         self.ofi_plot.showGrid(x=True, y=True, alpha=0.2)
         self.ofi_plot.setLabel("left", "Order Flow Imbalance (OFI)")
         self.ofi_plot.getPlotItem().hideButtons()
+        self.ofi_plot.setXLink(self.cum_delta_plot)
+
+        self.ofi_curve = self._make_curve(self.ofi_plot, colors.ACCENT_GREEN)
 
 
         # ==================================================
@@ -122,7 +159,7 @@ class MicrostructurePanel(QWidget):
 
         self.vpin = QProgressBar()
         self.vpin.setRange(0, 100)
-        self.vpin.setValue(49)
+        self.vpin.setValue(0)
         self.vpin.setFormat(
             "VPIN (Volume-Synchronized Probability of Informed Trading) %p%"
         )
@@ -146,56 +183,101 @@ class MicrostructurePanel(QWidget):
         # INIT
         # ==================================================
 
-        self._populate()          # dados iniciais fictícios
         self._wire_engine()       # tentativa de ligação ao CoreDataEngine
         self._refresh_timer.start()
 
 
     # ======================================================
-    # POPULAÇÃO INICIAL (DUMMY)
+    # REDESENHO A PARTIR DOS ANÉIS
     # ======================================================
 
-    def _populate(self):
+    @staticmethod
+    def _make_curve(plot: pg.PlotWidget, color) -> pg.PlotDataItem:
         """
-        Preenche os gráficos com dados fictícios.
-        Usado apenas para:
-        - validar layout
-        - testar performance gráfica
+        Curva persistente: criada uma vez, alimentada por setData.
         """
-        x = np.arange(80)
+        curve = pg.PlotDataItem(pen=pg.mkPen(color, width=2))
+        plot.addItem(curve)
 
-        cum_delta = np.cumsum(np.random.normal(0, 3, size=len(x)))
-        ofi = np.cumsum(np.random.normal(0, 2, size=len(x)))
+        # Depois do addItem (o PlotItem impõe os seus modos)
+        curve.setClipToView(True)
+        curve.setDownsampling(auto=True, method="peak")
+        curve.setSkipFiniteCheck(True)
+        return curve
 
-        self.cum_delta_plot.plot(
-            x,
-            cum_delta,
-            pen=pg.mkPen(colors.ACCENT_BLUE, width=2),
-        )
+    def _populate(self, force: bool = False):
+        """
+        Passa as views dos anéis às curvas (x = ts UTC em s).
 
-        self.ofi_plot.plot(
-            x,
-            ofi,
-            pen=pg.mkPen(colors.ACCENT_GREEN, width=2),
-        )
+        Só quando há amostras novas (ou force) e fora do período
+        de espera do orçamento por frame.
+        """
+        samples = self.engine.samples
+        if not force:
+            if samples.end_seq == self._drawn_seq:
+                return
+            if time.perf_counter() < self._next_draw:
+                return
+
+        start = time.perf_counter()
+        self._drawn_seq = samples.end_seq
+
+        if not len(samples):
+            self.cum_delta_curve.setData([], [])
+            self.ofi_curve.setData([], [])
+            return
+
+        # As curvas guardam as views (sem cópia): com o anel cheio,
+        # a amostra mais antiga é o slot que o próximo append
+        # reescreve → fica de fora
+        skip = 1 if len(samples) == samples.capacity else 0
+
+        x = samples.series("ts")[skip:]
+        self.cum_delta_curve.setData(x, samples.series("cum_delta")[skip:])
+        self.ofi_curve.setData(x, samples.series("ofi")[skip:])
+
+        # Orçamento: o próximo setData espera o necessário para
+        # o desenho não passar de DRAW_SHARE do tempo
+        cost = time.perf_counter() - start
+        self._next_draw = start + cost / self.DRAW_SHARE
+
+    def _refresh(self):
+        """
+        Atualiza gráficos, VPIN e regime (timer).
+        Painel escondido (dock fechado / tab) → nada a fazer.
+        """
+        if not self.isVisible():
+            return
 
+        engine = self.engine
+        self._populate()
 
-    # ======================================================
-    # REFRESH DE DADOS FICTÍCIOS
-    # ======================================================
+        if engine.vpin is None:
+            self.vpin.setValue(0)
+            self.vpin.setFormat("VPIN: calibrating…")
+        else:
+            self.vpin.setValue(int(round(engine.vpin * 100)))
+            self.vpin.setFormat(
+                "VPIN (Volume-Synchronized Probability of Informed Trading) %p%"
+            )
 
-    def _refresh_dummy_data(self):
-        """
-        Atualiza métricas com ruído aleatório.
+        regime = engine.regime
+        color = {
+            REGIME_TRENDING: colors.ACCENT_GREEN,
+            REGIME_MEAN_REVERTING: colors.ACCENT_BLUE,
+            REGIME_TOXIC: colors.ACCENT_RED,
+        }.get(regime, colors.MUTED)
+        if engine.last_price is None:
+            self.regime.setText("Regime: —")
+        else:
+            self.regime.setText(f"Regime: {REGIME_NAMES[regime]}")
+        self.regime.setStyleSheet(f"color:{color};")
 
-        NOTA:
-        - Este método será removido quando dados reais entrarem.
-        """
-        self._cum_delta += np.random.normal(0, 3)
-        self._ofi += np.random.normal(0, 2)
-        self._vpin = max(0, min(100, self._vpin + np.random.uniform(-5, 5)))
-        self.vpin.setValue(int(self._vpin))
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Amostras que chegaram com o painel escondido
+        self._populate(force=True)
 
     # ======================================================
     # LIGAÇÃO AO CORE DATA ENGINE
@@ -212,7 +294,9 @@ class MicrostructurePanel(QWidget):
         if engine:
             try:
                 engine.trade.connect(self._on_trade)
-                engine.candle_update.connect(self._on_candle_update)
+                engine.depth_snapshot.connect(self._on_depth_snapshot)
+                engine.depth_update.connect(self._on_depth_update)
+                engine.symbol_changed.connect(self._on_symbol_changed)
                 self._logger.info("MicrostructurePanel wired to CoreDataEngine")
             except Exception as e:
                 self._logger.warning("MicrostructurePanel wire failed: %s", e)
@@ -224,26 +308,32 @@ class MicrostructurePanel(QWidget):
 
 
     # ======================================================
-    # EVENT HANDLERS (DADOS REAIS – FUTURO)
+    # EVENT HANDLERS
     # ======================================================
 
     def _on_trade(self, evt: TradeEvent):
         """
-        Handler de trades reais.
-        Aqui será calculado:
-        - delta por agressão
-        - impacto de volume
+        Delta por agressão + buckets VPIN (O(1)).
+        """
+        t = evt.trade
+        self.engine.on_trade(t.ts, t.price, t.qty, t.side == "Buy")
+
+    def _on_depth_snapshot(self, evt: DepthSnapshotEvent):
+        self.engine.on_depth_snapshot(evt.bids, evt.asks)
+
+    def _on_depth_update(self, evt: DepthUpdateEvent):
+        """
+        OFI a partir das mudanças no melhor bid/ask.
         """
-        pass
+        self.engine.on_depth_update(evt.bids, evt.asks)
 
-    def _on_candle_update(self, evt: CandleUpdate):
+    def _on_symbol_changed(self, evt: SymbolChanged):
         """
-        Handler de candles reais.
-        Aqui será calculado:
-        - OFI
-        - regime de mercado
+        Novo símbolo → métricas e anéis reiniciados.
         """
-        pass
+        self.engine.clear()
+        self._populate(force=True)
+        self._refresh()
 
 
     # ======================================================
@@ -252,8 +342,7 @@ class MicrostructurePanel(QWidget):
 
     def update_data(self, micro_data):
         """
-        Hook genérico para updates externos.
+        Hook genérico para updates externos (redesenha já).
         """
-        self.cum_delta_plot.clear()
-        self.ofi_plot.clear()
-        self._populate()
+        self._populate(force=True)
+        self._refresh()
@@ -2,10 +2,8 @@
 # IMPORTS BASE
 # ==========================================================
 
-# random → usado apenas para gerar sinais fictícios (dummy)
-import random
-
 import logging
+import time
 
 
 # ==========================================================
@@ -19,6 +17,7 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QProgressBar,
+    QPushButton,
     QTableWidget,
     QTableWidgetItem,
     QVBoxLayout,
@@ -33,6 +32,16 @@ from PySide6.QtWidgets import (
 from ui.theme import colors, typography
 
 
+# ==========================================================
+# RUNTIME DE ESTRATÉGIAS
+# ==========================================================
+
+from core.strategy.backtest_runner import BacktestRunner
+from core.strategy.base import POSITION_NAMES
+from core.strategy.builtin import BUILTIN_STRATEGIES
+from core.strategy.runtime import StrategyRuntime
+
+
 # ==========================================================
 # STRATEGY SIGNALS PANEL
 # ==========================================================
@@ -41,17 +50,20 @@ class StrategySignalsPanel(QWidget):
     """
     Painel de sinais de estratégia.
 
-    Atualmente:
-    - mostra dados fictícios (dummy)
-    - simula sinais Long / Short
-    - simula força do sinal (%)
-    - mostra métricas agregadas (PnL, Win Rate, sinais ativos)
-
-    Futuro:
-    - ligar a estratégias reais
-    - consumir sinais do Core / Strategy Engine
+    - sinais reais do StrategyRuntime (estratégias em workers
+      próprios, fora da thread da UI), recebidos em lotes
+    - força do sinal (%) por estratégia
+    - tabela de estado por estratégia: posição, eventos, CPU
+      (total e carga de um core), fila e eventos descartados
+    - backtest sobre o candle store (BacktestRunner): P&L / win
+      rate dos parâmetros ao vivo e melhor combinação da grelha
+    - métricas agregadas (P&L e Win Rate do backtest dos
+      parâmetros ao vivo, sinais ativos)
     """
 
+    # Nº máximo de sinais mantidos na tabela
+    MAX_SIGNALS = 200
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -60,13 +72,37 @@ class StrategySignalsPanel(QWidget):
 
 
         # ==================================================
-        # TIMER DE REFRESH (DUMMY)
+        # RUNTIME + ESTRATÉGIAS REGISTADAS
+        # ==================================================
+
+        self.runtime = StrategyRuntime(self)
+        for strategy_cls in BUILTIN_STRATEGIES:
+            self.runtime.register(strategy_cls())
+        self.runtime.signals_ready.connect(self._on_signals)
+
+
+        # ==================================================
+        # BACKTESTS (THREAD + PROCESS POOL)
+        # ==================================================
+
+        self.backtests = BacktestRunner(self)
+        self.backtests.result.connect(self._on_backtest_result)
+        self.backtests.progress.connect(self._on_backtest_progress)
+        self.backtests.finished.connect(self._on_backtest_finished)
+
+        # Por estratégia: resultado dos parâmetros ao vivo / melhor P&L
+        self._bt_live = {}
+        self._bt_best = {}
+        self._bt_active = False
+
+
+        # ==================================================
+        # TIMER DE ESTADO DAS ESTRATÉGIAS
         # ==================================================
 
-        # Atualiza sinais fictícios a cada 2 segundos
         self._refresh_timer = QTimer(self)
-        self._refresh_timer.setInterval(2000)
-        self._refresh_timer.timeout.connect(self._refresh_dummy_signals)
+        self._refresh_timer.setInterval(1000)
+        self._refresh_timer.timeout.connect(self._refresh_stats)
 
 
         # ==================================================
@@ -89,20 +125,26 @@ class StrategySignalsPanel(QWidget):
         header.addWidget(lbl)
         header.addStretch()
 
-        # Métricas globais (dummy)
-        self.pnl_label = QLabel("Total P&L: +$1245.50")
-        self.pnl_label.setStyleSheet(f"color:{colors.ACCENT_GREEN};")
+        # Métricas globais (backtest dos parâmetros ao vivo)
+        self.pnl_label = QLabel("Total P&L: —")
+        self.pnl_label.setStyleSheet(f"color:{colors.MUTED};")
 
-        self.win_label = QLabel("Win Rate: 68.5%")
+        self.win_label = QLabel("Win Rate: —")
         self.win_label.setStyleSheet(f"color:{colors.TEXT};")
 
-        self.active_label = QLabel("Active Signals: 2")
+        self.active_label = QLabel("Active Signals: 0")
         self.active_label.setStyleSheet(f"color:{colors.HIGHLIGHT};")
 
         for w in (self.pnl_label, self.win_label, self.active_label):
             w.setFont(typography.inter(10))
             header.addWidget(w)
 
+        self.backtest_btn = QPushButton("Backtest")
+        self.backtest_btn.setFont(typography.inter(9))
+        self.backtest_btn.setToolTip("Backtest + parameter sweep over the candle store")
+        self.backtest_btn.clicked.connect(self.run_backtests)
+        header.addWidget(self.backtest_btn)
+
         layout.addLayout(header)
 
 
@@ -110,7 +152,7 @@ class StrategySignalsPanel(QWidget):
         # TABELA DE SINAIS
         # ==================================================
 
-        self.table = QTableWidget(4, 5)
+        self.table = QTableWidget(0, 5)
         self.table.setHorizontalHeaderLabels(
             ["Time", "Type", "Strategy", "Price", "Strength"]
         )
@@ -131,51 +173,32 @@ class StrategySignalsPanel(QWidget):
             QHeaderView.Stretch,
         )
 
-        layout.addWidget(self.table)
+        layout.addWidget(self.table, stretch=3)
 
 
         # ==================================================
-        # DADOS INICIAIS (DUMMY)
+        # TABELA DE ESTADO POR ESTRATÉGIA
         # ==================================================
 
-        self.populate(self._dummy_rows())
+        self.stats_table = QTableWidget(len(self.runtime.strategies), len(self.STATS_HEADERS))
+        self.stats_table.setHorizontalHeaderLabels(self.STATS_HEADERS)
+        self.stats_table.verticalHeader().setVisible(False)
+        self.stats_table.setAlternatingRowColors(True)
+        self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
-        # Tentar ligar ao CoreDataEngine
-        self._wire_engine()
-
-        # Iniciar refresh dummy
-        self._refresh_timer.start()
+        layout.addWidget(self.stats_table, stretch=1)
 
 
-    # ======================================================
-    # DADOS FICTÍCIOS (PLACEHOLDER)
-    # ======================================================
+        # ==================================================
+        # INIT
+        # ==================================================
 
-    def _dummy_rows(self):
-        """
-        Gera sinais fictícios para UI / design / testes.
-        """
-        strategies = ["Mean Reversion", "Momentum", "Volume Spike", "Breakout"]
-        rows = []
-
-        for i in range(4):
-            rows.append(
-                {
-                    "time": f"03:{10+i:02d} PM",
-                    "type": random.choice(["Long", "Short"]),
-                    "strategy": strategies[i % len(strategies)],
-                    "price": round(42380 + random.uniform(-50, 120), 2),
-                    "strength": random.randint(60, 98),
-                }
-            )
-        return rows
+        self._refresh_stats()
 
+        # Tentar ligar ao CoreDataEngine
+        self._wire_engine()
 
-    def _refresh_dummy_signals(self):
-        """
-        Atualiza os sinais fictícios periodicamente.
-        """
-        self.populate(self._dummy_rows())
+        self._refresh_timer.start()
 
 
     # ======================================================
@@ -184,18 +207,15 @@ class StrategySignalsPanel(QWidget):
 
     def _wire_engine(self, attempts=0):
         """
-        Liga ao CoreDataEngine quando disponível.
-
-        Atualmente:
-        - apenas escuta candles
-        - não gera sinais reais
+        Liga o runtime ao CoreDataEngine quando disponível
+        (candles, trades, book, símbolo).
         """
         window = self.window()
         engine = getattr(window, "data_engine", None) if window else None
 
         if engine:
             try:
-                engine.candle_update.connect(self._on_candle)
+                self.runtime.attach(engine)
                 self._logger.info("StrategySignalsPanel wired to CoreDataEngine")
             except Exception as e:
                 self._logger.warning(
@@ -208,13 +228,181 @@ class StrategySignalsPanel(QWidget):
             )
 
 
-    def _on_candle(self, evt):
+    # ======================================================
+    # SINAIS E ESTADO DO RUNTIME
+    # ======================================================
+
+    STATS_HEADERS = [
+        "Strategy", "Position", "Events", "Signals", "CPU", "Load", "Queue", "Dropped",
+        "BT P&L", "BT Win%", "Best",
+    ]
+
+    @staticmethod
+    def _signal_row(signal) -> dict:
+        return {
+            "time": time.strftime("%H:%M:%S", time.gmtime(signal.ts / 1000)),
+            "type": signal.side,
+            "strategy": signal.strategy,
+            "price": signal.price,
+            "strength": signal.strength,
+        }
+
+    def _on_signals(self, signals):
+        """
+        Lote de StrategySignal (thread da UI): novos no topo.
+        """
+        self.table.setUpdatesEnabled(False)
+        for signal in signals:
+            self.table.insertRow(0)
+            self._set_row(0, self._signal_row(signal))
+
+        while self.table.rowCount() > self.MAX_SIGNALS:
+            self.table.removeRow(self.table.rowCount() - 1)
+        self.table.setUpdatesEnabled(True)
+
+    def _refresh_stats(self):
+        """
+        Estado por estratégia (CPU medido na thread de cada worker).
+        """
+        stats = self.runtime.stats()
+        self.stats_table.setRowCount(len(stats))
+
+        active = 0
+        for r, st in enumerate(stats):
+            active += st.position != 0
+            values = (
+                st.name,
+                POSITION_NAMES[st.position],
+                f"{st.events:,}",
+                f"{st.signals:,}",
+                f"{st.cpu_ms:,.0f} ms",
+                f"{st.load * 100:.1f}%",
+                f"{st.queued:,}",
+                f"{st.dropped:,}",
+                *self._backtest_cells(st.name),
+            )
+            for c, value in enumerate(values):
+                item = self.stats_table.item(r, c)
+                if item is None:
+                    item = QTableWidgetItem()
+                    item.setFont(typography.inter(10))
+                    item.setTextAlignment(Qt.AlignCenter)
+                    self.stats_table.setItem(r, c, item)
+                item.setText(value)
+
+            position_item = self.stats_table.item(r, 1)
+            position_item.setForeground(QColor(
+                colors.ACCENT_GREEN if st.position > 0
+                else colors.ACCENT_RED if st.position < 0
+                else colors.MUTED
+            ))
+
+            live = self._bt_live.get(st.name)
+            self.stats_table.item(r, 8).setForeground(QColor(
+                colors.MUTED if live is None
+                else colors.ACCENT_GREEN if live.pnl >= 0
+                else colors.ACCENT_RED
+            ))
+
+        self.active_label.setText(f"Active Signals: {active}")
+
+
+    # ======================================================
+    # SHUTDOWN
+    # ======================================================
+
+    def shutdown(self):
+        """
+        Para o processo das estratégias e os backtests em curso
+        (chamado pelo MainWindow ao fechar).
+        """
+        self._refresh_timer.stop()
+        self._bt_active = False
+        self.backtests.cancel()
+        self.runtime.stop()
+
+
+    # ======================================================
+    # BACKTESTS
+    # ======================================================
+
+    def run_backtests(self):
+        """
+        Backtest das estratégias do runtime no símbolo / timeframe
+        ativos; um segundo clique cancela.
+        """
+        if self._bt_active:
+            self._bt_active = False
+            self.backtests.cancel()
+            self.backtest_btn.setText("Backtest")
+            return
+
+        symbol = self.runtime.symbol
+        if not symbol:
+            return
+
+        self._bt_live.clear()
+        self._bt_best.clear()
+        self._bt_active = True
+        self.backtest_btn.setText("Cancel")
+        self.backtests.request(symbol, self.runtime.timeframe, self.runtime.strategies)
+        self._logger.info("Backtests requested for %s %s", symbol, self.runtime.timeframe)
+
+    def _backtest_cells(self, name: str):
+        live = self._bt_live.get(name)
+        best = self._bt_best.get(name)
+        if live is None:
+            return ("—", "—", "—")
+        return (
+            f"{live.pnl:+,.2f}",
+            f"{live.win_rate * 100:.1f}%",
+            ", ".join(f"{k}={v:g}" for k, v in best.params.items()) if best else "—",
+        )
+
+    def _on_backtest_result(self, result):
+        """
+        Um resultado do sweep (thread da UI).
         """
-        Futuro:
-        - processar candles reais
-        - gerar sinais de estratégia
+        if not self._bt_active:
+            return
+        live_params = {s.name: s.params for s in self.runtime.strategies}
+        if result.strategy not in self._bt_live and result.params == live_params.get(result.strategy):
+            self._bt_live[result.strategy] = result
+            self._refresh_summary()
+
+        best = self._bt_best.get(result.strategy)
+        if best is None or result.pnl > best.pnl:
+            self._bt_best[result.strategy] = result
+
+    def _on_backtest_progress(self, done: int, total: int):
+        if not self._bt_active:
+            return
+        self.backtest_btn.setText(f"Cancel ({done * 100 // max(total, 1)}%)")
+
+    def _on_backtest_finished(self, message: str):
+        self._bt_active = False
+        self.backtest_btn.setText("Backtest")
+        self.backtest_btn.setToolTip(message)
+        self._refresh_stats()
+        self._logger.info("Backtests finished: %s", message)
+
+    def _refresh_summary(self):
         """
-        pass
+        Header: P&L somado e win rate (trades ganhos / trades) do
+        backtest dos parâmetros ao vivo.
+        """
+        results = list(self._bt_live.values())
+        pnl = sum(r.pnl for r in results)
+        trades = sum(r.trades for r in results)
+        wins = sum(r.wins for r in results)
+
+        self.pnl_label.setText(f"Total P&L: {'+' if pnl >= 0 else '-'}${abs(pnl):,.2f}")
+        self.pnl_label.setStyleSheet(
+            f"color:{colors.ACCENT_GREEN if pnl >= 0 else colors.ACCENT_RED};"
+        )
+        self.win_label.setText(
+            f"Win Rate: {wins / trades * 100:.1f}%" if trades else "Win Rate: —"
+        )
 
 
     # ======================================================
@@ -228,57 +416,57 @@ class StrategySignalsPanel(QWidget):
         self.table.setRowCount(len(rows))
 
         for r, row in enumerate(rows):
-            # Itens de texto
-            time_item = QTableWidgetItem(row["time"])
-            type_item = QTableWidgetItem(row["type"])
-            strat_item = QTableWidgetItem(row["strategy"])
-            price_item = QTableWidgetItem(f"{row['price']:.2f}")
-
-            for item in [time_item, type_item, strat_item, price_item]:
-                item.setFont(typography.inter(10))
-                item.setTextAlignment(Qt.AlignCenter)
-
-            # Cor conforme tipo do sinal
-            type_item.setForeground(
-                QColor(
-                    colors.ACCENT_GREEN
-                    if row["type"] == "Long"
-                    else colors.ACCENT_RED
-                )
-            )
+            self._set_row(r, row)
 
-            price_item.setForeground(QColor(colors.TEXT))
-
-            # Inserir itens na tabela
-            self.table.setItem(r, 0, time_item)
-            self.table.setItem(r, 1, type_item)
-            self.table.setItem(r, 2, strat_item)
-            self.table.setItem(r, 3, price_item)
-
-            # Barra de força do sinal
-            bar = QProgressBar()
-            bar.setRange(0, 100)
-            bar.setValue(row["strength"])
-            bar.setTextVisible(True)
-            bar.setFormat(f"{row['strength']}%")
-
-            bar.setStyleSheet(
-                f"""
-                QProgressBar::chunk {{
-                    background: {
-                        colors.ACCENT_GREEN
-                        if row['type'] == 'Long'
-                        else colors.ACCENT_RED
-                    };
-                }}
-                """
-            )
+    def _set_row(self, r: int, row: dict):
+        """
+        Preenche a linha r (itens + barra de força).
+        """
+        # Itens de texto
+        time_item = QTableWidgetItem(row["time"])
+        type_item = QTableWidgetItem(row["type"])
+        strat_item = QTableWidgetItem(row["strategy"])
+        price_item = QTableWidgetItem(f"{row['price']:.2f}")
+
+        for item in [time_item, type_item, strat_item, price_item]:
+            item.setFont(typography.inter(10))
+            item.setTextAlignment(Qt.AlignCenter)
+
+        # Cor conforme tipo do sinal
+        side_color = {
+            "Long": colors.ACCENT_GREEN,
+            "Short": colors.ACCENT_RED,
+        }.get(row["type"], colors.MUTED)
+        type_item.setForeground(QColor(side_color))
+
+        price_item.setForeground(QColor(colors.TEXT))
+
+        # Inserir itens na tabela
+        self.table.setItem(r, 0, time_item)
+        self.table.setItem(r, 1, type_item)
+        self.table.setItem(r, 2, strat_item)
+        self.table.setItem(r, 3, price_item)
+
+        # Barra de força do sinal
+        bar = QProgressBar()
+        bar.setRange(0, 100)
+        bar.setValue(row["strength"])
+        bar.setTextVisible(True)
+        bar.setFormat(f"{row['strength']}%")
+
+        bar.setStyleSheet(
+            f"""
+            QProgressBar::chunk {{
+                background: {side_color};
+            }}
+            """
+        )
 
-            self.table.setCellWidget(r, 4, bar)
+        self.table.setCellWidget(r, 4, bar)
 
 
     def update_data(self, rows):
         """
-        Hook genérico para dados externos (futuro).
+        Hook genérico para dados externos (lista de linhas).
         """
         self.populate(rows)
@@ -16,15 +16,15 @@ import time
 # IMPORTS QT
 # ==========================================================
 
-from PySide6.QtCore import Qt, QTimer, QSettings
-from PySide6.QtGui import QColor, QFont
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, QSettings
+from PySide6.QtGui import QBrush, QColor, QFont
 from PySide6.QtWidgets import (
     QCheckBox,
     QHBoxLayout,
     QLabel,
     QHeaderView,
-    QTableWidget,
-    QTableWidgetItem,
+    QPushButton,
+    QTableView,
     QVBoxLayout,
     QWidget,
 )
@@ -36,6 +36,211 @@ from PySide6.QtWidgets import (
 
 from ui.theme import colors, typography
 from core.data_engine.models import Trade
+from core.tape_flags import TapeFlagDetector, flags_to_mask
+from core.tape_history import SIDE_BUY, SIDE_SELL, TradeHistory
+
+import numpy as np
+
+
+# ==========================================================
+# TAPE MODEL — RING BUFFER DE LINHAS
+# ==========================================================
+
+class TapeTableModel(QAbstractTableModel):
+    """
+    Modelo da tabela do tape sobre um ring buffer de capacidade fixa.
+
+    - linha 0 = trade mais recente
+    - linhas "live" (buckets de acumulação em curso) ficam no topo
+    - cada flush = 1 beginInsertRows (+ 1 beginRemoveRows se o
+      buffer transborda); nada é recriado por linha
+    - fonts / brushes / alinhamentos criados uma vez e devolvidos
+      pelo data(); a view só pede as células visíveis
+    """
+
+    HEADERS = ("Time", "Price", "Size", "Side", "Flags")
+
+    # Roles em cache: cada acesso a Qt.<Role> custa µs e o data()
+    # é chamado por célula visível e por role em cada repaint
+    _DISPLAY = Qt.DisplayRole
+    _FOREGROUND = Qt.ForegroundRole
+    _FONT = Qt.FontRole
+    _ALIGNMENT = Qt.TextAlignmentRole
+
+    def __init__(self, capacity: int = 2000, parent=None):
+        super().__init__(parent)
+
+        self._ring: list = [None] * max(1, capacity)
+        self._head = 0      # próximo slot a escrever
+        self._count = 0
+        self._live: list[dict] = []
+
+        self._font = typography.mono(10)
+        self._bold = typography.mono(10)
+        self._bold.setBold(True)
+
+        self._align_right = int(Qt.AlignRight | Qt.AlignVCenter)
+        self._align_center = int(Qt.AlignCenter)
+
+        self.refresh_colors()
+
+    def refresh_colors(self):
+        self._brushes = {
+            "Buy": QBrush(QColor(colors.ACCENT_GREEN)),
+            "Sell": QBrush(QColor(colors.ACCENT_RED)),
+        }
+        self._muted = QBrush(QColor(colors.MUTED))
+
+    # --------------------------
+    # ACESSO
+    # --------------------------
+
+    @property
+    def capacity(self) -> int:
+        return len(self._ring)
+
+    def row_at(self, r: int) -> dict:
+        live = self._live
+        if r < len(live):
+            return live[r]
+        r -= len(live)
+        return self._ring[(self._head - 1 - r) % len(self._ring)]
+
+    def rows(self) -> list[dict]:
+        """
+        Linhas do buffer (sem as live), da mais antiga para a mais recente.
+        """
+        cap = len(self._ring)
+        return [self._ring[(self._head - self._count + i) % cap] for i in range(self._count)]
+
+    # --------------------------
+    # ALTERAÇÕES
+    # --------------------------
+
+    def add_rows(self, rows: list[dict]):
+        """
+        Acrescenta linhas (ordem cronológica) no topo do buffer.
+        """
+        if not rows:
+            return
+
+        cap = len(self._ring)
+        rows = rows[-cap:]
+        k = len(rows)
+        top = len(self._live)
+
+        # Linhas mais antigas saem pelo fundo
+        overflow = self._count + k - cap
+        if overflow > 0:
+            end = top + self._count - 1
+            self.beginRemoveRows(QModelIndex(), end - overflow + 1, end)
+            self._count -= overflow
+            self.endRemoveRows()
+
+        self.beginInsertRows(QModelIndex(), top, top + k - 1)
+        head = self._head
+        for row in rows:
+            self._ring[head] = row
+            head = (head + 1) % cap
+        self._head = head
+        self._count += k
+        self.endInsertRows()
+
+    def set_live(self, rows: list[dict]):
+        """
+        Substitui as linhas live do topo.
+        """
+        old, new = len(self._live), len(rows)
+        if not old and not new:
+            return
+
+        if new > old:
+            self.beginInsertRows(QModelIndex(), old, new - 1)
+            self._live = rows
+            self.endInsertRows()
+        elif new < old:
+            self.beginRemoveRows(QModelIndex(), new, old - 1)
+            self._live = rows
+            self.endRemoveRows()
+        else:
+            self._live = rows
+
+        common = min(old, new)
+        if common:
+            self.dataChanged.emit(self.index(0, 0), self.index(common - 1, len(self.HEADERS) - 1))
+
+    def set_capacity(self, capacity: int):
+        capacity = max(1, capacity)
+        if capacity == len(self._ring):
+            return
+
+        self.beginResetModel()
+        rows = self.rows()[-capacity:]
+        self._ring = rows + [None] * (capacity - len(rows))
+        self._count = len(rows)
+        self._head = self._count % capacity
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self._ring = [None] * len(self._ring)
+        self._head = 0
+        self._count = 0
+        self._live = []
+        self.endResetModel()
+
+    def reformat(self, format_size):
+        """
+        Recalcula a coluna Size (mudança do modo de tamanho).
+        """
+        for row in self.rows() + self._live:
+            row["size"] = format_size(row["qty"], row["notional"])
+        n = self.rowCount()
+        if n:
+            self.dataChanged.emit(self.index(0, 2), self.index(n - 1, 2))
+
+    # --------------------------
+    # QAbstractTableModel
+    # --------------------------
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._live) + self._count
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == self._DISPLAY and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        col = index.column()
+
+        if role == self._DISPLAY:
+            row = self.row_at(index.row())
+            if col == 0:
+                return row["time"]
+            if col == 1:
+                return f"{row['price']:.2f}"
+            if col == 2:
+                return row["size"]
+            if col == 3:
+                return row["side"]
+            return row["flags"]
+
+        if role == self._FOREGROUND:
+            if col in (1, 3):
+                return self._brushes.get(self.row_at(index.row())["side"], self._muted)
+            return None
+
+        if role == self._FONT:
+            return self._bold if col == 2 else self._font
+
+        if role == self._ALIGNMENT:
+            return self._align_center if col in (0, 3) else self._align_right
+
+        return None
 
 
 # ==========================================================
@@ -60,8 +265,13 @@ class TapePanel(QWidget):
     - Filtros:
         • Aggressive Only
         • Block trades only
+    - Tabela model/view (TapeTableModel): ring buffer de
+      `max_rows` linhas, 1 inserção por flush
     """
 
+    # Limite de segurança da fila (além disto descartam-se linhas, nunca flags)
+    MAX_PENDING = 100_000
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -73,17 +283,21 @@ class TapePanel(QWidget):
         # BUFFERS INTERNOS
         # ==================================================
 
-        # Trades já renderizadas (linhas da tabela)
-        self._trades: deque[dict] = deque(maxlen=120)
-
         # Buckets vivos para acumulação temporal
         self._live_buckets: dict[str, dict] = {}
 
-        # Trades recebidas mas ainda não processadas
-        self._pending: deque[Trade] = deque(maxlen=500)
+        # Trades recebidas mas ainda não mostradas: (trade, notional, flags)
+        # As flags são derivadas à chegada → veem todas as trades
+        self._pending: deque[tuple] = deque(maxlen=self.MAX_PENDING)
+
+        # Contabilidade do atraso (backlog / lag / linhas descartadas)
+        self._dropped = 0
+        self._last_rx_ts = 0
+        self._last_shown_ts = 0
+        self._aggregating = False
 
-        # Trades recentes usados para derivar flags
-        self._recent_for_flags: deque[Trade] = deque(maxlen=400)
+        # Janelas deslizantes para derivar flags (O(1) por trade)
+        self._flag_detector = TapeFlagDetector()
 
 
         # ==================================================
@@ -92,6 +306,15 @@ class TapePanel(QWidget):
 
         self._settings = QSettings("OmniFlow", "TapePanel")
         self._load_settings()
+        self._configure_flags()
+
+        # Trades já renderizadas (linhas da tabela, ring buffer)
+        self.model = TapeTableModel(self._max_rows, self)
+
+        # Histórico profundo pesquisável (colunas NumPy) + lote por escrever
+        self.history = TradeHistory(self._history_trades)
+        self._history_batch: list[tuple] = []
+        self._history_dialog = None
 
 
         # ==================================================
@@ -120,6 +343,18 @@ class TapePanel(QWidget):
         header.addWidget(lbl)
         header.addStretch()
 
+        # Atraso do tape (só visível com backlog / agregação / descartes)
+        self.backlog_label = QLabel("")
+        self.backlog_label.setFont(typography.mono(9))
+        self.backlog_label.setStyleSheet(f"color: {colors.MUTED};")
+        self.backlog_label.setVisible(False)
+        header.addWidget(self.backlog_label)
+
+        history_btn = QPushButton("History")
+        history_btn.setFont(typography.inter(9))
+        history_btn.clicked.connect(self.open_history)
+        header.addWidget(history_btn)
+
         # Checkboxes ocultos (controlados via SettingsDialog)
         self.aggr_only = QCheckBox("Aggressive Only")
         self.blocks_only = QCheckBox("Block Trades")
@@ -133,16 +368,17 @@ class TapePanel(QWidget):
         # TABELA DE TRADES
         # ==================================================
 
-        self.table = QTableWidget(12, 5)
-        self.table.setHorizontalHeaderLabels(
-            ["Time", "Price", "Size", "Side", "Flags"]
-        )
+        self.table = QTableView()
+        self.table.setModel(self.model)
 
         header_view = self.table.horizontalHeader()
         header_view.setStretchLastSection(False)
         header_view.setSectionResizeMode(QHeaderView.Interactive)
         header_view.setMinimumSectionSize(60)
 
+        # ResizeToContents só mede as linhas visíveis (não o buffer todo)
+        header_view.setResizeContentsPrecision(0)
+
         # Larguras / comportamentos por coluna
         header_view.resizeSection(0, 110)                     # Time
         header_view.setSectionResizeMode(1, QHeaderView.ResizeToContents)  # Price
@@ -150,7 +386,11 @@ class TapePanel(QWidget):
         header_view.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # Side
         header_view.setSectionResizeMode(4, QHeaderView.Stretch)           # Flags
 
-        self.table.verticalHeader().setVisible(False)
+        vertical = self.table.verticalHeader()
+        vertical.setVisible(False)
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.setDefaultSectionSize(vertical.fontMetrics().height() + 6)
+
         self.table.setAlternatingRowColors(True)
         self.table.setShowGrid(False)
         self.table.setSortingEnabled(False)
@@ -159,8 +399,8 @@ class TapePanel(QWidget):
         # Estilo hover / seleção
         self.table.setStyleSheet(
             """
-            QTableWidget::item:selected { background-color: rgba(80,120,200,80); }
-            QTableWidget::item:hover { background-color: rgba(255,255,255,25); }
+            QTableView::item:selected { background-color: rgba(80,120,200,80); }
+            QTableView::item:hover { background-color: rgba(255,255,255,25); }
             """
         )
 
@@ -186,6 +426,15 @@ class TapePanel(QWidget):
 
         self._acc_interval_ms = int(self._settings.value("accumulation_interval_ms", 0))
 
+        # Linhas guardadas na tabela (ring buffer do modelo)
+        self._max_rows = int(self._settings.value("max_rows", 2000))
+
+        # Backlog a partir do qual o tape passa a prints agregados
+        self._burst_threshold = int(self._settings.value("burst_threshold", 500))
+
+        # Trades guardadas no histórico pesquisável
+        self._history_trades = int(self._settings.value("history_trades", 1_000_000))
+
         # Iceberg
         self._iceberg_window_ms = int(self._settings.value("iceberg_window_ms", 400))
         self._iceberg_count = int(self._settings.value("iceberg_count", 5))
@@ -201,14 +450,41 @@ class TapePanel(QWidget):
         self._absorb_volume = float(self._settings.value("absorb_volume", 20_000.0))
 
 
+    def _configure_flags(self):
+        self._flag_detector.configure(
+            block_threshold=self._block_threshold,
+            iceberg_window_ms=self._iceberg_window_ms,
+            iceberg_count=self._iceberg_count,
+            sweep_window_ms=self._sweep_window_ms,
+            sweep_price_levels=self._sweep_price_levels,
+            sweep_min_notional=self._sweep_min_notional,
+            sweep_min_price_diff=self._sweep_min_price_diff,
+            absorb_window_ms=self._absorb_window_ms,
+            absorb_volume=self._absorb_volume,
+        )
+
+
     def reload_settings(self):
         """
         Chamado quando o SettingsDialog é aceite
         """
         self._load_settings()
+        self._configure_flags()
         self.aggr_only.setChecked(self._aggr_only_enabled)
         self.blocks_only.setChecked(self._blocks_only_enabled)
-        self.populate(list(self._trades))
+
+        self.model.set_capacity(self._max_rows)
+        self.model.reformat(self._format_size)
+
+        # Acumulação desligada → buckets em curso deixam de ser live
+        if self._acc_interval_ms <= 0 and self._live_buckets:
+            finalized: list[dict] = []
+            for live in self._live_buckets.values():
+                self._finalize_bucket(live, finalized)
+            self._live_buckets.clear()
+            finalized.sort(key=lambda r: r["ts"])
+            self.model.set_live([])
+            self.model.add_rows(finalized)
 
 
     # ======================================================
@@ -218,9 +494,24 @@ class TapePanel(QWidget):
     def on_trade(self, trade: Trade):
         """
         Recebe trades do CoreDataEngine.
-        Apenas coloca na fila para não bloquear a UI.
+
+        Deriva as flags já aqui (O(1) por trade, sobre o stream
+        completo) e coloca na fila; a tabela é atualizada no flush.
         """
-        self._pending.append(trade)
+        notional = trade.price * trade.qty
+        flags = self._derive_flags(trade, notional)
+
+        if len(self._pending) == self.MAX_PENDING:
+            self._dropped += 1
+
+        self._pending.append((trade, notional, flags))
+        self._last_rx_ts = max(self._last_rx_ts, trade.ts)
+
+        # Histórico: todas as trades (escritas em bloco no flush)
+        self._history_batch.append(
+            (trade.ts, trade.price, trade.qty,
+             SIDE_BUY if trade.side == "Buy" else SIDE_SELL, flags_to_mask(flags))
+        )
 
 
     # ======================================================
@@ -231,49 +522,54 @@ class TapePanel(QWidget):
         """
         Processa trades pendentes em batches pequenos
         para manter a UI fluida.
+
+        Em burst (backlog > burst_threshold): sem acumulação,
+        trades do mesmo ms / lado / preço passam a uma linha
+        agregada (orçamento de tempo por frame, não de linhas);
+        com acumulação os buckets já limitam o nº de linhas.
         """
+        self._flush_history()
+
         if not self._pending:
+            if self._aggregating:
+                self._aggregating = False
+                self._update_backlog_label()
+            return
+
+        use_acc = self._acc_interval_ms > 0
+        self._aggregating = len(self._pending) > self._burst_threshold
+
+        if self._aggregating and not use_acc:
+            self.model.add_rows(self._aggregate_pending())
+            self.model.set_live([])
+            self._update_backlog_label()
             return
 
-        max_batch = 100          # limite por frame
-        time_budget = 0.01       # ~10ms
+        # Burst com acumulação → sem limite por frame
+        max_batch = len(self._pending) if self._aggregating else 100
+        time_budget = None if self._aggregating else 0.01   # ~10ms
         start = time.perf_counter()
 
         new_rows: list[dict] = []
         finalized: list[dict] = []
         live_rows: list[dict] = []
 
-        use_acc = self._acc_interval_ms > 0
         processed = 0
 
         while self._pending and processed < max_batch:
-            trade = self._pending.popleft()
+            trade, notional, flags = self._pending.popleft()
             processed += 1
-
-            # Timestamp formatado
-            ts = datetime.utcfromtimestamp(trade.ts / 1000)
-            formatted = ts.strftime("%H:%M:%S.%f")[:-3]
-
-            notional = trade.price * trade.qty
-
-            # Derivar flags
-            flags = self._derive_flags(trade, notional)
-
-            # Guardar trade para heurísticas futuras
-            self._recent_for_flags.append(trade)
+            self._last_shown_ts = max(self._last_shown_ts, trade.ts)
 
             # Filtros
-            if (self.blocks_only.isChecked() or self._blocks_only_enabled) and "Block" not in flags:
-                continue
-
-            if (self.aggr_only.isChecked() or self._aggr_only_enabled) and notional < self._min_notional_filter:
+            if not self._passes_filters(notional, flags):
                 continue
 
             # Sem acumulação → linha direta
             if not use_acc:
                 new_rows.append(
                     self._make_row(
-                        formatted,
+                        self._format_ts(trade.ts),
                         trade.ts,
                         trade.price,
                         trade.qty,
@@ -312,83 +608,151 @@ class TapePanel(QWidget):
 
                 self._live_buckets[trade.side] = live
 
-            if time.perf_counter() - start >= time_budget:
+            if time_budget is not None and time.perf_counter() - start >= time_budget:
                 break
 
-        # ==================================================
-        # ATUALIZAÇÃO DA TABELA
-        # ==================================================
-
+        # Modelo: 1 inserção por flush (linhas em ordem cronológica)
         if use_acc:
-            for side, live in list(self._live_buckets.items()):
+            for live in sorted(self._live_buckets.values(), key=lambda b: b["ts"], reverse=True):
                 live_rows.append(self._make_row_from_bucket(live, live=True))
 
-            finalized.sort(key=lambda r: r["ts"], reverse=True)
-            for row in finalized:
-                self._trades.appendleft(row)
-
-            display_rows = live_rows + list(self._trades)
+            finalized.sort(key=lambda r: r["ts"])
+            self.model.add_rows(finalized)
+            self.model.set_live(live_rows)
 
         else:
-            new_rows.sort(key=lambda r: r["ts"], reverse=True)
-            for row in new_rows:
-                self._trades.appendleft(row)
+            new_rows.sort(key=lambda r: r["ts"])
+            self.model.add_rows(new_rows)
+            self.model.set_live([])
 
-            display_rows = list(self._trades)
+        self._update_backlog_label()
 
-        self.populate(display_rows)
 
+    def _flush_history(self):
+        """
+        Lote de trades recebidas → colunas do histórico (1 escrita).
+        """
+        if not self._history_batch:
+            return
+
+        ts, price, qty, side, flags = zip(*self._history_batch)
+        self._history_batch.clear()
+        self.history.extend(
+            np.array(ts, dtype=np.int64),
+            np.array(price),
+            np.array(qty),
+            np.array(side, dtype=np.int8),
+            np.array(flags, dtype=np.uint8),
+        )
 
-    # ======================================================
-    # RENDERIZAÇÃO
-    # ======================================================
 
-    def populate(self, rows: list[dict]):
+    def _aggregate_pending(self, time_budget: float = 0.015) -> list[dict]:
         """
-        Renderiza as linhas na tabela
+        Drena a fila (até time_budget s) em prints agregados
+        por (ms, lado, preço).
         """
-        self.table.setUpdatesEnabled(False)
-        self.table.setRowCount(len(rows))
+        groups: dict = {}
+
+        pending = self._pending
+        blocks_only = self.blocks_only.isChecked() or self._blocks_only_enabled
+        min_notional = (
+            self._min_notional_filter
+            if self.aggr_only.isChecked() or self._aggr_only_enabled
+            else None
+        )
+
+        deadline = time.perf_counter() + time_budget
+        last_ts = self._last_shown_ts
+
+        while pending:
+            # Verificar o relógio em blocos (perf_counter por trade pesa)
+            for _ in range(min(256, len(pending))):
+                trade, notional, flags = pending.popleft()
+                if trade.ts > last_ts:
+                    last_ts = trade.ts
+
+                if blocks_only and "Block" not in flags:
+                    continue
+                if min_notional is not None and notional < min_notional:
+                    continue
+
+                key = (trade.ts, trade.side, trade.price)
+                group = groups.get(key)
+                if group is None:
+                    groups[key] = [trade.qty, notional, set(flags), 1]
+                else:
+                    group[0] += trade.qty
+                    group[1] += notional
+                    if flags:
+                        group[2].update(flags)
+                    group[3] += 1
+
+            if time.perf_counter() >= deadline:
+                break
 
-        for r, row in enumerate(rows):
-            # Criação de itens
-            time_item = QTableWidgetItem(row["time"])
-            price_item = QTableWidgetItem(f"{row['price']:.2f}")
-            size_item = QTableWidgetItem(str(row["size"]))
-            side_item = QTableWidgetItem(row["side"])
-            flags_item = QTableWidgetItem(row.get("flags", ""))
+        self._last_shown_ts = last_ts
 
-            # Cor por lado
-            side_color = (
-                colors.ACCENT_GREEN if row["side"] == "Buy"
-                else colors.ACCENT_RED if row["side"] == "Sell"
-                else colors.MUTED
+        rows = []
+        for (ts, side, price), (qty, notional, flags, count) in groups.items():
+            row = self._make_row(
+                self._format_ts(ts), ts, price, qty, notional, side, sorted(flags),
             )
+            if count > 1:
+                row["flags"] = f"×{count}" + (f" {row['flags']}" if row["flags"] else "")
+            rows.append(row)
 
-            price_item.setForeground(QColor(side_color))
-            side_item.setForeground(QColor(side_color))
+        rows.sort(key=lambda r: r["ts"])
+        return rows
 
-            for item in [time_item, price_item, size_item, side_item, flags_item]:
-                item.setFont(typography.mono(10))
-                item.setTextAlignment(
-                    Qt.AlignRight | Qt.AlignVCenter
-                    if item in (price_item, size_item, flags_item)
-                    else Qt.AlignCenter
-                )
 
-            # Size em bold
-            f = size_item.font()
-            f.setBold(True)
-            size_item.setFont(f)
+    def _passes_filters(self, notional: float, flags: list[str]) -> bool:
+        if (self.blocks_only.isChecked() or self._blocks_only_enabled) and "Block" not in flags:
+            return False
 
-            # Inserir na tabela
-            self.table.setItem(r, 0, time_item)
-            self.table.setItem(r, 1, price_item)
-            self.table.setItem(r, 2, size_item)
-            self.table.setItem(r, 3, side_item)
-            self.table.setItem(r, 4, flags_item)
+        if (self.aggr_only.isChecked() or self._aggr_only_enabled) and notional < self._min_notional_filter:
+            return False
 
-        self.table.setUpdatesEnabled(True)
+        return True
+
+
+    def _update_backlog_label(self):
+        """
+        Quanto o tape está atrasado face ao stream.
+        """
+        backlog = len(self._pending)
+        parts = []
+
+        if backlog:
+            lag_s = max(0, self._last_rx_ts - self._last_shown_ts) / 1000
+            parts.append(f"behind {backlog:,} ({lag_s:.1f}s)")
+        if self._aggregating:
+            parts.append("aggregated")
+        if self._dropped:
+            parts.append(f"dropped {self._dropped:,}")
+
+        self.backlog_label.setText(" · ".join(parts))
+        self.backlog_label.setVisible(bool(parts))
+
+
+    # ======================================================
+    # HISTÓRICO PESQUISÁVEL
+    # ======================================================
+
+    def open_history(self):
+        """
+        Abre (ou traz para a frente) o diálogo de pesquisa no histórico.
+        """
+        # Import local: o diálogo reutiliza o TapeTableModel deste módulo
+        from ui.tape_history_dialog import TapeHistoryDialog
+
+        self._flush_history()
+
+        if self._history_dialog is None:
+            self._history_dialog = TapeHistoryDialog(self.history, self._format_size, self)
+
+        self._history_dialog.show()
+        self._history_dialog.raise_()
+        self._history_dialog.activateWindow()
 
 
     # ======================================================
@@ -402,53 +766,84 @@ class TapePanel(QWidget):
         - Iceberg
         - Sweep
         - Absorption
-        """
-        if not self._flags_enabled:
-            return []
 
-        flags: list[str] = []
-
-        # Block
-        if notional >= self._block_threshold:
-            flags.append("Block")
+        Janelas deslizantes incrementais (TapeFlagDetector): as
+        janelas são mantidas mesmo com as flags desligadas.
+        """
+        return self._flag_detector.update(
+            trade.ts, trade.price, notional, evaluate=self._flags_enabled
+        )
 
-        now_ms = trade.ts
 
-        # Iceberg
-        recent = [t for t in self._recent_for_flags if now_ms - t.ts <= self._iceberg_window_ms]
-        same_price = [t for t in recent if abs(t.price - trade.price) < 1e-6]
-        if len(same_price) >= self._iceberg_count and notional < self._block_threshold * 0.05:
-            flags.append("Iceberg")
+    # ======================================================
+    # LINHAS
+    # ======================================================
 
-        # Sweep
-        recent_sweep = [t for t in self._recent_for_flags if now_ms - t.ts <= self._sweep_window_ms]
-        prices = [t.price for t in recent_sweep]
-        if prices:
-            price_range = max(prices) - min(prices)
-            unique_prices = {round(p, 2) for p in prices}
-            sweep_notional = sum(t.price * t.qty for t in recent_sweep)
-            if (
-                len(unique_prices) >= self._sweep_price_levels
-                and price_range >= self._sweep_min_price_diff
-                and sweep_notional >= self._sweep_min_notional
-            ):
-                flags.append("Sweep")
+    def _make_row(
+        self,
+        formatted: str,
+        ts: int,
+        price: float,
+        qty: float,
+        notional: float,
+        side: str,
+        flags,
+    ) -> dict:
+        """
+        Linha da tabela para uma trade (ou bucket)
+        """
+        return {
+            "time": formatted,
+            "ts": ts,
+            "price": price,
+            "qty": qty,
+            "notional": notional,
+            "size": self._format_size(qty, notional),
+            "side": side,
+            "flags": ", ".join(flags),
+        }
+
+
+    def _make_row_from_bucket(self, bucket: dict, live: bool = False) -> dict:
+        """
+        Linha de um bucket de acumulação (preço = VWAP do bucket)
+        """
+        qty = bucket["qty"]
+        price = bucket["vw_sum"] / qty if qty > 0 else 0.0
+
+        row = self._make_row(
+            self._format_ts(bucket["ts"]),
+            bucket["ts"],
+            price,
+            qty,
+            bucket["notional"],
+            bucket["side"],
+            sorted(bucket["flags"]),
+        )
+        row["live"] = live
+        return row
 
-        # Absorption
-        absorb_recent = [
-            t for t in self._recent_for_flags
-            if now_ms - t.ts <= self._absorb_window_ms and abs(t.price - trade.price) < 1e-6
-        ]
-        if sum(t.price * t.qty for t in absorb_recent) >= self._absorb_volume:
-            flags.append("Absorb")
 
-        return flags
+    def _finalize_bucket(self, bucket: dict, finalized: list[dict]):
+        """
+        Bucket terminado → linha definitiva
+        """
+        if bucket["qty"] > 0:
+            finalized.append(self._make_row_from_bucket(bucket))
 
 
     # ======================================================
     # HELPERS
     # ======================================================
 
+    def _format_ts(self, ts_ms: int) -> str:
+        """
+        HH:MM:SS.mmm (UTC)
+        """
+        ts = datetime.utcfromtimestamp(ts_ms / 1000)
+        return ts.strftime("%H:%M:%S.%f")[:-3]
+
+
     def _format_size(self, base_qty: float, notional: float) -> str:
         """
         Formata o tamanho conforme o modo selecionado
@@ -3,35 +3,31 @@
 # ==========================================================
 
 import logging
-
-# defaultdict → facilita acumular volumes por preço
-# deque → fila eficiente para trades (FIFO com limite)
-from collections import defaultdict, deque
-
-# dataclass → estrutura de dados simples
-from dataclasses import dataclass
+import os
+import time
 
 # Tipagem (não afeta execução, só clareza)
-from typing import Deque, Dict, List, Tuple, Optional
+from typing import List, Optional
+
+import numpy as np
 
 
 # ==========================================================
 # IMPORTS QT (GRÁFICOS)
 # ==========================================================
 
-from PySide6.QtGui import QColor, QFont, QPainter
+from PySide6.QtGui import QBrush, QColor, QFont, QPainter, QPen
 from PySide6.QtWidgets import (
+    QAbstractScrollArea,
+    QComboBox,
     QFrame,
-    QGraphicsRectItem,
-    QGraphicsScene,
-    QGraphicsTextItem,
-    QGraphicsView,
     QHBoxLayout,
     QLabel,
+    QSpinBox,
     QVBoxLayout,
     QWidget,
 )
-from PySide6.QtCore import QTimer, Qt
+from PySide6.QtCore import QRectF, QSettings, QTimer, Qt
 
 
 # ==========================================================
@@ -40,228 +36,93 @@ from PySide6.QtCore import QTimer, Qt
 
 from core.data_engine.events import (
     TradeEvent,
+    CandleChunk,
     CandleHistory,
     CandleUpdate,
     TimeframeChanged,
     SymbolChanged,
 )
 
-from core.data_engine.models import Trade, Candle
-
-
-# ==========================================================
-# TEMA DA UI
-# ==========================================================
-
-from ui.theme import colors, typography
+from core.data_engine.session_history import SessionHistoryLoader
+from core.row_size import RowSizer
 
 
 # ==========================================================
-# DATA CLASS — BALDE DE VOLUME POR PREÇO
+# LÓGICA DE AGREGAÇÃO (CORE)
 # ==========================================================
 
-@dataclass
-class ProfileBucket:
-    """
-    Representa um nível de preço no Volume Profile
-    """
-    price: float
-    volume: float
+from core.volume_profile_engine import (
+    ProfileBucket,
+    SessionProfileStore,
+    VolumeProfileAggregator,
+    histogram_profile,
+)
 
 
 # ==========================================================
-# AGREGADOR DE VOLUME PROFILE (LÓGICA)
+# TEMA DA UI
 # ==========================================================
 
-class VolumeProfileAggregator:
-    """
-    Responsável por:
-    - acumular trades
-    - acumular candles
-    - calcular POC, VAH, VAL
-    - devolver buckets prontos para desenhar
-    """
-
-    def __init__(self):
-        # Trades recentes (máx 8000)
-        self.trades: Deque[Trade] = deque(maxlen=8000)
-
-        # Candles do timeframe atual
-        self.candles: List[Candle] = []
-
-        # Timeframe em ms (default 1m)
-        self.timeframe_ms = 60_000
-
-        # Símbolo atual
-        self.symbol = "BTCUSDT"
-
-        # Janela de cálculo (nº de candles)
-        self.window_candles = 120
-
-
-    # ------------------------------------------------------
-    # ALTERAÇÃO DE SÍMBOLO
-    # ------------------------------------------------------
-    def set_symbol(self, symbol: str):
-        self.symbol = symbol.upper()
-        self.trades.clear()
-        self.candles.clear()
-
-
-    # ------------------------------------------------------
-    # ALTERAÇÃO DE TIMEFRAME
-    # ------------------------------------------------------
-    def set_timeframe(self, tf: str):
-        mapping = {
-            "1m": 60_000,
-            "5m": 300_000,
-            "15m": 900_000,
-            "1h": 3_600_000,
-            "4h": 14_400_000,
-            "1d": 86_400_000,
-        }
-        self.timeframe_ms = mapping.get(tf.lower(), 60_000)
-        self.trades.clear()
-        self.candles.clear()
-
-
-    # ------------------------------------------------------
-    # HISTÓRICO DE CANDLES
-    # ------------------------------------------------------
-    def add_candles(self, candles: List[Candle]):
-        # Guarda apenas a janela relevante
-        self.candles = list(candles)[-self.window_candles :]
-
-
-    def add_candle_update(self, candle: Candle, closed: bool):
-        # Só adiciona candle fechado
-        if not closed:
-            return
-        self.candles.append(candle)
-        self.candles = self.candles[-self.window_candles :]
-
-
-    # ------------------------------------------------------
-    # TRADES
-    # ------------------------------------------------------
-    def add_trade(self, trade: Trade):
-        # Ignora trades de outro símbolo
-        if trade.symbol.upper() != self.symbol:
-            return
-        self.trades.append(trade)
-
-
-    # ------------------------------------------------------
-    # INÍCIO DA JANELA TEMPORAL
-    # ------------------------------------------------------
-    def _window_start_ms(self) -> Optional[int]:
-        if not self.candles:
-            return None
-        return (
-            self.candles[-1].open_time
-            - self.timeframe_ms * (self.window_candles - 1)
-        )
-
-
-    # ------------------------------------------------------
-    # CÁLCULO DO VOLUME PROFILE
-    # ------------------------------------------------------
-    def profile(
-        self,
-    ) -> Tuple[List[ProfileBucket], Optional[float], Optional[float], Optional[float]]:
-        """
-        Retorna:
-        - lista de buckets (preço, volume)
-        - POC
-        - VAH
-        - VAL
-        """
-
-        start_ms = self._window_start_ms()
-        buckets: Dict[float, float] = defaultdict(float)
-
-        # Remove trades fora da janela temporal
-        if start_ms is not None:
-            cutoff = start_ms
-            while self.trades and self.trades[0].ts < cutoff:
-                self.trades.popleft()
-
-        # Agregação por preço (arredondado)
-        for t in self.trades:
-            price = round(t.price, 2)
-            buckets[price] += t.qty
-
-        # Fallback: usar volume dos candles se não houver trades
-        if not buckets and self.candles:
-            for c in self.candles:
-                buckets[round(c.close, 2)] += c.volume
-
-        # Criar buckets válidos
-        items = [
-            ProfileBucket(price=p, volume=v)
-            for p, v in buckets.items()
-            if v > 1e-6
-        ]
-
-        if not items:
-            return [], None, None, None
-
-        # Ordenar por preço
-        items.sort(key=lambda b: b.price)
-
-        total_vol = sum(b.volume for b in items)
-
-        # POC = preço com maior volume
-        poc_price = max(items, key=lambda b: b.volume).price
-
-        # ------------------------------
-        # VALUE AREA (70%)
-        # ------------------------------
-        sorted_by_vol = sorted(items, key=lambda b: b.volume, reverse=True)
-        acc = 0.0
-        selected_prices = set()
-
-        for b in sorted_by_vol:
-            acc += b.volume
-            selected_prices.add(b.price)
-            if acc >= total_vol * 0.7:
-                break
-
-        vah = max(selected_prices) if selected_prices else None
-        val = min(selected_prices) if selected_prices else None
-
-        # Limitar a 80 níveis para evitar scroll gigante
-        limited = sorted_by_vol[:80]
-        limited.sort(key=lambda b: b.price, reverse=True)
-
-        return limited, poc_price, vah, val
+from ui.theme import colors, typography
 
 
 # ==========================================================
 # VIEW — DESENHO DO VOLUME PROFILE
 # ==========================================================
 
-class VolumeProfileView(QGraphicsView):
+class VolumeProfileView(QAbstractScrollArea):
     """
     Responsável APENAS por desenhar o Volume Profile
+
+    Implementação single-paint (sem QGraphicsItems):
+    - os níveis ficam em arrays NumPy (preço, volume)
+    - paintEvent desenha só as linhas visíveis
+      (barras agrupadas por cor num único drawRects)
+    - POC / VAH / VAL desenhados uma vez por paint
+
+    Um refresh custa apenas a cópia dos arrays + um update(),
+    pelo que centenas/milhares de linhas não afetam o frame.
     """
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        # Anti-aliasing para melhor visual
-        self.setRenderHint(QPainter.Antialiasing, True)
-
-        # Cena gráfica
-        self.scene = QGraphicsScene(self)
-        self.setScene(self.scene)
-
-        # Alinhamento
-        self.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        self.setFrameShape(QFrame.NoFrame)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
 
         # Altura de cada linha
         self.row_height = 22
-
+        self.width_max = 220
+        self.x_origin = 80
+
+        # Dados (preço decrescente)
+        self._prices = np.zeros(0)
+        self._volumes = np.zeros(0)
+        self._max_vol = 1.0
+        self._poc: Optional[float] = None
+        self._vah: Optional[float] = None
+        self._val: Optional[float] = None
+
+        # Preço ancorado no topo da vista (mantém posição quando o range cresce)
+        self._anchor_price: Optional[float] = None
+        self._syncing = False
+
+        # Recursos de pintura (criados uma vez)
+        self._font = typography.mono(10)
+        self._brush_bar = QBrush(QColor(colors.ACCENT_BLUE).darker(180))
+        self._brush_va = QBrush(QColor(colors.ACCENT_BLUE).darker(130))
+        self._brush_poc = QBrush(QColor(colors.HIGHLIGHT).darker(130))
+        self._pen_price = QPen(QColor(colors.MUTED))
+        self._pen_text = QPen(QColor(colors.TEXT))
+        self._pen_poc = QPen(QColor(colors.HIGHLIGHT), 1)
+        self._pen_va = QPen(QColor(colors.ACCENT_BLUE), 1, Qt.DashLine)
+        self._background = QColor(colors.BACKGROUND)
+
+
+    # --------------------------
+    # DADOS
+    # --------------------------
 
     def populate(
         self,
@@ -271,72 +132,157 @@ class VolumeProfileView(QGraphicsView):
         val: Optional[float],
     ):
         """
-        Desenha todos os níveis do Volume Profile
+        Atualiza os níveis do Volume Profile (sem alocar itens gráficos)
         """
+        n = len(buckets)
+        prices = np.fromiter((b.price for b in buckets), np.float64, n)
+        volumes = np.fromiter((b.volume for b in buckets), np.float64, n)
+
+        # Ordenar de cima para baixo (preço alto → baixo)
+        if n > 1 and np.any(np.diff(prices) > 0):
+            order = np.argsort(-prices, kind="stable")
+            prices, volumes = prices[order], volumes[order]
 
-        self.scene.clear()
+        self._prices = prices
+        self._volumes = volumes
+        self._max_vol = float(volumes.max()) if n else 1.0
+        self._poc, self._vah, self._val = poc, vah, val
 
-        max_vol = max(b.volume for b in buckets) if buckets else 1
-        width_max = 220
-        x_origin = 80
-        font = typography.mono(10)
+        self._update_scrollbar()
+        self.viewport().update()
+
+
+    def update_profile(self, buckets, poc, vah, val):
+        self.populate(buckets, poc, vah, val)
 
-        # Ordenar de cima para baixo (preço alto → baixo)
-        buckets_sorted = sorted(buckets, key=lambda b: b.price, reverse=True)
 
-        for i, bucket in enumerate(buckets_sorted):
-            y = i * self.row_height
+    # --------------------------
+    # SCROLL
+    # --------------------------
 
-            # Largura proporcional ao volume
-            bar_width = width_max * bucket.volume / max_vol if max_vol else 0
+    def _update_scrollbar(self):
+        """
+        Ajusta o range do scroll e mantém o preço ancorado no topo.
+        Sem âncora (primeiro refresh) → centra no POC.
+        """
+        rows = len(self._prices)
+        visible = max(1, self.viewport().height() // self.row_height)
+
+        bar = self.verticalScrollBar()
+        self._syncing = True
+        bar.setRange(0, max(0, rows - visible))
+        bar.setPageStep(visible)
+
+        anchor = self._anchor_price
+        if anchor is None and self._poc is not None:
+            anchor = self._poc
+            target = self._row_of(anchor) - visible // 2
+        elif anchor is not None:
+            target = self._row_of(anchor)
+        else:
+            target = 0
+
+        bar.setValue(max(0, min(bar.maximum(), target)))
+        self._syncing = False
+
+        if rows:
+            self._anchor_price = float(self._prices[bar.value()])
+
+    def _row_of(self, price: float) -> int:
+        # Preços em ordem decrescente → searchsorted no negativo
+        return int(np.searchsorted(-self._prices, -price, side="left"))
+
+    def _on_scrolled(self, value: int):
+        if self._syncing:
+            return
+        if 0 <= value < len(self._prices):
+            self._anchor_price = float(self._prices[value])
+        self.viewport().update()
 
-            # Cor por defeito
-            color = colors.ACCENT_BLUE
+    def mouseDoubleClickEvent(self, event):
+        # Duplo clique → volta a centrar no POC
+        self._anchor_price = None
+        self._update_scrollbar()
+        self.viewport().update()
+        super().mouseDoubleClickEvent(event)
 
-            # POC destacado
-            if poc is not None and abs(bucket.price - poc) < 1e-6:
-                color = colors.HIGHLIGHT
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbar()
 
-            # Value Area
-            elif val is not None and vah is not None and val <= bucket.price <= vah:
-                color = colors.ACCENT_BLUE
 
-            # Barra de volume
-            rect = QGraphicsRectItem(
-                x_origin,
-                y + 4,
-                bar_width,
-                self.row_height - 8,
-            )
-            rect.setBrush(QColor(color).darker(130))
-            rect.setPen(QColor(colors.BACKGROUND))
-            self.scene.addItem(rect)
-
-            # Texto do preço
-            price_txt = QGraphicsTextItem(f"{bucket.price:.2f}")
-            price_txt.setFont(font)
-            price_txt.setDefaultTextColor(QColor(colors.MUTED))
-            price_txt.setPos(0, y + 2)
-            self.scene.addItem(price_txt)
-
-            # Texto do volume
-            vol_txt = QGraphicsTextItem(f"{bucket.volume:.2f}")
-            vol_txt.setFont(font)
-            vol_txt.setDefaultTextColor(QColor(colors.TEXT))
-            vol_txt.setPos(x_origin + bar_width + 6, y + 2)
-            self.scene.addItem(vol_txt)
-
-        # Define tamanho total da cena
-        self.setSceneRect(
-            0,
-            0,
-            x_origin + width_max + 80,
-            len(buckets_sorted) * self.row_height,
+    # --------------------------
+    # PAINT
+    # --------------------------
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(self.viewport().rect(), self._background)
+
+        rows = len(self._prices)
+        if not rows:
+            painter.end()
+            return
+
+        rh = self.row_height
+        first = self.verticalScrollBar().value()
+        last = min(rows, first + self.viewport().height() // rh + 2)
+
+        prices = self._prices[first:last]
+        widths = self.width_max * self._volumes[first:last] / (self._max_vol or 1.0)
+
+        # Classificação por cor (vetorizada)
+        is_poc = (
+            np.abs(prices - self._poc) < 1e-9
+            if self._poc is not None
+            else np.zeros(len(prices), dtype=bool)
         )
+        in_va = (
+            (prices >= self._val - 1e-9) & (prices <= self._vah + 1e-9)
+            if self._val is not None and self._vah is not None
+            else np.zeros(len(prices), dtype=bool)
+        )
+
+        # Barras: um drawRects por cor
+        painter.setPen(Qt.NoPen)
+        for mask, brush in (
+            (~in_va & ~is_poc, self._brush_bar),
+            (in_va & ~is_poc, self._brush_va),
+            (is_poc, self._brush_poc),
+        ):
+            idx = np.flatnonzero(mask & (widths > 0.5))
+            if not len(idx):
+                continue
+            painter.setBrush(brush)
+            painter.drawRects(
+                [QRectF(self.x_origin, i * rh + 4, float(widths[i]), rh - 8) for i in idx]
+            )
 
+        # Linhas POC / VAH / VAL
+        right = self.x_origin + self.width_max + 80
+        for price, pen in ((self._vah, self._pen_va), (self._val, self._pen_va), (self._poc, self._pen_poc)):
+            if price is None:
+                continue
+            row = self._row_of(price) - first
+            if 0 <= row < last - first:
+                y = row * rh + rh / 2
+                painter.setPen(pen)
+                painter.drawLine(self.x_origin, int(y), int(right), int(y))
+
+        # Texto (preço + volume) só nas linhas visíveis
+        painter.setFont(self._font)
+        for i in range(len(prices)):
+            y = i * rh
+            painter.setPen(self._pen_price)
+            painter.drawText(QRectF(4, y, self.x_origin - 8, rh), Qt.AlignVCenter | Qt.AlignLeft, f"{prices[i]:.2f}")
+            painter.setPen(self._pen_text)
+            painter.drawText(
+                QRectF(self.x_origin + widths[i] + 6, y, 80, rh),
+                Qt.AlignVCenter | Qt.AlignLeft,
+                f"{self._volumes[first + i]:.2f}",
+            )
 
-    def update_profile(self, buckets, poc, vah, val):
-        self.populate(buckets, poc, vah, val)
+        painter.end()
 
 
 # ==========================================================
@@ -347,10 +293,22 @@ class VolumeProfilePanel(QWidget):
     """
     Painel completo:
     - recebe dados do CoreDataEngine
-    - agrega volume
+    - agrega volume (janela rolante ou sessões)
     - atualiza a view
+
+    Modos:
+    - Rolling        → últimos 120 candles (trades)
+    - Session (Day)  → sessão diária UTC
+    - Session (Week) → sessão semanal UTC
+    - Composite      → últimos N dias
+    - Visible Range  → fixed range = intervalo visível no gráfico
     """
 
+    MODES = ["Rolling", "Session (Day)", "Session (Week)", "Composite", "Visible Range"]
+
+    # Dias de histórico pedidos para sessões / composites
+    HISTORY_DAYS = 31
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -358,8 +316,25 @@ class VolumeProfilePanel(QWidget):
         self._logger = logging.getLogger(__name__)
 
         self._agg = VolumeProfileAggregator()
+        self._sessions = SessionProfileStore()
         self._pending = False
 
+        # Tamanho de linha (ticks) — persistente
+        self._settings = QSettings("OmniFlow", "VolumeProfilePanel")
+        self._rows = RowSizer(self._agg.histogram.tick_size)
+        self._rows.set_mode(self._settings.value("row_size", "Auto") or "Auto")
+
+        # Histórico de vários dias (REST, thread próprio)
+        self._history_enabled = not os.environ.get("OMNIFLOW_DISABLE_PROVIDER")
+        self._loader = SessionHistoryLoader(self)
+        self._loader.chunk_ready.connect(self._on_history_chunk)
+        self._loader.progress.connect(self._on_history_progress)
+
+        self._mode = "Rolling"
+
+        # Gráfico de preço (modo Visible Range)
+        self._chart_plot = None
+
         # Timer de refresh (200ms)
         self._refresh_timer = QTimer(self)
         self._refresh_timer.setInterval(200)
@@ -378,6 +353,36 @@ class VolumeProfilePanel(QWidget):
         lbl.setFont(typography.inter(11, QFont.DemiBold))
         header.addWidget(lbl)
         header.addStretch()
+
+        self.history_label = QLabel("")
+        self.history_label.setFont(typography.inter(10))
+        self.history_label.setStyleSheet(f"color:{colors.MUTED};")
+        self.history_label.setVisible(False)
+        header.addWidget(self.history_label)
+
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(self.MODES)
+        self.mode_combo.setFont(typography.inter(10))
+        self.mode_combo.currentTextChanged.connect(self._on_mode_changed)
+        header.addWidget(self.mode_combo)
+
+        self.days_spin = QSpinBox()
+        self.days_spin.setRange(2, self.HISTORY_DAYS - 1)
+        self.days_spin.setValue(30)
+        self.days_spin.setSuffix("d")
+        self.days_spin.setFont(typography.inter(10))
+        self.days_spin.setVisible(False)
+        self.days_spin.valueChanged.connect(lambda *_: self._mark_pending())
+        header.addWidget(self.days_spin)
+
+        self.row_combo = QComboBox()
+        self.row_combo.addItems(RowSizer.CHOICES)
+        self.row_combo.setCurrentText(self._rows.label())
+        self.row_combo.setFont(typography.inter(10))
+        self.row_combo.setToolTip("Row size (ticks)")
+        self.row_combo.currentTextChanged.connect(self._on_row_size_changed)
+        header.addWidget(self.row_combo)
+
         header.addWidget(self._legend("POC (Point of Control)", colors.HIGHLIGHT))
         header.addWidget(self._legend("Value Area (70%)", colors.ACCENT_BLUE))
         layout.addLayout(header)
@@ -434,6 +439,15 @@ class VolumeProfilePanel(QWidget):
                 engine.timeframe_changed.connect(self._on_timeframe_changed)
                 engine.symbol_changed.connect(self._on_symbol_changed)
 
+                chart = getattr(window, "chart_panel", None)
+                if chart is not None and hasattr(chart, "price_plot"):
+                    self._chart_plot = chart.price_plot
+                    self._chart_plot.getViewBox().sigXRangeChanged.connect(
+                        lambda *_: self._on_chart_range_changed()
+                    )
+
+                self._request_history()
+
                 self._logger.info("VolumeProfilePanel wired to CoreDataEngine successfully")
 
             except Exception as e:
@@ -444,31 +458,98 @@ class VolumeProfilePanel(QWidget):
         elif attempts < 6:
             QTimer.singleShot(150, lambda: self._wire_engine(attempts + 1))
 
+    def shutdown(self):
+        """
+        Para o histórico de sessões (chamado pelo MainWindow ao fechar).
+        """
+        self._refresh_timer.stop()
+        self._loader.stop()
 
     # ------------------------------------------------------
     # EVENT HANDLERS
     # ------------------------------------------------------
     def _on_trade(self, evt: TradeEvent):
         self._agg.add_trade(evt.trade)
+        self._sessions.add_trade(evt.trade)
         self._pending = True
 
     def _on_candle_history(self, evt: CandleHistory):
         self._agg.add_candles(evt.candles)
+        self._rows.add_candles(evt.candles)
+
+        # Sessões só recebem candles fechados (o último pode estar em formação)
+        tf_ms = self._agg.timeframe_ms
+        now_ms = int(time.time() * 1000)
+        closed = [c for c in evt.candles if c.open_time + tf_ms <= now_ms]
+        self._sessions.add_candles(closed, tf_ms)
+
         self._pending = True
 
     def _on_candle_update(self, evt: CandleUpdate):
         self._agg.add_candle_update(evt.candle, evt.closed)
+        self._sessions.add_candle_update(evt.candle, evt.closed)
+        self._rows.add_candle_update(evt.candle, evt.closed)
         self._pending = True
 
     def _on_timeframe_changed(self, evt: TimeframeChanged):
         self._agg.set_timeframe(evt.timeframe)
+        self._sessions.set_interval(self._agg.timeframe_ms)
         self._pending = True
 
     def _on_symbol_changed(self, evt: SymbolChanged):
         self._agg.set_symbol(evt.symbol)
+        self._rows.clear()
+        if evt.symbol.upper() != self._sessions.symbol or not self._sessions.sessions:
+            self._sessions.set_symbol(evt.symbol)
+            self._request_history()
+        self._pending = True
+
+    def _on_mode_changed(self, mode: str):
+        self._mode = mode
+        self.days_spin.setVisible(mode == "Composite")
+        self._mark_pending()
+
+    def _on_row_size_changed(self, text: str):
+        # Só muda a agregação da vista: os histogramas base ficam por tick
+        self._rows.set_mode(text)
+        self._settings.setValue("row_size", self._rows.label())
+        self._mark_pending()
+
+    def _on_chart_range_changed(self):
+        if self._mode == "Visible Range":
+            self._pending = True
+
+    def _mark_pending(self):
         self._pending = True
 
 
+    # ------------------------------------------------------
+    # HISTÓRICO DE SESSÕES
+    # ------------------------------------------------------
+    def _request_history(self):
+        if not self._history_enabled:
+            return
+        self._loader.request(self._sessions.symbol, self.HISTORY_DAYS)
+
+    def _on_history_chunk(self, chunk: CandleChunk):
+        # Chunks de um símbolo anterior (pedido cancelado) são descartados
+        if chunk.symbol.upper() != self._sessions.symbol:
+            return
+        self._sessions.add_candle_arrays(
+            chunk.open_time,
+            chunk.interval_ms,
+            chunk.high,
+            chunk.low,
+            chunk.volume,
+        )
+        if self._mode != "Rolling":
+            self._pending = True
+
+    def _on_history_progress(self, done: int, total: int):
+        self.history_label.setVisible(0 < done < total)
+        self.history_label.setText(f"History {done * 100 // max(1, total)}%")
+
+
     # ------------------------------------------------------
     # REFRESH CONTROLADO
     # ------------------------------------------------------
@@ -477,9 +558,30 @@ class VolumeProfilePanel(QWidget):
             return
 
         self._pending = False
-        buckets, poc, vah, val = self._agg.profile()
+        buckets, poc, vah, val = self._current_profile()
         self.view.update_profile(buckets, poc, vah, val)
 
+    def _current_profile(self):
+        """
+        Perfil do modo selecionado.
+        """
+        mode = self._mode
+        row_ticks = self._rows.row_ticks
+
+        if mode == "Session (Day)":
+            hist = self._sessions.session("day")
+        elif mode == "Session (Week)":
+            hist = self._sessions.session("week")
+        elif mode == "Composite":
+            hist = self._sessions.composite(self.days_spin.value())
+        elif mode == "Visible Range" and self._chart_plot is not None:
+            x0, x1 = self._chart_plot.getViewBox().viewRange()[0]
+            hist = self._sessions.fixed_range(int(x0 * 1000), int(x1 * 1000))
+        else:
+            return self._agg.profile(row_ticks)
+
+        return histogram_profile(hist, self._agg.max_levels, row_ticks)
+
 
     # ------------------------------------------------------
     # HOOK LEGACY (NÃO USADO)
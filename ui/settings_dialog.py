@@ -321,6 +321,26 @@ class SettingsDialog(QDialog):
 
         layout.addRow("Accumulate trades every", self.accumulation)
 
+
+        # --------------------------------------------------
+        # HISTÓRICO NA TABELA
+        # --------------------------------------------------
+        self.max_rows = QSpinBox(w)
+        self.max_rows.setRange(100, 50_000)
+        self.max_rows.setSingleStep(500)
+        self.max_rows.setValue(
+            int(self._tape_settings.value("max_rows", 2000))
+        )
+        layout.addRow("Rows kept in tape", self.max_rows)
+
+        self.burst_threshold = QSpinBox(w)
+        self.burst_threshold.setRange(50, 100_000)
+        self.burst_threshold.setSingleStep(100)
+        self.burst_threshold.setValue(
+            int(self._tape_settings.value("burst_threshold", 500))
+        )
+        layout.addRow("Aggregate prints when backlog >", self.burst_threshold)
+
         return w
 
 
@@ -393,6 +413,13 @@ class SettingsDialog(QDialog):
             opt_to_ms.get(self.accumulation.currentText(), 0)
         )
 
+        self._tape_settings.setValue(
+            "max_rows", int(self.max_rows.value())
+        )
+        self._tape_settings.setValue(
+            "burst_threshold", int(self.burst_threshold.value())
+        )
+
         # Chama o accept original do QDialog (fecha a janela)
         super().accept()
 
@@ -0,0 +1,245 @@
+# ==========================================================
+# IMPORTS
+# ==========================================================
+
+import time
+
+from PySide6.QtCore import QModelIndex, QTimer
+from PySide6.QtWidgets import (
+    QComboBox,
+    QDialog,
+    QDoubleSpinBox,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QSpinBox,
+    QTableView,
+    QVBoxLayout,
+)
+
+import numpy as np
+
+from core.tape_flags import FLAG_BITS, mask_to_flags
+from core.tape_history import SIDE_BUY, SIDE_SELL, TradeHistory
+from ui.panels.tape_panel import TapeTableModel
+from ui.theme import colors, typography
+
+
+# ==========================================================
+# MODELO VIRTUAL SOBRE O HISTÓRICO COLUNAR
+# ==========================================================
+
+class TapeHistoryModel(TapeTableModel):
+    """
+    Resultado de uma pesquisa no TradeHistory:
+    - guarda só o array de seqs (linha 0 = mais recente)
+    - as linhas são formatadas a pedido (só as visíveis) e
+      ficam num cache pequeno
+    - mesmo aspeto da tabela do tape (fonts / brushes / roles)
+    """
+
+    ROW_CACHE = 512
+
+    def __init__(self, history: TradeHistory, format_size, parent=None):
+        super().__init__(1, parent)
+        self.history = history
+        self._format_size = format_size
+
+        self._seqs = np.empty(0, dtype=np.int64)
+        self._cache: dict = {}
+
+    def set_result(self, seqs: np.ndarray):
+        self.beginResetModel()
+        self._seqs = seqs
+        self._cache.clear()
+        self.endResetModel()
+
+    def seq_at(self, r: int) -> int:
+        return int(self._seqs[len(self._seqs) - 1 - r])
+
+    def row_at(self, r: int) -> dict:
+        row = self._cache.get(r)
+        if row is not None:
+            return row
+
+        seq = self.seq_at(r)
+        if not self.history.contains(seq):
+            # Saiu do anel desde a pesquisa
+            row = {"time": "—", "price": 0.0, "size": "", "side": "", "flags": "",
+                   "qty": 0.0, "notional": 0.0}
+        else:
+            ts, price, qty, notional, side, flags = self.history.row(seq)
+            row = {
+                "time": time.strftime("%H:%M:%S", time.gmtime(ts / 1000)) + f".{ts % 1000:03d}",
+                "ts": ts,
+                "price": price,
+                "qty": qty,
+                "notional": notional,
+                "size": self._format_size(qty, notional),
+                "side": "Buy" if side == SIDE_BUY else "Sell",
+                "flags": ", ".join(mask_to_flags(flags)),
+            }
+
+        if len(self._cache) >= self.ROW_CACHE:
+            self._cache.clear()
+        self._cache[r] = row
+        return row
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._seqs)
+
+
+# ==========================================================
+# DIÁLOGO DE HISTÓRICO DO TAPE
+# ==========================================================
+
+class TapeHistoryDialog(QDialog):
+    """
+    Pesquisa no histórico profundo do tape:
+    - lado, notional mínimo, intervalo de preço, janela temporal
+      (entre X e Y minutos atrás) e flag
+    - cada pesquisa = máscaras NumPy sobre as colunas (ms para 1M)
+    - scroll instantâneo: o modelo só formata as linhas visíveis
+    - não-modal: fica aberto ao lado do tape
+    """
+
+    def __init__(self, history: TradeHistory, format_size, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle("Tape History")
+        self.setModal(False)
+        self.resize(760, 560)
+
+        self.history = history
+        self.model = TapeHistoryModel(history, format_size, self)
+
+        # Pesquisa com debounce (filtros mudam a cada tecla)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self.search)
+
+
+        # ==================================================
+        # FILTROS
+        # ==================================================
+
+        self.side = QComboBox()
+        self.side.addItems(["All", "Buy", "Sell"])
+
+        self.min_notional = QDoubleSpinBox()
+        self.min_notional.setRange(0, 1e12)
+        self.min_notional.setDecimals(0)
+        self.min_notional.setSingleStep(10_000)
+        self.min_notional.setPrefix("≥ $")
+
+        # 0 → sem limite
+        self.price_min = QDoubleSpinBox()
+        self.price_max = QDoubleSpinBox()
+        for spin in (self.price_min, self.price_max):
+            spin.setRange(0, 1e9)
+            spin.setDecimals(2)
+            spin.setSpecialValueText("—")
+
+        # Janela temporal: entre `from` e `to` minutos atrás (0 → sem limite)
+        self.from_min = QSpinBox()
+        self.to_min = QSpinBox()
+        for spin in (self.from_min, self.to_min):
+            spin.setRange(0, 100_000)
+            spin.setSuffix(" min")
+            spin.setSpecialValueText("—")
+
+        self.flag = QComboBox()
+        self.flag.addItems(["Any"] + list(FLAG_BITS))
+
+        refresh = QPushButton("Refresh")
+        refresh.clicked.connect(self.search)
+
+        filters = QHBoxLayout()
+        for label, widget in (
+            ("Side", self.side),
+            ("Size", self.min_notional),
+            ("Price", self.price_min),
+            ("to", self.price_max),
+            ("From", self.from_min),
+            ("to", self.to_min),
+            ("Flag", self.flag),
+        ):
+            filters.addWidget(QLabel(label))
+            filters.addWidget(widget)
+        filters.addStretch()
+        filters.addWidget(refresh)
+
+        for combo in (self.side, self.flag):
+            combo.currentIndexChanged.connect(self._search_timer.start)
+        for spin in (self.min_notional, self.price_min, self.price_max, self.from_min, self.to_min):
+            spin.valueChanged.connect(self._search_timer.start)
+
+
+        # ==================================================
+        # TABELA + ESTADO
+        # ==================================================
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setAlternatingRowColors(True)
+        self.table.setShowGrid(False)
+
+        vertical = self.table.verticalHeader()
+        vertical.setVisible(False)
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.setDefaultSectionSize(vertical.fontMetrics().height() + 6)
+
+        header_view = self.table.horizontalHeader()
+        header_view.setSectionResizeMode(QHeaderView.Interactive)
+        header_view.resizeSection(0, 110)                          # Time
+        header_view.resizeSection(2, 130)                          # Size
+        header_view.setSectionResizeMode(4, QHeaderView.Stretch)   # Flags
+
+        self.status = QLabel("")
+        self.status.setFont(typography.mono(9))
+        self.status.setStyleSheet(f"color: {colors.MUTED};")
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(filters)
+        layout.addWidget(self.table)
+        layout.addWidget(self.status)
+
+    # ======================================================
+    # PESQUISA
+    # ======================================================
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.search()
+
+    def search(self):
+        history = self.history
+        start = time.perf_counter()
+
+        side = {1: SIDE_BUY, 2: SIDE_SELL}.get(self.side.currentIndex())
+
+        ts_min = ts_max = None
+        last_ts = history.last_ts
+        if last_ts is not None:
+            if self.from_min.value():
+                ts_min = last_ts - self.from_min.value() * 60_000
+            if self.to_min.value():
+                ts_max = last_ts - self.to_min.value() * 60_000
+
+        seqs = history.query(
+            side=side,
+            min_notional=self.min_notional.value(),
+            price_min=self.price_min.value() or None,
+            price_max=self.price_max.value() or None,
+            ts_min=ts_min,
+            ts_max=ts_max,
+            flags=FLAG_BITS.get(self.flag.currentText(), 0),
+        )
+        self.model.set_result(seqs)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.status.setText(
+            f"{len(seqs):,} of {len(history):,} trades · {elapsed:.1f} ms"
+        )